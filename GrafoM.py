@@ -1,38 +1,45 @@
 import csv
-from collections import defaultdict
-
-class Grafo:
-    def __init__(self):
-        self.nodos = {}  # Almacena los nodos con su información
-        self.aristas = defaultdict(list)  # Almacena las conexiones entre nodos
-        self.titulo_a_indice = {}  # Mapa de título a índice
-        self.indice_a_titulo = {}  # Mapa de índice a título
-        self.contador_nodos = 0  # Contador para asignar índices
-
-    def agregar_pelicula(self, titulo, rating, votos, duracion, director, genero, año):
-        """Agrega una película al grafo."""
-        self.nodos[titulo] = {
-            "rating": rating,
-            "votos": votos,
-            "duracion": duracion,
-            "director": director,
-            "genero": genero,
-            "año": año
-        }
-        self.titulo_a_indice[titulo] = self.contador_nodos
-        self.indice_a_titulo[self.contador_nodos] = titulo
-        self.contador_nodos += 1
-
-    def agregar_arista(self, titulo1, titulo2, peso):
-        """Conecta dos películas con un peso que indica la similitud."""
-        if titulo1 in self.nodos and titulo2 in self.nodos:
-            self.aristas[titulo1].append((titulo2, peso))
-            self.aristas[titulo2].append((titulo1, peso))  # Como es no dirigido, también conectamos en el sentido inverso
-        else:
-            raise ValueError("Ambas películas deben existir en el grafo.")
+import os
+import pickle
+import threading
+from almacen import id_desde_tconst
+from grafo_base import GrafoBase
+from instrumentacion import instrumentacion
+
+ARCHIVO_PREDETERMINADO = "muestralimpia.txt"
+VERSION_CACHE = 8  # Cambiarla cuando cambie la estructura del Grafo para invalidar las cachés viejas
+
+class Grafo(GrafoBase):
+    PRESET = "grafom"  # El género común pesa 2
 
-    def cargar_desde_txt(self, archivo_txt):
-        """Carga películas desde un archivo TXT delimitado por punto y coma."""
+    def agregar_pelicula(self, titulo, rating, votos, duracion, director, genero, año, tconst=None):
+        """
+        Agrega una película al grafo y devuelve su id. El id se deriva del tconst de IMDb; si no hay
+        tconst se asigna un id local negativo. Si el id ya existía se actualizan sus datos.
+        """
+        if tconst:
+            id_pelicula = id_desde_tconst(tconst)
+        else:
+            self.contador_nodos += 1
+            id_pelicula = -self.contador_nodos
+
+        if id_pelicula in self.nodos:
+            anterior = self.nodos.titulo(id_pelicula)
+            if anterior != titulo:  # Cambió el título: lo quitamos del mapa del título anterior
+                self.titulo_a_ids[anterior].remove(id_pelicula)
+                if not self.titulo_a_ids[anterior]:
+                    del self.titulo_a_ids[anterior]
+        self.nodos.agregar(id_pelicula, titulo, rating, votos, duracion, director, genero, año)
+        if id_pelicula not in self.titulo_a_ids[titulo]:
+            self.titulo_a_ids[titulo].append(id_pelicula)
+        return id_pelicula
+
+    @instrumentacion.medir("cargar_desde_txt")
+    def cargar_desde_txt(self, archivo_txt, conectar=True):
+        """
+        Carga películas desde un archivo TXT delimitado por punto y coma. Con conectar=False sólo
+        carga las películas, sin generar las conexiones (por ejemplo, para medir la carga por separado).
+        """
         with open(archivo_txt, mode='r', encoding='latin1') as file:
             reader = csv.DictReader(file, delimiter=';')  # Establecemos el delimitador como punto y coma
             print("Encabezados encontrados:", reader.fieldnames)  # Para depurar los encabezados
@@ -46,157 +53,128 @@ class Grafo:
                     director = row["Director"]
                     genero = row["Género"].split(",")  # Divide géneros por comas
                     año = self.validar_numero(row["Año"])
+                    tconst = row.get("tconst")  # Columna opcional: sin ella se asignan ids locales
 
                     # Agregar la película al grafo
-                    self.agregar_pelicula(titulo, rating, votos, duracion, director, genero, año)
+                    self.agregar_pelicula(titulo, rating, votos, duracion, director, genero, año, tconst)
 
                 except ValueError as e:
                     print(f"Error al procesar la película: {row['Título']} - {e}")
 
         # Ahora que hemos cargado las películas, generamos las conexiones
-        self.generar_conexiones()
-
-    def validar_numero(self, valor):
-        """Devuelve el número si es válido, o 0 si es vacío o inválido."""
-        try:
-            return int(valor) if valor.strip() != "" else 0
-        except ValueError:
-            return 0  # Si no se puede convertir, retorna 0 (o algún valor predeterminado)
-
-    def generar_conexiones(self):
-        """Genera conexiones entre películas basadas en sus atributos."""
-        for p1 in self.nodos:
-            for p2 in self.nodos:
-                if p1 != p2:
-                    peso = 0
-
-                    # Conexión por Género común
-                    if set(self.nodos[p1]["genero"]) & set(self.nodos[p2]["genero"]):
-                        peso += 2  # Un medio bajo para las conexiones por género
-
-                    # Conexión por Director común
-                    if self.nodos[p1]["director"] == self.nodos[p2]["director"]:
-                        peso += 3  # Un peso mayor para las conexiones por director
-
-                    # Conexión por Año común
-                    if self.nodos[p1]["año"] == self.nodos[p2]["año"]:
-                        peso += 2  # Un peso intermedio para las conexiones por año
-                    elif abs(self.nodos[p1]["año"] - self.nodos[p2]["año"]) <= 10:
-                        peso += 1  # Un peso bajo para las conexiones por año cercano
-
-                    # Conexión por Rating similar
-                    if abs(self.nodos[p1]["rating"] - self.nodos[p2]["rating"]) < 0.5:  # Diferencia menor a 0.5
-                        peso += 2  # Peso bajo para rating similar
-
-                    # Conexión por Duración similar
-                    if abs(self.nodos[p1]["duracion"] - self.nodos[p2]["duracion"]) < 10:  # Diferencia menor a 10 minutos
-                        peso += 1  # Peso bajo para duración similar
-
-                    # Conexión por Votos similares
-                    if abs(self.nodos[p1]["votos"] - self.nodos[p2]["votos"]) < 50:  # Diferencia menor a 50 votos
-                        peso += 1  # Peso bajo para votos similares
-
-                    # Si el peso es mayor que 0, agregamos la conexión
-                    if peso > 0:
-                        self.agregar_arista(p1, p2, peso)
-
-    def obtener_vecinos(self, titulo):
-        """Devuelve las películas conectadas a la película dada."""
-        return self.aristas.get(titulo, [])
-
-    def buscar_pelicula(self, titulo):
-        """Devuelve la información de una película."""
-        return self.nodos.get(titulo, None)
-
-    def mostrar_grafo(self):
-        """Muestra el grafo completo en una sola línea."""
-        for titulo, vecinos in self.aristas.items():
-            # Creamos una lista para almacenar todas las conexiones
-            conexiones = []
-            for vecino, peso in vecinos:
-                # Añadimos las conexiones en formato "titulo -> vecino (peso)"
-                conexiones.append(f"{titulo} -> {vecino} (peso: {peso})")
-
-            # Imprimimos todas las conexiones de ese nodo en una sola línea
-            if conexiones:
-                print(", ".join(conexiones))
+        if conectar:
+            self.generar_conexiones()
 
+    @instrumentacion.medir("busqueda_avanzada")
     def busqueda_avanzada(self, **criterios):
         """Permite buscar películas que cumplan ciertos criterios."""
+        almacen = self.nodos
+        # Convertimos cada criterio en una prueba sobre las columnas del almacén
+        pruebas = []
+        for campo, valor in criterios.items():
+            if campo == "genero":  # Para atributos como género que son listas
+                mascara = almacen.mascara_de([valor]) if isinstance(valor, str) else 0
+                pruebas.append(lambda fila, m=mascara: almacen.mascara_genero[fila] & m)
+            elif campo == "director":
+                codigos = almacen.codigos_director(valor) if isinstance(valor, str) else set()
+                pruebas.append(lambda fila, c=codigos: almacen.director[fila] in c)
+            elif campo in ("rating", "votos", "duracion", "año"):
+                columna = almacen.columna(campo)
+                pruebas.append(lambda fila, col=columna, v=valor: col[fila] == v)
+            # Los campos que las películas no tienen se ignoran
+
         resultados = []
-        for titulo, info in self.nodos.items():
+        for fila, titulo in enumerate(almacen.titulos):
             # Verificar si cada película cumple con los criterios dados
-            coincide = True
-            for campo, valor in criterios.items():
-                if campo in info:
-                    if isinstance(info[campo], list):  # Para atributos como género que son listas
-                        if valor not in info[campo]:
-                            coincide = False
-                            break
-                    elif info[campo] != valor:
-                        coincide = False
-                        break
-            if coincide:
+            if all(prueba(fila) for prueba in pruebas):
                 resultados.append(titulo)
 
         return resultados
 
-    def busqueda_por_similitud(self, titulo, umbral_peso=1):
+    @instrumentacion.medir("busqueda_por_similitud")
+    def busqueda_por_similitud(self, pelicula, umbral_peso=1):
         """
-        Busca películas similares a la dada, considerando las aristas y sus pesos.
-        Sólo considera aristas cuyo peso sea mayor o igual a `umbral_peso`.
+        Busca películas similares a la dada (por título o id), considerando las aristas y sus pesos.
+        Sólo considera aristas cuyo peso sea mayor o igual a `umbral_peso`. Si varias películas
+        comparten el título se juntan los vecinos de todas.
         """
-        if titulo not in self.nodos:
+        ids = self.ids_pelicula(pelicula)
+        if not ids:
             return []
 
         similares = []
         # Obtener las películas vecinas y sus pesos
-        for vecino, peso in self.obtener_vecinos(titulo):
-            if peso >= umbral_peso:  # Filtramos por el peso mínimo
-                similares.append((vecino, peso))
+        for id_pelicula in ids:
+            for vecino, peso in self.obtener_vecinos(id_pelicula):
+                if peso >= umbral_peso:  # Filtramos por el peso mínimo
+                    similares.append((vecino, peso))
 
         # Ordenamos las películas similares por el peso de la arista (similitud)
         similares.sort(key=lambda x: x[1], reverse=True)
         # Devolvemos solo los títulos de las películas similares
-        return [titulo for titulo, _ in similares]
-
-    # Representación matricial del grafo
-    def matriz_adyacencia(self):
-        """Genera la matriz de adyacencia del grafo."""
-        # Inicializamos una matriz NxN llena de ceros
-        n = len(self.nodos)
-        matriz = [[0] * n for _ in range(n)]
-
-        # Llenamos la matriz con los pesos de las aristas
-        for p1 in self.nodos:  # Iterate through nodes present in self.nodos
-            if p1 in self.titulo_a_indice:  # Ensure p1 is in titulo_a_indice
-                indice1 = self.titulo_a_indice[p1]
-                for p2, peso in self.aristas[p1]:
-                    if p2 in self.titulo_a_indice:  # Ensure p2 is in titulo_a_indice
-                        indice2 = self.titulo_a_indice[p2]
-                        # Check if indices are within bounds before assignment
-                        if 0 <= indice1 < n and 0 <= indice2 < n:
-                            matriz[indice1][indice2] = peso
-                            matriz[indice2][indice1] = peso  # Como es no dirigido, rellenamos también la simétrica
-                        
-
-        return matriz
-
-    # Mostrar la matriz de adyacencia
-    def mostrar_matriz_adyacencia(self):
-        """Muestra la matriz de adyacencia del grafo."""
-        matriz = self.matriz_adyacencia()
-        for fila in matriz:
-            print(fila)
-
-    def num_nodos(self):
-        """Devuelve el número de nodos en el grafo."""
-        return len(self.nodos)
-
-    def obtener_indice_pelicula(self, titulo):
-        """Devuelve el índice de la película dado su título, o None si no se encuentra."""
-        return self.titulo_a_indice.get(titulo, None)
-
-# Crear el grafo y cargar las películas desde el archivo
-grafo = Grafo()
-grafo.cargar_desde_txt("muestralimpia.txt")
\ No newline at end of file
+        return [self.nodos.titulo(vecino) for vecino, _ in similares]
+
+
+# El grafo compartido se construye la primera vez que se pide, no al importar el módulo
+_grafos = {}  # Archivo -> grafo ya construido
+_candado = threading.Lock()
+
+
+def _firma_archivo(archivo):
+    """Identifica la versión del archivo de datos para saber si la caché sigue siendo válida."""
+    estado = os.stat(archivo)
+    return (VERSION_CACHE, estado.st_size, estado.st_mtime_ns)
+
+
+def _ruta_cache(archivo):
+    return archivo + ".grafo.pkl"
+
+
+def _cargar_cache(archivo):
+    """Devuelve el grafo guardado en la caché del archivo, o None si no existe o está desactualizada."""
+    try:
+        with open(_ruta_cache(archivo), "rb") as f:
+            firma, grafo = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    return grafo if firma == _firma_archivo(archivo) else None
+
+
+def _guardar_cache(archivo, grafo):
+    """Guarda el grafo en la caché (si no se puede escribir, simplemente no hay caché)."""
+    ruta = _ruta_cache(archivo)
+    temporal = ruta + ".tmp"
+    try:
+        with open(temporal, "wb") as f:
+            pickle.dump((_firma_archivo(archivo), grafo), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+    except OSError:
+        pass
+
+
+def obtener_grafo(archivo=ARCHIVO_PREDETERMINADO, usar_cache=True):
+    """
+    Devuelve el grafo compartido del archivo dado. La primera llamada lo carga desde la caché si
+    está al día o, si no, lo construye con cargar_desde_txt y guarda la caché. Las siguientes
+    llamadas devuelven el mismo objeto.
+    """
+    grafo = _grafos.get(archivo)
+    if grafo is not None:
+        return grafo
+    with _candado:
+        if archivo not in _grafos:  # Otro hilo pudo construirlo mientras esperábamos
+            grafo = _cargar_cache(archivo) if usar_cache else None
+            if grafo is None:
+                grafo = Grafo()
+                grafo.cargar_desde_txt(archivo)
+                if usar_cache:
+                    _guardar_cache(archivo, grafo)
+            _grafos[archivo] = grafo
+        return _grafos[archivo]
+
+
+def __getattr__(nombre):
+    """Mantiene `GrafoM.grafo` (y `from GrafoM import grafo`) como acceso perezoso al grafo predeterminado."""
+    if nombre == "grafo":
+        return obtener_grafo()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
@@ -1,42 +1,48 @@
 import csv # Para abrir el archivo
-from collections import defaultdict # Permite establecer valores predeterminados para claves que no existen
-
-class Grafo:
-    def __init__(self):
-        self.nodos = {}  # Almacena los nodos con su información
-        self.aristas = defaultdict(list)  # Almacena las conexiones entre nodos
-        self.titulo_a_indice = {}  # Diccionario de título a índice
-        self.indice_a_titulo = {}  # Diccionario de índice a título
-        self.contador_nodos = 0  # Contador para asignar índices
-
-    def agregar_pelicula(self, titulo, rating, votos, duracion, director, genero, año):
-        """Sila pelicula ya se encuentra en el nodo no la agregamos de nuevo"""
-        if titulo in self.nodos:
-          return
-        """Agrega una película al grafo."""
-        self.nodos[titulo] = {
-            "rating": rating,
-            "votos": votos,
-            "duracion": duracion,
-            "director": director,
-            "genero": genero,
-            "año": año
-        }
-        self.titulo_a_indice[titulo] = self.contador_nodos
-        self.indice_a_titulo[self.contador_nodos] = titulo
-        self.contador_nodos += 1
-
-    def agregar_arista(self, titulo1, titulo2, peso):
-        """Conecta dos películas con un peso que indica la similitud."""
-        if titulo1 in self.nodos and titulo2 in self.nodos:
-            self.aristas[titulo1].append((titulo2, peso))
-            self.aristas[titulo2].append((titulo1, peso))  # Conectamos en el sentido inverso (Grafo no dirigido)
-        else:
-            raise ValueError("Ambas películas deben existir en el grafo.")
+import heapq # Preselección de los candidatos de MMR sin ordenar todos
+from almacen import id_desde_tconst # Ids de las películas a partir del tconst de IMDb
+from grafo_base import GrafoBase # Aristas, reglas y representaciones compartidas con GrafoM
+from indice_titulos import IndiceTitulos # Índice para encontrar títulos parciales o mal escritos
+from diversidad import MAX_CANDIDATOS, reordenar_mmr # Reordenamiento para diversificar las recomendaciones
+from instrumentacion import instrumentacion # Mediciones de latencia (apagadas por defecto)
+
+LAMBDA_MMR = 0.7  # Balance entre similitud y diversidad de las recomendaciones del menú
+
+class Grafo(GrafoBase):
+    PRESET = "principal"  # El género común pesa 3
+
+    def __init__(self, reglas=None):
+        super().__init__(reglas)
+        self.indice_titulos = None  # Índice de títulos, se construye la primera vez que se necesita
+        self.version_titulos = 0  # Aumenta con cada película agregada; el índice guarda la versión con que se creó
+        self.version_indice = None
 
-    def cargar_desde_txt(self, archivo_txt):
-        """Carga películas desde un archivo TXT delimitado por punto y coma."""
-        with open(archivo_txt, mode='r', encoding='utf-8') as file:
+    def agregar_pelicula(self, titulo, rating, votos, duracion, director, genero, año, tconst=None):
+        """
+        Agrega una película al grafo y devuelve su id. El id se deriva del tconst de IMDb; si no hay
+        tconst se asigna un id local negativo. Dos películas con el mismo título y distinto tconst
+        (remakes) son películas distintas.
+        """
+        if tconst:
+            id_pelicula = id_desde_tconst(tconst)
+            # Si la película ya se encuentra en el grafo no la agregamos de nuevo
+            if id_pelicula in self.nodos:
+                return id_pelicula
+        else:
+            self.contador_nodos += 1
+            id_pelicula = -self.contador_nodos
+        self.nodos.agregar(id_pelicula, titulo, rating, votos, duracion, director, genero, año)
+        self.titulo_a_ids[titulo].append(id_pelicula)
+        self.version_titulos += 1
+        return id_pelicula
+
+    @instrumentacion.medir("cargar_desde_txt")
+    def cargar_desde_txt(self, archivo_txt, codificacion='utf-8', conectar=True):
+        """
+        Carga películas desde un archivo TXT delimitado por punto y coma. Con conectar=False sólo
+        carga las películas, sin generar las conexiones (por ejemplo, para medir la carga por separado).
+        """
+        with open(archivo_txt, mode='r', encoding=codificacion) as file:
             reader = csv.DictReader(file, delimiter=';')  # Establecemos el delimitador como punto y coma
             #print("Encabezados encontrados:", reader.fieldnames)  Línea para identificar los encabezados encontrados
             for fila in reader:
@@ -49,63 +55,17 @@ class Grafo:
                     director = fila["Director"]
                     genero = fila["Género"].split(",")  # Divide géneros por comas
                     año = self.validar_numero(fila["Año"])
+                    tconst = fila.get("tconst")  # Columna opcional: sin ella se asignan ids locales
 
                     # Agregar la película al grafo
-                    self.agregar_pelicula(titulo, rating, votos, duracion, director, genero, año)
+                    self.agregar_pelicula(titulo, rating, votos, duracion, director, genero, año, tconst)
 
                 except ValueError as e:
                     print(f"Error al procesar la película: {fila['Título']} - {e}")
 
         # Ahora que hemos cargado las películas, generamos las conexiones
-        self.generar_conexiones()
-
-    def validar_numero(self, valor):
-        """Devuelve el número si es válido, o 0 si es vacío o inválido."""
-        try:
-            return int(valor) if valor.strip() != "" else 0
-        except ValueError:
-            return 0  # Si no se puede convertir, retorna 0 (o algún valor predeterminado)
-
-    def generar_conexiones(self):
-        """Genera conexiones entre películas basadas en sus atributos."""
-        for p1 in self.nodos:
-            for p2 in self.nodos:
-                if p1 != p2:
-                    peso = 0
-
-                    # Conexión por Género común
-                    if set(self.nodos[p1]["genero"]) & set(self.nodos[p2]["genero"]):
-                        peso += 3  # Un medio bajo para las conexiones por género
-
-                    # Conexión por Director común
-                    if self.nodos[p1]["director"] == self.nodos[p2]["director"]:
-                        peso += 3  # Un peso mayor para las conexiones por director
-
-                    # Conexión por Año común
-                    if self.nodos[p1]["año"] == self.nodos[p2]["año"]:
-                        peso += 2  # Un peso intermedio para las conexiones por año
-                    elif abs(self.nodos[p1]["año"] - self.nodos[p2]["año"]) <= 10:
-                        peso += 1  # Un peso bajo para las conexiones por año cercano
-
-                    # Conexión por Rating similar
-                    if abs(self.nodos[p1]["rating"] - self.nodos[p2]["rating"]) < 0.5:  # Diferencia menor a 0.5
-                        peso += 2  # Peso bajo para rating similar
-
-                    # Conexión por Duración similar
-                    if abs(self.nodos[p1]["duracion"] - self.nodos[p2]["duracion"]) < 10:  # Diferencia menor a 10 minutos
-                        peso += 1  # Peso bajo para duración similar
-
-                    # Conexión por Votos similares
-                    if abs(self.nodos[p1]["votos"] - self.nodos[p2]["votos"]) < 50:  # Diferencia menor a 50 votos
-                        peso += 1  # Peso bajo para votos similares
-
-                    # Si el peso es mayor que 0, agregamos la conexión
-                    if peso > 0:
-                        self.agregar_arista(p1, p2, peso)
-
-    def obtener_vecinos(self, titulo):
-        """Devuelve las películas conectadas a la película dada."""
-        return self.aristas.get(titulo, [])
+        if conectar:
+            self.generar_conexiones()
 
     def mostrar_menu(self):
         """Método que muestra el menú y maneja las opciones del usuario"""
@@ -123,8 +83,10 @@ class Grafo:
                 self.buscar_peliculas()  # Busca película de acuerdo a criterios específicos
         
             elif opcion == "2":
-                titulo = input("Ingresa el título de la película: ").strip()
-                recomendaciones = self.busqueda_por_similitud(titulo)  # Busca peliculas similares
+                titulo = self.pedir_titulo(input("Ingresa el título de la película: ").strip())
+                if titulo is None:
+                    continue
+                recomendaciones = self.busqueda_por_similitud(titulo, lambda_mmr=LAMBDA_MMR)  # Busca peliculas similares
                 if recomendaciones:
                     print("Recomendaciones basadas en tus entradas:")
                     for pelicula in recomendaciones:
@@ -133,7 +95,9 @@ class Grafo:
             elif opcion == "3":
                 titulos = input("Ingresa los títulos de las películas (separados por coma): ").strip().split(',')
                 titulos = [titulo.strip() for titulo in titulos]  # Limpiar espacios
-                recomendaciones = self.busqueda_por_similitud_multiple(titulos)
+                titulos = [self.pedir_titulo(titulo) for titulo in titulos if titulo]
+                titulos = [titulo for titulo in titulos if titulo is not None]
+                recomendaciones = self.busqueda_por_similitud_multiple(titulos, lambda_mmr=LAMBDA_MMR)
                 if recomendaciones:
                     print("Recomendaciones basadas en tus entradas:")
                     for pelicula in recomendaciones:
@@ -149,61 +113,66 @@ class Grafo:
             else:
                 print("Opción no válida, intenta de nuevo.")
 
-    def buscar_pelicula(self, titulo):
-        """Devuelve la información de una película."""
-        return self.nodos.get(titulo, None)
+    def resolver_titulo(self, titulo):
+        """Devuelve el título del grafo que mejor corresponde al ingresado (exacto, prefijo o parecido), o None."""
+        if titulo in self.titulo_a_ids:
+            return titulo
+        return self.obtener_indice_titulos().resolver(titulo)
+
+    def obtener_indice_titulos(self):
+        """Devuelve el índice de títulos, reconstruyéndolo si no existe o si se agregaron películas desde que se creó."""
+        if self.indice_titulos is None or self.version_indice != self.version_titulos:
+            self.indice_titulos = IndiceTitulos(self.titulo_a_ids)
+            self.version_indice = self.version_titulos
+        return self.indice_titulos
 
-    def mostrar_grafo(self):
-        """Muestra el grafo completo en una sola línea."""
-        for titulo, vecinos in self.aristas.items():
-            # Creamos una lista para almacenar todas las conexiones
-            conexiones = []
-            for vecino, peso in vecinos:
-                # Añadimos las conexiones en formato "titulo -> vecino (peso)"
-                conexiones.append(f"{titulo} -> {vecino} (peso: {peso})")
+    def buscar_titulos(self, consulta, limite=5, completar=False):
+        """
+        Devuelve hasta `limite` títulos del grafo que corresponden a la consulta (exacto, prefijo o parecido).
+        Con completar=True no se detiene en las coincidencias exactas o por prefijo.
+        """
+        return self.obtener_indice_titulos().buscar(consulta, limite, completar)
 
-            # Imprimimos todas las conexiones de ese nodo en una sola línea
-            if conexiones:
-                print(", ".join(conexiones))
+    def pedir_titulo(self, titulo):
+        """Resuelve el título ingresado en el menú e informa al usuario si se usó otro parecido."""
+        resuelto = self.resolver_titulo(titulo)
+        if resuelto is None:
+            print(f"La película '{titulo}' no se encuentra en el grafo.")
+        elif resuelto != titulo:
+            print(f"Usando '{resuelto}' para '{titulo}'.")
+        if resuelto is not None and len(self.titulo_a_ids[resuelto]) > 1:
+            print(f"Hay {len(self.titulo_a_ids[resuelto])} películas llamadas '{resuelto}', se usarán todas.")
+        return resuelto
 
+    @instrumentacion.medir("busqueda_avanzada")
     def busqueda_avanzada(self, **criterios):
         """Permite buscar películas que cumplan ciertos criterios."""
-        resultados = []
+        almacen = self.nodos
+        # Convertimos cada criterio en una prueba sobre las columnas del almacén (ignorando mayúsculas/minúsculas)
+        pruebas = []
+        for campo, valor in criterios.items():
+            if campo == "genero":
+                # Alguno de los géneros de la película está entre los buscados (uno solo o una lista)
+                mascara = almacen.mascara_de(valor if isinstance(valor, list) else [valor], ignorar_mayusculas=True)
+                pruebas.append(lambda fila, m=mascara: almacen.mascara_genero[fila] & m)
+            elif campo == "director":
+                codigos = almacen.codigos_director(valor, ignorar_mayusculas=True)
+                pruebas.append(lambda fila, c=codigos: almacen.director[fila] in c)
+            elif campo in ("rating", "votos", "duracion", "año"):
+                columna = almacen.columna(campo)
+                pruebas.append(lambda fila, col=columna, v=valor: col[fila] == v)
+            else:
+                return []  # Ninguna película tiene ese campo
 
-        # Iteraramos sobre cada película en self.nodos
-        for titulo, info in self.nodos.items():
-            coincide = True # Suponemos que coincide
-            # Iteramos cobre los criterios proporcionados
-            for campo, valor in criterios.items():
-                if campo in info: # Si está en la info de la películs
-                    if isinstance(info[campo], list):  # Para atributos como género
-                        if isinstance(valor, list):
-                          # Verificamos si alguno de los géneros de la película coincide con los géneros buscados (ignorando mayúsculas/minúsculas)
-                            if not any(v.lower() in [x.lower() for x in valor] for v in info[campo]):
-                                coincide = False
-                                break
-                        # Si solo se busca un género en específico
-                        elif not any(v.lower() == valor.lower() for v in info[campo]):
-                            coincide = False
-                            break
-                    # Si es un string
-                    elif isinstance(info[campo], str):
-                        if info[campo].lower() != valor.lower():
-                            coincide = False
-                            break
-                    # Si es un número
-                    elif info[campo] != valor:
-                        coincide = False
-                        break
-                else:
-                    coincide = False
-                    break
-            # Si si hay coincidencia guardamos su título y rating
-            if coincide:
-                resultados.append((titulo, info["rating"]))
+        # Si si hay coincidencia guardamos su título y rating
+        resultados = []
+        for fila, titulo in enumerate(almacen.titulos):
+            if all(prueba(fila) for prueba in pruebas):
+                resultados.append((titulo, almacen.rating[fila]))
 
         # Ordenar por rating en orden descendente
-        resultados.sort(key=lambda x: x[1], reverse=True)
+        with instrumentacion.seccion("busqueda_avanzada.ordenar"):
+            resultados.sort(key=lambda x: x[1], reverse=True)
 
         # Retornar solo los 5 mejores títulos por rating
         return [titulo for titulo, _ in resultados[:5]]
@@ -243,82 +212,76 @@ class Grafo:
         else:
             print("No se encontraron películas con los criterios dados.")
 
-    def busqueda_por_similitud_multiple(self, titulos, umbral_peso=1):
+    @instrumentacion.medir("busqueda_por_similitud_multiple")
+    def busqueda_por_similitud_multiple(self, titulos, umbral_peso=1, lambda_mmr=None):
         """
-        Busca películas similares a varias películas dadas, considerando las aristas y sus pesos.
+        Busca películas similares a varias películas dadas (por título o id), considerando las aristas y sus pesos.
         Sólo considera aristas cuyo peso sea mayor o igual a umbral_peso.
+        Si se da lambda_mmr, los resultados se reordenan con MMR para que sean más diversos.
         """
         similares = set()  # Conjunto para evitar duplicados
 
         for titulo in titulos:
-            if titulo in self.nodos:
+            ids = self.ids_pelicula(titulo)
+            if not ids:
+                print(f"La película '{titulo}' no se encontró en el grafo y se omitirá.")
+            for id_pelicula in ids:
                 # Agregar recomendaciones de cada película
-                for vecino, peso in self.obtener_vecinos(titulo):
+                for vecino, peso in self.obtener_vecinos(id_pelicula):
                     if peso >= umbral_peso:
                         similares.add((vecino, peso))  # Usamos un conjunto para evitar duplicados
-            else:
-                print(f"La película '{titulo}' no se encontró en el grafo y se omitirá.")
+
+        if lambda_mmr is not None:
+            return self.reordenar_mmr(similares, lambda_mmr)
 
         # Ordenamos por similitud y limitamos a las 5 mejores recomendaciones
-        similares_ordenados = sorted(similares, key=lambda x: x[1], reverse=True)[:5]
-        return [titulo for titulo, _ in similares_ordenados]
+        with instrumentacion.seccion("busqueda_por_similitud_multiple.ordenar"):
+            similares_ordenados = sorted(similares, key=lambda x: x[1], reverse=True)[:5]
+        return [self.nodos.titulo(vecino) for vecino, _ in similares_ordenados]
 
-    def busqueda_por_similitud(self, titulo, umbral_peso=1):
+    @instrumentacion.medir("busqueda_por_similitud")
+    def busqueda_por_similitud(self, pelicula, umbral_peso=1, lambda_mmr=None):
         """
-        Busca películas similares a la dada, considerando las aristas y sus pesos.
-        Sólo considera aristas cuyo peso sea mayor o igual a umbral_peso.
+        Busca películas similares a la dada (por título o id), considerando las aristas y sus pesos.
+        Sólo considera aristas cuyo peso sea mayor o igual a umbral_peso. Si varias películas
+        comparten el título se juntan los vecinos de todas.
+        Si se da lambda_mmr, los resultados se reordenan con MMR para que sean más diversos.
         """
-        if titulo not in self.nodos:
-            print(f"La película '{titulo}' no se encuentra en el grafo.")
-            
+        ids = self.ids_pelicula(pelicula)
+        if not ids:
+            print(f"La película '{pelicula}' no se encuentra en el grafo.")
+            return []
 
         similares = set()
         # Agregar recomendaciones de la película
-        for vecino, peso in self.obtener_vecinos(titulo):
-            if peso >= umbral_peso:
-                similares.add((vecino, peso))
+        for id_pelicula in ids:
+            for vecino, peso in self.obtener_vecinos(id_pelicula):
+                if peso >= umbral_peso:
+                    similares.add((vecino, peso))
+
+        if lambda_mmr is not None:
+            return self.reordenar_mmr(similares, lambda_mmr)
 
         # Ordenamos por similitud y limitamos a las 5 mejores recomendaciones
-        similares_ordenados = sorted(similares, key=lambda x: x[1], reverse=True)[:5]
-        return [titulo for titulo, _ in similares_ordenados]
-
-
-    # Representación matricial del grafo
-    def matriz_adyacencia(self):
-        """Genera la matriz de adyacencia del grafo."""
-        # Inicializamos una matriz NxN llena de ceros
-        n = len(self.nodos)
-        matriz = [[0] * n for _ in range(n)]
-
-        # Llenamos la matriz con los pesos de las aristas
-        for p1 in self.nodos:  # Iteramos sobre los nodos
-            if p1 in self.titulo_a_indice:  # Aseguramos que p1 está en titulo_a_indice
-                indice1 = self.titulo_a_indice[p1]
-                for p2, peso in self.aristas[p1]:
-                    if p2 in self.titulo_a_indice:  # Aseguramos que p2 está en titulo_a_indice
-                        indice2 = self.titulo_a_indice[p2]
-                        # Comprobamos si los índices están dentro de los límites antes de la asignación
-                        if 0 <= indice1 < n and 0 <= indice2 < n:
-                            matriz[indice1][indice2] = peso
-                            matriz[indice2][indice1] = peso  # Rellenamos a modo espejo (Grafo no dirigido)
-
-
-        return matriz
-
-    # Mostrar la matriz de adyacencia
-    def mostrar_matriz_adyacencia(self):
-        """Muestra la matriz de adyacencia del grafo."""
-        matriz = self.matriz_adyacencia()
-        for fila in matriz:
-            print(fila)
-
-    def num_nodos(self):
-        """Devuelve el número de nodos en el grafo."""
-        return len(self.nodos)
-
-    def obtener_indice_pelicula(self, titulo):
-        """Devuelve el índice de la película dado su título, o None si no se encuentra."""
-        return self.titulo_a_indice.get(titulo, None)
+        with instrumentacion.seccion("busqueda_por_similitud.ordenar"):
+            similares_ordenados = sorted(similares, key=lambda x: x[1], reverse=True)[:5]
+        return [self.nodos.titulo(vecino) for vecino, _ in similares_ordenados]
+
+    def reordenar_mmr(self, similares, lambda_mmr, k=5):
+        """Elige k recomendaciones entre los pares (id, peso) dados con MMR y devuelve sus títulos."""
+        # Nos quedamos con el mayor peso de cada película y las ordenamos por similitud
+        mejores = {}
+        for id_pelicula, peso in similares:
+            if peso > mejores.get(id_pelicula, 0):
+                mejores[id_pelicula] = peso
+        # MMR sólo mira los MAX_CANDIDATOS primeros: ordenamos por título únicamente los que alcanzan su peso
+        if len(mejores) > MAX_CANDIDATOS:
+            minimo = heapq.nlargest(MAX_CANDIDATOS, mejores.values())[-1]
+            mejores = {id_pelicula: peso for id_pelicula, peso in mejores.items() if peso >= minimo}
+        candidatos = sorted(mejores.items(), key=lambda x: (-x[1], self.nodos.titulo(x[0]), x[0]))
+        return [self.nodos.titulo(id_pelicula)
+                for id_pelicula in reordenar_mmr(self, candidatos, k=k, lambda_mmr=lambda_mmr)]
+
 
 def main():
     # Crear el grafo
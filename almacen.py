@@ -0,0 +1,174 @@
+from array import array # Columnas tipadas, sin un objeto de Python por valor
+from collections.abc import Mapping
+
+
+def id_desde_tconst(tconst):
+    """Id entero de una película a partir de su tconst de IMDb ('tt0123456' -> 123456)."""
+    tconst = tconst.strip()
+    return int(tconst[2:]) if tconst.startswith("tt") else int(tconst)
+
+
+def tconst_desde_id(id_pelicula):
+    """tconst de IMDb a partir del id entero, o None si es un id local (negativo) sin tconst."""
+    return f"tt{id_pelicula:07d}" if id_pelicula > 0 else None
+
+
+class Vocabulario:
+    """Asigna un código entero a cada cadena distinta (directores, géneros) y guarda la cadena una sola vez."""
+
+    def __init__(self):
+        self.codigos = {}  # Cadena -> código
+        self.valores = []  # Código -> cadena
+
+    def codigo(self, valor):
+        """Devuelve el código de la cadena, asignándole uno nuevo si no lo tenía."""
+        codigo = self.codigos.get(valor)
+        if codigo is None:
+            codigo = len(self.valores)
+            self.codigos[valor] = codigo
+            self.valores.append(valor)
+        return codigo
+
+    def __len__(self):
+        return len(self.valores)
+
+    def copiar(self):
+        """Copia independiente del vocabulario."""
+        copia = Vocabulario()
+        copia.codigos = dict(self.codigos)
+        copia.valores = self.valores[:]
+        return copia
+
+
+class AlmacenPeliculas(Mapping):
+    """
+    Atributos de las películas guardados por columnas en lugar de un diccionario por película.
+
+    Cada película ocupa una fila y se identifica por su id entero (derivado del tconst). Rating, votos,
+    duración y año van en arreglos tipados, director y géneros como códigos de un vocabulario, y los
+    géneros además como máscara de bits para comprobar géneros en común con un solo AND. Se comporta
+    como un diccionario {id: info}: `almacen[id]` construye al momento el diccionario de la película.
+    """
+
+    def __init__(self):
+        self.ids = array("q")  # Fila -> id de la película
+        self.titulos = []  # Fila -> título
+        self.fila_de = {}  # Id -> fila
+        self.rating = array("d")
+        self.votos = array("q")
+        self.duracion = array("q")
+        self.año = array("q")
+        self.director = array("l")  # Código en self.directores
+        self.generos = []  # Tupla de códigos en self.vocabulario_generos, en el orden original
+        # Máscara de bits de los géneros. Es una lista de enteros de Python y no un array('Q')
+        # para no limitar el catálogo a 64 géneros distintos.
+        self.mascara_genero = []
+        self.directores = Vocabulario()
+        self.vocabulario_generos = Vocabulario()
+        self._combinaciones = {}  # Tupla de códigos -> (tupla, máscara), para compartirlas entre películas
+
+    def agregar(self, id_pelicula, titulo, rating, votos, duracion, director, genero, año):
+        """Agrega la película al final, o reemplaza sus datos (conservando la fila) si el id ya existía."""
+        codigos = tuple(self.vocabulario_generos.codigo(g) for g in genero)
+        combinacion = self._combinaciones.get(codigos)
+        if combinacion is None:
+            mascara = 0
+            for codigo in codigos:
+                mascara |= 1 << codigo
+            combinacion = self._combinaciones[codigos] = (codigos, mascara)
+        codigos, mascara = combinacion
+        valores = (float(rating), votos, duracion, año, self.directores.codigo(director))
+
+        fila = self.fila_de.get(id_pelicula)
+        if fila is None:
+            self.fila_de[id_pelicula] = len(self.titulos)
+            self.ids.append(id_pelicula)
+            self.titulos.append(titulo)
+            for columna, valor in zip((self.rating, self.votos, self.duracion, self.año, self.director), valores):
+                columna.append(valor)
+            self.generos.append(codigos)
+            self.mascara_genero.append(mascara)
+        else:
+            self.titulos[fila] = titulo
+            for columna, valor in zip((self.rating, self.votos, self.duracion, self.año, self.director), valores):
+                columna[fila] = valor
+            self.generos[fila] = codigos
+            self.mascara_genero[fila] = mascara
+
+    def info(self, fila):
+        """Construye el diccionario de atributos de la fila dada."""
+        nombres = self.vocabulario_generos.valores
+        return {
+            "titulo": self.titulos[fila],
+            "tconst": tconst_desde_id(self.ids[fila]),
+            "rating": self.rating[fila],
+            "votos": self.votos[fila],
+            "duracion": self.duracion[fila],
+            "director": self.directores.valores[self.director[fila]],
+            "genero": [nombres[codigo] for codigo in self.generos[fila]],
+            "año": self.año[fila],
+        }
+
+    def __getitem__(self, id_pelicula):
+        return self.info(self.fila_de[id_pelicula])
+
+    def __contains__(self, id_pelicula):
+        return id_pelicula in self.fila_de
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.titulos)
+
+    def copiar(self):
+        """
+        Copia independiente del almacén, para modificarla sin afectar a quien esté leyendo el original.
+        Cuesta O(películas): los valores (cadenas, tuplas de géneros) se comparten porque son inmutables.
+        """
+        copia = AlmacenPeliculas()
+        copia.ids = self.ids[:]
+        copia.titulos = self.titulos[:]
+        copia.fila_de = dict(self.fila_de)
+        copia.rating = self.rating[:]
+        copia.votos = self.votos[:]
+        copia.duracion = self.duracion[:]
+        copia.año = self.año[:]
+        copia.director = self.director[:]
+        copia.generos = self.generos[:]
+        copia.mascara_genero = self.mascara_genero[:]
+        copia.directores = self.directores.copiar()
+        copia.vocabulario_generos = self.vocabulario_generos.copiar()
+        copia._combinaciones = dict(self._combinaciones)
+        return copia
+
+    def titulo(self, id_pelicula):
+        """Devuelve el título de la película con el id dado."""
+        return self.titulos[self.fila_de[id_pelicula]]
+
+    def mascara_de(self, generos, ignorar_mayusculas=False):
+        """Máscara de bits de los géneros dados (los que no existen en el catálogo se ignoran)."""
+        mascara = 0
+        if ignorar_mayusculas:
+            buscados = {g.lower() for g in generos}
+            for codigo, nombre in enumerate(self.vocabulario_generos.valores):
+                if nombre.lower() in buscados:
+                    mascara |= 1 << codigo
+        else:
+            for g in generos:
+                codigo = self.vocabulario_generos.codigos.get(g)
+                if codigo is not None:
+                    mascara |= 1 << codigo
+        return mascara
+
+    def codigos_director(self, director, ignorar_mayusculas=False):
+        """Conjunto de códigos de director que corresponden al nombre dado."""
+        if ignorar_mayusculas:
+            buscado = director.lower()
+            return {codigo for codigo, nombre in enumerate(self.directores.valores) if nombre.lower() == buscado}
+        codigo = self.directores.codigos.get(director)
+        return set() if codigo is None else {codigo}
+
+    def columna(self, campo):
+        """Devuelve la columna numérica del campo dado."""
+        return {"rating": self.rating, "votos": self.votos, "duracion": self.duracion, "año": self.año}[campo]
@@ -0,0 +1,237 @@
+"""
+Benchmark de las etapas del grafo: carga, generación de conexiones, búsquedas y matriz de adyacencia.
+
+Uso:
+    python benchmark.py                                  # 1k, 3k, 10k, 100k filas sintéticas + muestralimpia.txt
+    python benchmark.py --tamaños 1000 3000 --salida resultados.json
+    python benchmark.py --comparar resultados_anteriores.json
+    python benchmark.py --tamaños --sin-real --arranque  # Sólo el tiempo de arranque de GrafoM
+
+Cada catálogo se mide en un proceso aparte para que el pico de memoria (RSS) no se mezcle entre tamaños.
+La generación de conexiones es O(n²), así que por encima de --max-conexiones sólo se miden la carga
+y la búsqueda avanzada.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource # Pico de memoria del proceso (ru_maxrss)
+import subprocess
+import sys
+import tempfile
+import time
+
+ARCHIVO_REAL = "muestralimpia.txt"
+ENCABEZADO = ["Título", "Rating", "Votos", "Duración", "Director", "Género", "Año"]
+GENEROS = [
+    "Action", "Adult", "Adventure", "Animation", "Biography", "Comedy", "Crime", "Documentary", "Drama",
+    "Family", "Fantasy", "Game-Show", "History", "Horror", "Music", "Musical", "Mystery", "News",
+    "Reality-TV", "Romance", "Sci-Fi", "Short", "Sport", "Talk-Show", "Thriller", "War", "Western",
+]
+PALABRAS = [
+    "The", "Love", "Night", "Last", "Blood", "Story", "City", "Dead", "Man", "Girl", "House", "Dark",
+    "Summer", "Road", "King", "Secret", "Life", "World", "Time", "Lost", "Return", "Home", "War", "Dream",
+]
+CONSULTAS_POR_ETAPA = 200
+
+
+def generar_catalogo(ruta, filas, semilla=0):
+    """Escribe un catálogo sintético con el formato de muestralimpia.txt (punto y coma, utf-8)."""
+    aleatorio = random.Random(semilla)
+    directores = [f"nm{aleatorio.randrange(10**7):07d}" for _ in range(max(1, filas * 2 // 3))]
+    with open(ruta, mode="w", encoding="utf-8", newline="") as archivo:
+        archivo.write(";".join(ENCABEZADO) + "\n")
+        for i in range(filas):
+            titulo = " ".join(aleatorio.choice(PALABRAS) for _ in range(aleatorio.randint(1, 4))) + f" {i}"
+            rating = round(aleatorio.uniform(1, 10), 1)
+            votos = int(aleatorio.lognormvariate(5, 2)) + 5
+            duracion = aleatorio.choice([0, aleatorio.randint(1, 60), aleatorio.randint(60, 180)])
+            director = aleatorio.choice(directores)
+            genero = ",".join(aleatorio.sample(GENEROS, aleatorio.randint(1, 3)))
+            año = aleatorio.randint(1900, 2024)
+            archivo.write(f"{titulo};{rating};{votos};{duracion};{director};{genero};{año}\n")
+
+
+def rss_pico_mb():
+    """Pico de memoria residente del proceso actual en MB."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1024 / 1024 if sys.platform == "darwin" else pico / 1024  # macOS lo da en bytes
+
+
+def medir(funcion):
+    """Ejecuta la función y devuelve (resultado, segundos)."""
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def medir_catalogo(archivo, codificacion, max_conexiones, semilla=0):
+    """Mide todas las etapas sobre un catálogo. Se ejecuta dentro del proceso hijo."""
+    from Proyecto_final_Algortimos_main import Grafo
+
+    etapas = {}
+    grafo = Grafo()
+
+    # Carga sin generar conexiones, para medir el parseo por separado
+    _, segundos = medir(lambda: grafo.cargar_desde_txt(archivo, codificacion, conectar=False))
+    n = grafo.num_nodos()
+    etapas["cargar_desde_txt"] = {"segundos": segundos, "filas_por_segundo": n / segundos if segundos else None,
+                                  "rss_pico_mb": rss_pico_mb()}
+
+    aleatorio = random.Random(semilla)
+    ids = list(grafo.nodos)
+    infos = [grafo.nodos[aleatorio.choice(ids)] for _ in range(CONSULTAS_POR_ETAPA)]
+    criterios = [{"director": info["director"], "genero": info["genero"][:1], "año": info["año"]} for info in infos]
+    _, segundos = medir(lambda: [grafo.busqueda_avanzada(**c) for c in criterios])
+    etapas["busqueda_avanzada"] = {"segundos": segundos, "consultas": len(criterios),
+                                   "ms_por_consulta": 1000 * segundos / len(criterios), "rss_pico_mb": rss_pico_mb()}
+
+    if n > max_conexiones:
+        return {"peliculas": n, "etapas": etapas, "omitidas": "generación de conexiones O(n²) y etapas que dependen de ella"}
+
+    _, segundos = medir(grafo.generar_conexiones)
+    # Pares no ordenados, como los contadores de instrumentacion: cada arista está repetida en las listas
+    aristas = sum(len({vecino for vecino, _ in vecinos}) for vecinos in grafo.aristas.values()) // 2
+    etapas["generar_conexiones"] = {"segundos": segundos, "pares": n * (n - 1) // 2, "aristas": aristas,
+                                    "aristas_por_segundo": aristas / segundos if segundos else None,
+                                    "rss_pico_mb": rss_pico_mb()}
+
+    semillas = [aleatorio.choice(ids) for _ in range(CONSULTAS_POR_ETAPA)]
+    _, segundos = medir(lambda: [grafo.busqueda_por_similitud(t) for t in semillas])
+    etapas["busqueda_por_similitud"] = {"segundos": segundos, "consultas": len(semillas),
+                                        "ms_por_consulta": 1000 * segundos / len(semillas), "rss_pico_mb": rss_pico_mb()}
+
+    listas = [aleatorio.sample(ids, min(3, n)) for _ in range(CONSULTAS_POR_ETAPA)]
+    _, segundos = medir(lambda: [grafo.busqueda_por_similitud_multiple(l) for l in listas])
+    etapas["busqueda_por_similitud_multiple"] = {"segundos": segundos, "consultas": len(listas),
+                                                 "ms_por_consulta": 1000 * segundos / len(listas),
+                                                 "rss_pico_mb": rss_pico_mb()}
+
+    _, segundos = medir(grafo.matriz_adyacencia)
+    etapas["matriz_adyacencia"] = {"segundos": segundos, "aristas_por_segundo": aristas / segundos if segundos else None,
+                                   "rss_pico_mb": rss_pico_mb()}
+
+    return {"peliculas": n, "etapas": etapas}
+
+
+def medir_en_subproceso(nombre, archivo, codificacion, max_conexiones):
+    """Lanza este mismo script en un proceso hijo y devuelve sus mediciones."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as salida:
+        ruta_salida = salida.name
+    try:
+        comando = [sys.executable, os.path.abspath(__file__), "--interno", archivo, codificacion,
+                   str(max_conexiones), ruta_salida]
+        subprocess.run(comando, check=True, stdout=subprocess.DEVNULL)
+        with open(ruta_salida, encoding="utf-8") as f:
+            medicion = json.load(f)
+    finally:
+        os.remove(ruta_salida)
+    medicion["catalogo"] = nombre
+    return medicion
+
+
+def medir_arranque():
+    """
+    Mide en procesos nuevos cuánto tarda importar GrafoM y cuánto el primer acceso al grafo
+    predeterminado, sin caché y con caché.
+    """
+    def tiempo_en_subproceso(codigo):
+        programa = f"import time; inicio = time.perf_counter(); {codigo}; print(time.perf_counter() - inicio)"
+        salida = subprocess.run([sys.executable, "-c", programa], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        return float(salida.strip().splitlines()[-1])
+
+    return {
+        "importar_GrafoM_s": tiempo_en_subproceso("import GrafoM"),
+        "primer_acceso_sin_cache_s": tiempo_en_subproceso("import GrafoM; GrafoM.obtener_grafo(usar_cache=False)"),
+        # La primera llamada deja la caché escrita, la segunda mide la carga desde ella
+        "primer_acceso_con_cache_s": (tiempo_en_subproceso("import GrafoM; GrafoM.obtener_grafo()"),
+                                      tiempo_en_subproceso("import GrafoM; GrafoM.obtener_grafo()"))[1],
+    }
+
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(actual, anterior):
+    """Muestra la razón de tiempos (actual / anterior) por catálogo y etapa."""
+    previos = {m["catalogo"]: m for m in anterior["resultados"]}
+    print(f"\nComparación contra {anterior.get('commit')} (razón de tiempos, < 1 es más rápido):")
+    for medicion in actual["resultados"]:
+        previa = previos.get(medicion["catalogo"])
+        if previa is None:
+            continue
+        for etapa, datos in medicion["etapas"].items():
+            antes = previa["etapas"].get(etapa)
+            if antes and antes["segundos"]:
+                print(f"  {medicion['catalogo']:>16} {etapa:<32} {datos['segundos'] / antes['segundos']:.2f}x")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--interno":
+        archivo, codificacion, max_conexiones, ruta_salida = sys.argv[2:6]
+        medicion = medir_catalogo(archivo, codificacion, int(max_conexiones))
+        with open(ruta_salida, mode="w", encoding="utf-8") as f:
+            json.dump(medicion, f)
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark de carga, conexiones y búsquedas del grafo.")
+    parser.add_argument("--tamaños", type=int, nargs="*", default=[1000, 3000, 10000, 100000])
+    parser.add_argument("--sin-real", action="store_true", help=f"No medir {ARCHIVO_REAL}")
+    parser.add_argument("--max-conexiones", type=int, default=3000,
+                        help="Tamaño máximo para medir la generación de conexiones (O(n²))")
+    parser.add_argument("--salida", default="benchmark_resultados.json")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior para comparar tiempos")
+    parser.add_argument("--arranque", action="store_true",
+                        help="Medir también el tiempo de importar GrafoM y del primer acceso al grafo")
+    args = parser.parse_args()
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as directorio:
+        catalogos = []
+        for filas in args.tamaños:
+            ruta = os.path.join(directorio, f"sintetico_{filas}.txt")
+            generar_catalogo(ruta, filas)
+            catalogos.append((f"sintetico_{filas}", ruta, "utf-8"))
+        if not args.sin_real and os.path.exists(ARCHIVO_REAL):
+            catalogos.append((ARCHIVO_REAL, ARCHIVO_REAL, "latin1"))
+
+        for nombre, ruta, codificacion in catalogos:
+            medicion = medir_en_subproceso(nombre, ruta, codificacion, args.max_conexiones)
+            resultados.append(medicion)
+            print(f"{nombre} ({medicion['peliculas']} películas)")
+            for etapa, datos in medicion["etapas"].items():
+                extra = ""
+                if datos.get("aristas_por_segundo"):
+                    extra = f", {datos['aristas_por_segundo']:.0f} aristas/s"
+                print(f"  {etapa:<32} {datos['segundos']:8.3f} s, pico {datos['rss_pico_mb']:.1f} MB{extra}")
+            if "omitidas" in medicion:
+                print(f"  (omitidas: {medicion['omitidas']})")
+
+    reporte = {
+        "commit": commit_actual(),
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "resultados": resultados,
+    }
+    if args.arranque:
+        reporte["arranque"] = medir_arranque()
+        print("Arranque de GrafoM")
+        for campo, segundos in reporte["arranque"].items():
+            print(f"  {campo:<32} {segundos:8.3f} s")
+    with open(args.salida, mode="w", encoding="utf-8") as f:
+        json.dump(reporte, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.salida}.")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            comparar(reporte, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import heapq # Montículo binario para las colas de prioridad de Dijkstra
+import sys
+import time
+
+
+class BuscadorCaminos:
+    """
+    Consultas de camino entre dos películas con Dijkstra bidireccional sobre índices enteros.
+    El peso de una arista es afinidad, así que el costo de recorrerla es (peso máximo - peso):
+    el camino más barato es la cadena de conexiones más fuertes.
+    """
+
+    def __init__(self, grafo):
+        self.grafo = grafo
+        adyacencia = grafo.lista_adyacencia()
+        self.peso_maximo = max((max(vecinos.values()) for vecinos in adyacencia if vecinos), default=0)
+        # Vecinos de cada índice como (costo, vecino), ordenados del más barato al más caro.
+        # Así la relajación puede cortar en cuanto un costo ya no puede mejorar el mejor camino.
+        self.vecinos = [
+            sorted((self.peso_maximo - peso, vecino) for vecino, peso in vecinos.items())
+            for vecinos in adyacencia
+        ]
+
+    def camino_mas_corto(self, origen, destino):
+        """
+        Devuelve (costo, lista de índices) del camino más barato entre dos índices,
+        o (None, []) si no están conectados.
+        """
+        if origen == destino:
+            return 0, [origen]
+
+        distancia = ({origen: 0}, {destino: 0})  # Hacia adelante y hacia atrás
+        previo = ({origen: None}, {destino: None})
+        cerrados = (set(), set())
+        colas = ([(0, origen)], [(0, destino)])
+        mejor = float("inf")  # Costo del mejor camino encontrado hasta ahora
+        encuentro = None  # Nodo donde se unen las dos búsquedas en el mejor camino
+
+        while colas[0] and colas[1]:
+            # Cota de salida temprana: ningún camino sin explorar puede costar menos
+            if colas[0][0][0] + colas[1][0][0] >= mejor:
+                break
+
+            # Avanzamos el lado con la cola más pequeña
+            lado = 0 if len(colas[0]) <= len(colas[1]) else 1
+            otro = 1 - lado
+            d, u = heapq.heappop(colas[lado])
+            if u in cerrados[lado]:
+                continue
+            cerrados[lado].add(u)
+
+            dist_lado = distancia[lado]
+            dist_otro = distancia[otro]
+            for costo, v in self.vecinos[u]:
+                nueva = d + costo
+                if nueva >= mejor:
+                    break  # Los vecinos restantes son aún más caros
+                if nueva < dist_lado.get(v, float("inf")):
+                    dist_lado[v] = nueva
+                    previo[lado][v] = u
+                    heapq.heappush(colas[lado], (nueva, v))
+                if v in dist_otro and nueva + dist_otro[v] < mejor:
+                    mejor = nueva + dist_otro[v]
+                    encuentro = v
+
+        if encuentro is None:
+            return None, []
+
+        # Reconstruimos el camino: del origen al encuentro y del encuentro al destino
+        camino = []
+        nodo = encuentro
+        while nodo is not None:
+            camino.append(nodo)
+            nodo = previo[0][nodo]
+        camino.reverse()
+        nodo = previo[1][encuentro]
+        while nodo is not None:
+            camino.append(nodo)
+            nodo = previo[1][nodo]
+        return mejor, camino
+
+    def explicar(self, titulo1, titulo2):
+        """
+        Explica cómo se relacionan dos películas (por título o id): devuelve un diccionario con el camino de títulos,
+        su costo y, para cada arista, el peso y las reglas que lo produjeron.
+        Devuelve None si alguna película no existe o si no hay camino.
+        """
+        origen = self.grafo.obtener_indice_pelicula(titulo1)
+        destino = self.grafo.obtener_indice_pelicula(titulo2)
+        if origen is None or destino is None:
+            return None
+
+        costo, camino = self.camino_mas_corto(origen, destino)
+        if not camino:
+            return None
+
+        titulos = [self.grafo.nodos.titulos[i] for i in camino]
+        ids = [self.grafo.nodos.ids[i] for i in camino]
+        aristas = []
+        for (t1, id1), (t2, id2) in zip(zip(titulos, ids), zip(titulos[1:], ids[1:])):
+            reglas = self.grafo.explicar_conexion(id1, id2)
+            aristas.append({
+                "desde": t1,
+                "hasta": t2,
+                "peso": sum(peso for _, peso in reglas),
+                "reglas": reglas,
+            })
+        return {"camino": titulos, "costo": costo, "aristas": aristas}
+
+
+def main():
+    from GrafoM import obtener_grafo
+
+    if len(sys.argv) != 3:
+        print("Uso: python caminos.py \"Título 1\" \"Título 2\"")
+        return
+
+    grafo = obtener_grafo()
+    buscador = BuscadorCaminos(grafo)
+    inicio = time.perf_counter()
+    explicacion = buscador.explicar(sys.argv[1], sys.argv[2])
+    milisegundos = 1000 * (time.perf_counter() - inicio)
+
+    if explicacion is None:
+        print("No se encontró un camino entre las películas dadas.")
+        return
+    print(" -> ".join(explicacion["camino"]))
+    for arista in explicacion["aristas"]:
+        print(f"{arista['desde']} -> {arista['hasta']} (peso: {arista['peso']})")
+        for regla, peso in arista["reglas"]:
+            print(f"    +{peso} {regla}")
+    print(f"Costo total: {explicacion['costo']} ({milisegundos:.2f} ms)")
+
+if __name__ == "__main__":
+    main()
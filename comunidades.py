@@ -0,0 +1,171 @@
+import math
+import random # Orden aleatorio (con semilla) de los nodos en cada pasada
+import sys
+import time
+from array import array # Arreglos compactos de pertenencia a comunidad
+from collections import Counter, defaultdict
+
+
+def umbral_automatico(adyacencia):
+    """
+    Elige el umbral de peso a partir de la distribución de pesos: el menor con el que el grado medio
+    queda en log2(películas) o menos. Con umbrales más bajos el grafo es tan denso (casi todos los
+    pares están conectados) que la propagación termina en una sola comunidad.
+    """
+    n = len(adyacencia)
+    pesos = Counter(peso for vecinos in adyacencia for peso in vecinos.values())
+    if not pesos:
+        return 1
+    objetivo = math.log2(max(n, 2)) * n  # Entradas de las listas (grado medio * películas)
+    acumuladas = 0
+    umbral = max(pesos)
+    for peso in sorted(pesos, reverse=True):
+        acumuladas += pesos[peso]
+        if acumuladas > objetivo:
+            break
+        umbral = peso
+    return umbral
+
+
+class Comunidades:
+    """
+    Asignación de cada película a una comunidad del grafo mediante propagación de etiquetas
+    ponderada. Cada pasada recorre todas las aristas una vez, así que el costo es O(iteraciones * aristas).
+    Sin umbral_peso, el umbral se deriva de la distribución de pesos (umbral_automatico).
+    """
+
+    def __init__(self, grafo, umbral_peso=None, max_iteraciones=20, semilla=42):
+        self.grafo = grafo
+        adyacencia = grafo.lista_adyacencia()
+        if umbral_peso is None:
+            umbral_peso = umbral_automatico(adyacencia)
+        self.umbral_peso = umbral_peso  # Sólo se consideran aristas con al menos este peso
+        self.adyacencia = [
+            {vecino: peso for vecino, peso in vecinos.items() if peso >= umbral_peso}
+            for vecinos in adyacencia
+        ]
+        self.activos = range(len(self.adyacencia))  # Índices de las películas (sin huecos)
+
+        inicio = time.perf_counter()
+        self.etiqueta = self._propagar(max_iteraciones, semilla)  # etiqueta[i] = comunidad del índice i
+        self.tiempo = time.perf_counter() - inicio
+
+        # Comunidad -> lista de índices de sus películas, de la más grande a la más pequeña
+        grupos = defaultdict(list)
+        for i in self.activos:
+            grupos[self.etiqueta[i]].append(i)
+        ordenadas = sorted(grupos.values(), key=lambda miembros: (-len(miembros), miembros[0]))
+
+        # Renumeramos las comunidades 0, 1, 2... y guardamos los miembros en arreglos
+        self.miembros = []
+        for numero, miembros in enumerate(ordenadas):
+            miembros.sort()
+            self.miembros.append(array("i", miembros))
+            for i in miembros:
+                self.etiqueta[i] = numero
+
+    def _propagar(self, max_iteraciones, semilla):
+        """Cada nodo adopta la etiqueta con mayor peso acumulado entre sus vecinos hasta que nada cambia."""
+        etiqueta = array("i", [-1] * len(self.adyacencia))
+        for i in self.activos:
+            etiqueta[i] = i
+
+        orden = list(self.activos)
+        aleatorio = random.Random(semilla)
+        self.iteraciones = 0
+        for _ in range(max_iteraciones):
+            self.iteraciones += 1
+            aleatorio.shuffle(orden)
+            cambios = 0
+            for i in orden:
+                vecinos = self.adyacencia[i]
+                if not vecinos:
+                    continue
+                pesos = defaultdict(int)
+                for vecino, peso in vecinos.items():
+                    pesos[etiqueta[vecino]] += peso
+                actual = etiqueta[i]
+                mejor_peso = max(pesos.values())
+                # En caso de empate conservamos la etiqueta actual, si no la menor, para que sea determinista
+                if pesos.get(actual, 0) < mejor_peso:
+                    etiqueta[i] = min(e for e, p in pesos.items() if p == mejor_peso)
+                    cambios += 1
+            if cambios == 0:
+                break
+        return etiqueta
+
+    def comunidad_de(self, titulo):
+        """Devuelve el número de comunidad de la película, o None si no se encuentra."""
+        indice = self.grafo.obtener_indice_pelicula(titulo)
+        if indice is None:
+            return None
+        return self.etiqueta[indice]
+
+    def peliculas_de(self, comunidad):
+        """Devuelve los títulos de la comunidad dada."""
+        return [self.grafo.nodos.titulos[i] for i in self.miembros[comunidad]]
+
+    def busqueda_por_similitud(self, titulo, umbral_peso=1, k=5):
+        """
+        Busca películas similares a la dada, restringiendo la búsqueda a su comunidad.
+        Devuelve los `k` vecinos de la misma comunidad con mayor peso (a igual peso, por índice).
+        Recorre sólo los vecinos de la película, no todos los miembros de la comunidad.
+        """
+        indice = self.grafo.obtener_indice_pelicula(titulo)
+        if indice is None:
+            return []
+
+        comunidad = self.etiqueta[indice]
+        similares = [(vecino, peso) for vecino, peso in self.adyacencia[indice].items()
+                     if vecino != indice and peso >= umbral_peso and self.etiqueta[vecino] == comunidad]
+        similares.sort(key=lambda x: (-x[1], x[0]))
+        return [self.grafo.nodos.titulos[vecino] for vecino, _ in similares[:k]]
+
+    def modularidad(self):
+        """Calcula la modularidad ponderada de la partición (entre -0.5 y 1)."""
+        grado = [sum(vecinos.values()) for vecinos in self.adyacencia]
+        total = sum(grado)  # Es 2m: cada arista se cuenta en ambos sentidos
+        if total == 0:
+            return 0.0
+
+        internas = 0
+        for i, vecinos in enumerate(self.adyacencia):
+            for vecino, peso in vecinos.items():
+                if self.etiqueta[i] == self.etiqueta[vecino]:
+                    internas += peso
+        grado_comunidad = defaultdict(int)
+        for i in self.activos:
+            grado_comunidad[self.etiqueta[i]] += grado[i]
+        return internas / total - sum((g / total) ** 2 for g in grado_comunidad.values())
+
+    def estadisticas(self):
+        """Devuelve un diccionario con estadísticas de las comunidades encontradas."""
+        tamaños = sorted(len(miembros) for miembros in self.miembros)
+        n = len(tamaños)
+        return {
+            "peliculas": len(self.activos),
+            "aristas": sum(len(vecinos) for vecinos in self.adyacencia) // 2,
+            "umbral_peso": self.umbral_peso,
+            "comunidades": n,
+            "tamaño_maximo": tamaños[-1] if n else 0,
+            "tamaño_minimo": tamaños[0] if n else 0,
+            "tamaño_medio": len(self.activos) / n if n else 0,
+            "tamaño_mediano": tamaños[n // 2] if n else 0,
+            "aisladas": sum(1 for t in tamaños if t == 1),
+            "modularidad": self.modularidad(),
+            "iteraciones": self.iteraciones,
+            "segundos": self.tiempo,
+        }
+
+
+def main():
+    from GrafoM import obtener_grafo
+
+    grafo = obtener_grafo()
+    umbral = int(sys.argv[1]) if len(sys.argv) > 1 else None  # Sin argumento, el umbral automático
+    comunidades = Comunidades(grafo, umbral_peso=umbral)
+    for campo, valor in comunidades.estadisticas().items():
+        print(f"{campo}: {valor}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+Grafo compartido entre hilos con instantáneas copy-on-write.
+
+Los lectores toman la versión publicada (`instantanea()`) sin ningún candado y consultan esa versión,
+que nadie vuelve a modificar. Los escritores se serializan entre sí: construyen la siguiente versión
+compartiendo todo lo que no cambia y la publican con una sola asignación, así que un lector ve la
+versión anterior completa o la nueva completa, nunca un estado intermedio.
+
+Costo de escribir: la versión nueva copia el almacén (O(películas)) y cada lista de aristas que
+modifica. Una película nueva se conecta con casi todas las demás (el grafo es muy denso), así que
+agregarla copia casi todas las listas, O(aristas): con las ~1.800 películas de muestralimpia.txt son
+unos 200 ms por película, contra unos 2 ms agregándola directamente al Grafo. Cada lista se copia una
+sola vez por versión, así que agregar_peliculas (varias películas en una sola escritura) reparte ese
+costo entre todo el lote: en lotes de 20 son unos 30 ms por película.
+
+Prueba de estrés con escritores y lectores concurrentes (reporta los ms por película agregada):
+
+    python concurrencia.py --peliculas 400 --escritores 2 --lectores 6 --segundos 5 --lote 8
+"""
+import argparse
+import contextlib
+import copy
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+from almacen import id_desde_tconst
+
+# Lo que GrafoConcurrente delega en la versión publicada: atributos y métodos que sólo leen.
+# Las modificaciones pasan por sus propios métodos o por escritura().
+LECTURAS = frozenset({
+    "nodos", "aristas", "titulo_a_ids", "reglas", "ids_pelicula", "obtener_vecinos", "buscar_pelicula",
+    "explicar_conexion", "busqueda_avanzada", "busqueda_por_similitud", "busqueda_por_similitud_multiple",
+    "buscar_peliculas", "buscar_titulos", "resolver_titulo", "reordenar_mmr", "lista_adyacencia",
+    "matriz_adyacencia", "mostrar_grafo", "mostrar_matriz_adyacencia", "num_nodos", "obtener_indice_pelicula",
+})
+
+
+class _AristasCopiaEscritura(defaultdict):
+    """
+    Aristas de la versión en construcción. Comparte las listas de la versión publicada y copia cada
+    una la primera vez que se pide con `aristas[id]` (que es como el Grafo las modifica); las lecturas
+    con `.get()` no copian nada.
+    """
+
+    def __init__(self, aristas):
+        super().__init__(list, aristas)
+        self._copiadas = set()
+
+    def __getitem__(self, clave):
+        if clave not in self._copiadas:
+            self._copiadas.add(clave)
+            if dict.__contains__(self, clave):
+                dict.__setitem__(self, clave, list(dict.__getitem__(self, clave)))
+        return super().__getitem__(clave)
+
+    def __setitem__(self, clave, lista):
+        self._copiadas.add(clave)  # Una lista asignada ya es propia de esta versión
+        super().__setitem__(clave, lista)
+
+
+def _copia_para_escribir(grafo):
+    """Copia del grafo que se puede modificar sin afectar al original. Cuesta O(películas + listas modificadas)."""
+    nuevo = copy.copy(grafo)
+    nuevo.nodos = grafo.nodos.copiar()
+    nuevo.aristas = _AristasCopiaEscritura(grafo.aristas)
+    nuevo.titulo_a_ids = defaultdict(list, {titulo: ids[:] for titulo, ids in grafo.titulo_a_ids.items()})
+    return nuevo
+
+
+class GrafoConcurrente:
+    """
+    Envoltura de un Grafo (de GrafoM o de Proyecto_final_Algortimos_main) para lecturas y escrituras
+    desde varios hilos. Las consultas se delegan en la versión publicada en el momento de la llamada.
+    """
+
+    def __init__(self, grafo):
+        self._actual = grafo
+        self._candado_escritura = threading.Lock()
+
+    @property
+    def generacion(self):
+        return self._actual.generacion
+
+    def instantanea(self):
+        """Devuelve la versión publicada más reciente. No cambia mientras se la consulta."""
+        return self._actual
+
+    @contextlib.contextmanager
+    def escritura(self):
+        """
+        Contexto para modificar el grafo: entrega una copia de la versión actual y, si el bloque termina
+        sin errores, la publica como la siguiente generación. Si hay un error no se publica nada.
+        Varias modificaciones en un mismo bloque se publican juntas (y se copia una sola vez).
+        """
+        with self._candado_escritura:
+            nuevo = _copia_para_escribir(self._actual)
+            yield nuevo
+            nuevo.aristas = defaultdict(list, nuevo.aristas)
+            nuevo.generacion = self._actual.generacion + 1
+            self._actual = nuevo  # Publicación atómica: una sola asignación
+
+    def agregar_pelicula(self, titulo, rating, votos, duracion, director, genero, año, tconst=None, conectar=True):
+        """Agrega una película (y, con conectar=True, sus conexiones) y publica la nueva versión. Devuelve su id."""
+        return self.agregar_peliculas([(titulo, rating, votos, duracion, director, genero, año, tconst)], conectar)[0]
+
+    def agregar_peliculas(self, peliculas, conectar=True):
+        """
+        Agrega varias películas, cada una como la tupla de argumentos de agregar_pelicula, y las publica
+        en una sola versión nueva. Devuelve sus ids. Es más barato que agregarlas de a una, porque cada
+        lista de aristas se copia a lo sumo una vez.
+        """
+        with self.escritura() as grafo:
+            return [_agregar_en(grafo, pelicula, conectar) for pelicula in peliculas]
+
+    def agregar_arista(self, id1, id2, peso):
+        """Conecta dos películas y publica la nueva versión."""
+        with self.escritura() as grafo:
+            grafo.agregar_arista(id1, id2, peso)
+
+    def cambiar_reglas(self, reglas):
+        """Cambia las reglas de conexión, vuelve a puntuar todas las aristas y publica la nueva versión."""
+        with self.escritura() as grafo:
+            grafo.cambiar_reglas(reglas)
+
+    def __getattr__(self, nombre):
+        if nombre in LECTURAS:
+            return getattr(self._actual, nombre)
+        raise AttributeError(f"GrafoConcurrente no expone {nombre!r}: las consultas se hacen sobre instantanea() "
+                             f"y las modificaciones con escritura().")
+
+
+def _agregar_en(grafo, pelicula, conectar):
+    """
+    Agrega una película a la versión en construcción. Si su id ya existía y la película cambió, las
+    conexiones viejas se quitan antes de volver a conectarla; si no cambió nada (por ejemplo, la copia
+    principal del Grafo ignora un tconst repetido) no se vuelve a conectar.
+    """
+    tconst = pelicula[7] if len(pelicula) > 7 else None
+    id_previo = id_desde_tconst(tconst) if tconst else None
+    anterior = grafo.nodos[id_previo] if id_previo in grafo.nodos else None
+    id_pelicula = grafo.agregar_pelicula(*pelicula)
+    if conectar:
+        if anterior is None:
+            grafo.conectar_pelicula(id_pelicula)
+        elif grafo.nodos[id_pelicula] != anterior:
+            grafo.desconectar_pelicula(id_pelicula)
+            grafo.conectar_pelicula(id_pelicula)
+    return id_pelicula
+
+
+def verificar(grafo, aleatorio, muestra=5):
+    """
+    Revisa que una versión del grafo sea consistente y devuelve la lista de problemas encontrados:
+    columnas del mismo largo, mapa de títulos completo, aristas entre películas existentes y
+    simétricas (en una muestra de películas, o en todas con muestra=None).
+    """
+    problemas = []
+    almacen = grafo.nodos
+    n = len(almacen.ids)
+    largos = {len(almacen.titulos), len(almacen.fila_de), len(almacen.rating), len(almacen.votos),
+              len(almacen.duracion), len(almacen.año), len(almacen.director), len(almacen.generos)}
+    if largos != {n}:
+        problemas.append(f"columnas de distinto largo: {sorted(largos)} para {n} películas")
+    if sum(len(ids) for ids in grafo.titulo_a_ids.values()) != n:
+        problemas.append("titulo_a_ids no corresponde a las películas")
+    for id_pelicula in list(grafo.aristas):
+        if id_pelicula not in almacen:
+            problemas.append(f"aristas de una película inexistente: {id_pelicula}")
+
+    if muestra is None:
+        # Todas las aristas: cada (a, b, peso) debe aparecer tantas veces como (b, a, peso)
+        dirigidas = Counter((a, b, peso) for a, vecinos in grafo.aristas.items() for b, peso in vecinos)
+        for (a, b, peso), veces in dirigidas.items():
+            if b not in almacen:
+                problemas.append(f"arista hacia una película inexistente: {b}")
+            elif dirigidas[(b, a, peso)] != veces:
+                problemas.append(f"arista no simétrica: {a} -> {b}")
+        return problemas
+
+    ids = list(almacen.ids)
+    for id_pelicula in aleatorio.sample(ids, min(muestra, len(ids))):
+        for (vecino, peso), veces in Counter(grafo.aristas.get(id_pelicula, [])).items():
+            if vecino not in almacen:
+                problemas.append(f"arista hacia una película inexistente: {vecino}")
+            elif grafo.aristas.get(vecino, []).count((id_pelicula, peso)) != veces:
+                problemas.append(f"arista no simétrica: {id_pelicula} -> {vecino}")
+    return problemas
+
+
+def grafo_sintetico(clase, peliculas, semilla):
+    """Grafo de la clase dada con películas de atributos aleatorios, ya conectado (para pruebas y benchmarks)."""
+    aleatorio = random.Random(semilla)
+    grafo = clase()
+    for i in range(peliculas):
+        grafo.agregar_pelicula(*pelicula_aleatoria(aleatorio, i))
+    grafo.generar_conexiones()
+    return grafo
+
+
+def pelicula_aleatoria(aleatorio, i):
+    """Argumentos de agregar_pelicula para una película con atributos aleatorios (los títulos se repiten cada 97)."""
+    generos = ["Drama", "Comedy", "Action", "Horror", "Documentary", "Romance", "Thriller", "Animation"]
+    return (f"Película {i % 97}", round(aleatorio.uniform(1, 10), 1), aleatorio.randint(5, 400),
+            aleatorio.randint(60, 180), f"nm{aleatorio.randint(1, 60)}",
+            aleatorio.sample(generos, aleatorio.randint(1, 3)), aleatorio.randint(1950, 2024))
+
+
+def prueba_estres(peliculas=400, escritores=2, lectores=6, segundos=5.0, instantaneas=True, semilla=0, lote=1):
+    """
+    Ejecuta escritores (agregar_peliculas de a `lote` películas con sus conexiones y agregar_arista) y
+    lectores (consultas y verificación de consistencia) al mismo tiempo. Con instantaneas=False los
+    escritores modifican el grafo directamente, para comprobar que la verificación sí detecta los problemas.
+    Devuelve un diccionario con el resultado, incluido el tiempo medio de escritura por película agregada.
+    """
+    from Proyecto_final_Algortimos_main import Grafo
+
+    compartido = GrafoConcurrente(grafo_sintetico(Grafo, peliculas, semilla))
+    directo = compartido.instantanea()
+    fin = time.perf_counter() + segundos
+    candado_directo = threading.Lock()  # Sólo serializa a los escritores entre sí en el modo directo
+    candado_totales = threading.Lock()  # Cada hilo cuenta por su cuenta y suma al terminar
+    escrituras = Counter()
+    segundos_insercion = [0.0]
+    lecturas = Counter()
+    problemas = []
+    siguiente = [peliculas]
+
+    def escritor(numero):
+        aleatorio = random.Random(semilla * 1000 + numero)
+        propias = Counter()
+        insercion = 0.0
+        while time.perf_counter() < fin:
+            if aleatorio.random() < 0.5:
+                with candado_directo:
+                    i = siguiente[0]
+                    siguiente[0] += lote
+                datos = [pelicula_aleatoria(aleatorio, i + k) for k in range(lote)]
+                inicio_escritura = time.perf_counter()
+                if instantaneas:
+                    compartido.agregar_peliculas(datos)
+                else:
+                    with candado_directo:
+                        for pelicula in datos:
+                            directo.conectar_pelicula(directo.agregar_pelicula(*pelicula))
+                insercion += time.perf_counter() - inicio_escritura
+                propias["agregar_pelicula"] += lote
+            else:
+                grafo = compartido.instantanea() if instantaneas else directo
+                id1, id2 = aleatorio.sample(list(grafo.nodos.ids), 2)
+                if instantaneas:
+                    compartido.agregar_arista(id1, id2, 1)
+                else:
+                    with candado_directo:
+                        directo.agregar_arista(id1, id2, 1)
+                propias["agregar_arista"] += 1
+        with candado_totales:
+            escrituras.update(propias)
+            segundos_insercion[0] += insercion
+
+    def lector(numero):
+        aleatorio = random.Random(semilla * 1000 + 100 + numero)
+        ultima = -1
+        propias = 0
+        while time.perf_counter() < fin:
+            grafo = compartido.instantanea() if instantaneas else directo
+            try:
+                if grafo.generacion < ultima:
+                    problemas.append("la generación retrocedió")
+                ultima = grafo.generacion
+                n = len(grafo.nodos)
+                id_pelicula = aleatorio.choice(list(grafo.nodos.ids))
+                grado = len(grafo.aristas.get(id_pelicula, []))
+                grafo.busqueda_por_similitud(id_pelicula)
+                grafo.busqueda_avanzada(genero=["Drama"])
+                problemas.extend(verificar(grafo, aleatorio, muestra=2))
+                # La instantánea no debe cambiar mientras se la consulta
+                if len(grafo.nodos) != n or len(grafo.aristas.get(id_pelicula, [])) != grado:
+                    problemas.append("la versión cambió mientras se leía")
+            except Exception as e:  # Con escrituras directas los lectores pueden ver estructuras a medio cambiar
+                problemas.append(f"{type(e).__name__}: {e}")
+            propias += 1
+        with candado_totales:
+            lecturas["consultas"] += propias
+
+    anterior = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)  # Cambios de hilo mucho más frecuentes para provocar intercalados
+    hilos = [threading.Thread(target=escritor, args=(i,)) for i in range(escritores)]
+    hilos += [threading.Thread(target=lector, args=(i,)) for i in range(lectores)]
+    inicio = time.perf_counter()
+    try:
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    finally:
+        sys.setswitchinterval(anterior)
+    transcurrido = time.perf_counter() - inicio
+
+    final = compartido.instantanea() if instantaneas else directo
+    problemas.extend(verificar(final, random.Random(semilla), muestra=None))
+    return {
+        "modo": "instantaneas" if instantaneas else "directo",
+        "segundos": transcurrido,
+        "escrituras": dict(escrituras),
+        "lote": lote,
+        "ms_por_pelicula_agregada": 1000 * segundos_insercion[0] / max(escrituras["agregar_pelicula"], 1),
+        "lecturas": lecturas["consultas"],
+        "lecturas_por_segundo": lecturas["consultas"] / transcurrido,
+        "generacion_final": final.generacion,
+        "peliculas_finales": len(final.nodos),
+        "problemas": len(problemas),
+        "ejemplos_de_problemas": sorted(set(problemas))[:5],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de estrés de lecturas y escrituras concurrentes del grafo.")
+    parser.add_argument("--peliculas", type=int, default=400)
+    parser.add_argument("--escritores", type=int, default=2)
+    parser.add_argument("--lectores", type=int, default=6)
+    parser.add_argument("--segundos", type=float, default=5.0)
+    parser.add_argument("--directo", action="store_true",
+                        help="Escribir directamente sobre el grafo, sin instantáneas (debería reportar problemas)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--lote", type=int, default=1, help="Películas agregadas en cada escritura")
+    args = parser.parse_args()
+
+    resultado = prueba_estres(args.peliculas, args.escritores, args.lectores, args.segundos,
+                              instantaneas=not args.directo, semilla=args.semilla, lote=args.lote)
+    for campo, valor in resultado.items():
+        print(f"{campo}: {valor}")
+    if resultado["problemas"] and not args.directo:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
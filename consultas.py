@@ -0,0 +1,117 @@
+"""
+Consultas al grafo descritas como diccionarios (JSON), compartidas por el servicio HTTP y el
+procesamiento por lotes. Cada consulta tiene un "tipo" y sus parámetros:
+
+    {"tipo": "avanzada", "criterios": {"genero": ["Drama"], "año": 1994}}
+    {"tipo": "similares", "titulo": "Heat", "umbral_peso": 1, "lambda_mmr": 0.7}
+    {"tipo": "similares_multiple", "titulos": ["Heat", "Ronin"]}
+    {"tipo": "titulos", "consulta": "godfater", "limite": 5, "completar": false}
+    {"tipo": "lote", "consultas": [consulta, consulta, ...]}
+
+Sin "lambda_mmr" las similitudes devuelven las 5 de mayor peso, como busqueda_por_similitud.
+Una búsqueda de títulos con coincidencias exactas o por prefijo sólo devuelve esas; con
+"completar": true agrega títulos parecidos hasta llegar al límite.
+"""
+
+MAX_LOTE = 1000  # Consultas como máximo en un lote
+CRITERIOS = ("genero", "director", "rating", "votos", "duracion", "año")  # Campos de busqueda_avanzada
+
+
+class ConsultaInvalida(ValueError):
+    """La consulta no tiene la forma esperada."""
+
+
+def _entero(consulta, campo, predeterminado):
+    valor = consulta.get(campo, predeterminado)
+    if not isinstance(valor, int) or isinstance(valor, bool):
+        raise ConsultaInvalida(f"'{campo}' debe ser un entero.")
+    return valor
+
+
+def _validar_criterios(criterios):
+    """Comprueba los campos y los tipos de los criterios de busqueda_avanzada."""
+    if not isinstance(criterios, dict):
+        raise ConsultaInvalida("'criterios' debe ser un objeto.")
+    for campo, valor in criterios.items():
+        if campo not in CRITERIOS:
+            raise ConsultaInvalida(f"Criterio desconocido: {campo!r}. Criterios válidos: {', '.join(CRITERIOS)}.")
+        if campo == "genero":
+            valido = isinstance(valor, str) or (isinstance(valor, list) and all(isinstance(g, str) for g in valor))
+        elif campo == "director":
+            valido = isinstance(valor, str)
+        else:
+            valido = isinstance(valor, (int, float)) and not isinstance(valor, bool)
+        if not valido:
+            raise ConsultaInvalida(f"Valor no válido para el criterio '{campo}'.")
+    return criterios
+
+
+def _lambda_mmr(consulta):
+    valor = consulta.get("lambda_mmr")
+    if valor is not None and (not isinstance(valor, (int, float)) or not 0 <= valor <= 1):
+        raise ConsultaInvalida("'lambda_mmr' debe ser un número entre 0 y 1.")
+    return valor
+
+
+def ejecutar_consulta(grafo, consulta):
+    """
+    Ejecuta una consulta sobre el grafo (de Proyecto_final_Algortimos_main) y devuelve un diccionario
+    serializable como JSON. Lanza ConsultaInvalida si la consulta está mal formada.
+    """
+    if not isinstance(consulta, dict):
+        raise ConsultaInvalida("La consulta debe ser un objeto JSON.")
+    tipo = consulta.get("tipo")
+
+    if tipo == "avanzada":
+        criterios = _validar_criterios(consulta.get("criterios", {}))
+        return {"resultados": grafo.busqueda_avanzada(**criterios)}
+
+    if tipo == "similares":
+        titulo = consulta.get("titulo")
+        if not isinstance(titulo, str):
+            raise ConsultaInvalida("Falta 'titulo'.")
+        umbral, lambda_mmr = _entero(consulta, "umbral_peso", 1), _lambda_mmr(consulta)
+        # Revisamos antes que exista para no imprimir avisos del menú en la salida del servicio
+        if not grafo.ids_pelicula(titulo):
+            return {"resultados": [], "no_encontradas": [titulo]}
+        return {"resultados": grafo.busqueda_por_similitud(titulo, umbral, lambda_mmr)}
+
+    if tipo == "similares_multiple":
+        titulos = consulta.get("titulos")
+        if not isinstance(titulos, list) or not all(isinstance(t, str) for t in titulos):
+            raise ConsultaInvalida("'titulos' debe ser una lista de títulos.")
+        umbral, lambda_mmr = _entero(consulta, "umbral_peso", 1), _lambda_mmr(consulta)
+        encontradas = [t for t in titulos if grafo.ids_pelicula(t)]
+        respuesta = {"resultados": grafo.busqueda_por_similitud_multiple(encontradas, umbral, lambda_mmr)}
+        if len(encontradas) < len(titulos):
+            respuesta["no_encontradas"] = [t for t in titulos if not grafo.ids_pelicula(t)]
+        return respuesta
+
+    if tipo == "titulos":
+        texto = consulta.get("consulta")
+        if not isinstance(texto, str):
+            raise ConsultaInvalida("Falta 'consulta'.")
+        completar = consulta.get("completar", False)
+        if not isinstance(completar, bool):
+            raise ConsultaInvalida("'completar' debe ser true o false.")
+        return {"resultados": grafo.buscar_titulos(texto, _entero(consulta, "limite", 5), completar)}
+
+    if tipo == "lote":
+        consultas = consulta.get("consultas")
+        if not isinstance(consultas, list):
+            raise ConsultaInvalida("'consultas' debe ser una lista.")
+        if len(consultas) > MAX_LOTE:
+            raise ConsultaInvalida(f"Un lote admite como máximo {MAX_LOTE} consultas.")
+        return {"resultados": [ejecutar_o_error(grafo, c, permitir_lote=False) for c in consultas]}
+
+    raise ConsultaInvalida(f"Tipo de consulta desconocido: {tipo!r}.")
+
+
+def ejecutar_o_error(grafo, consulta, permitir_lote=True):
+    """Como ejecutar_consulta, pero devuelve {"error": mensaje} en lugar de lanzar la excepción."""
+    if not permitir_lote and isinstance(consulta, dict) and consulta.get("tipo") == "lote":
+        return {"error": "No se admiten lotes dentro de un lote."}
+    try:
+        return ejecutar_consulta(grafo, consulta)
+    except ConsultaInvalida as e:
+        return {"error": str(e)}
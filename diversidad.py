@@ -0,0 +1,37 @@
+MAX_CANDIDATOS = 50  # Candidatos de mayor relevancia entre los que se elige
+
+
+def reordenar_mmr(grafo, candidatos, k=5, lambda_mmr=0.7, max_candidatos=MAX_CANDIDATOS):
+    """
+    Reordena recomendaciones con relevancia marginal máxima (MMR).
+
+    `candidatos` es una lista de (id, peso) ordenada de mayor a menor peso, donde el peso es la
+    relevancia respecto a la película buscada. En cada paso se elige el candidato que maximiza
+        lambda_mmr * relevancia - (1 - lambda_mmr) * redundancia
+    donde la redundancia es el mayor peso de arista entre el candidato y los ya elegidos.
+    Con lambda_mmr = 1 se obtiene el orden original; valores menores favorecen la diversidad.
+
+    El peso entre la película elegida y cada candidato restante se busca en grafo.pesos_vecinos,
+    {vecino: peso} en O(1), así que cada paso cuesta O(candidatos) sin recorrer listas de aristas
+    ni construir ninguna matriz (salvo armar ese diccionario la primera vez que se pide).
+    """
+    candidatos = candidatos[:max_candidatos]
+    relevancia = dict(candidatos)
+    redundancia = dict.fromkeys(relevancia, 0)
+    restantes = [pelicula for pelicula, _ in candidatos]
+    elegidos = []
+
+    while restantes and len(elegidos) < k:
+        # Mejor puntuación; ante empates se conserva el orden original
+        mejor = max(restantes, key=lambda t: lambda_mmr * relevancia[t] - (1 - lambda_mmr) * redundancia[t])
+        elegidos.append(mejor)
+        restantes.remove(mejor)
+
+        # Actualizamos la redundancia de los restantes con sus aristas hacia la película elegida
+        pesos = grafo.pesos_vecinos(mejor)
+        for pelicula in restantes:
+            peso = pesos.get(pelicula, 0)
+            if peso > redundancia[pelicula]:
+                redundancia[pelicula] = peso
+
+    return elegidos
@@ -0,0 +1,438 @@
+"""
+Verificación diferencial de motores rápidos contra la implementación de referencia.
+
+Una forma más rápida de construir el grafo o de responder consultas sólo se puede usar si da
+exactamente los mismos resultados que la referencia, incluido el orden de los empates en los
+5 mejores. Este módulo arma catálogos sintéticos aleatorios (con muchos empates y valores justo en
+los umbrales de las reglas), construye el grafo con la referencia y con cada motor registrado y
+compara aristas, pesos y resultados de consultas. Cuando encuentra una diferencia reduce el catálogo
+hasta una entrada mínima que todavía la reproduce.
+
+    python equivalencia.py --catalogos 50 --peliculas 40
+    python equivalencia.py --motor reglas --reproduccion diferencia.json
+
+La referencia (GrafoReferencia) no usa nada del Grafo: guarda las películas, las aristas y los
+títulos en diccionarios simples, construye las aristas con el recorrido directo de todos los pares
+ordenados, con las reglas escritas a mano (como estaban antes de reglas.py), y responde las consultas
+con copias congeladas de las búsquedas de cada copia del Grafo. Así una optimización de las búsquedas
+del Grafo también se compara contra algo que no cambió.
+Para agregar un motor: registrar_motor("nombre", construir, preset), donde construir(catalogo)
+devuelve un grafo con las búsquedas del Grafo; opcionalmente consultar(grafo, consulta) para
+responder las consultas de otra forma, y exigir_orden=False si el motor puede dejar las listas de
+aristas en otro orden (se siguen exigiendo las mismas aristas, pesos y resultados).
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+from collections import Counter
+
+import GrafoM
+import Proyecto_final_Algortimos_main
+
+# Preset -> (clase del Grafo que lo usa, peso del género común en la referencia)
+PRESETS = {
+    "principal": (Proyecto_final_Algortimos_main.Grafo, 3),
+    "grafom": (GrafoM.Grafo, 2),
+}
+# Tipos de consulta que admiten las búsquedas de cada copia del Grafo
+CONSULTAS_ADMITIDAS = {
+    "principal": ("similares", "similares_multiple", "avanzada"),
+    "grafom": ("similares", "avanzada"),
+}
+MOTORES = {}  # Nombre -> {"construir": función, "preset": nombre, "consultar": función o None, "exigir_orden": bool}
+
+
+def registrar_motor(nombre, construir, preset="principal", consultar=None, exigir_orden=True):
+    """Registra un motor para compararlo con la referencia del preset dado."""
+    if preset not in PRESETS:
+        raise ValueError(f"Preset desconocido: {preset!r}.")
+    MOTORES[nombre] = {"construir": construir, "preset": preset, "consultar": consultar, "exigir_orden": exigir_orden}
+
+
+def _agregar_peliculas(grafo, catalogo):
+    for pelicula in catalogo:
+        grafo.agregar_pelicula(*pelicula)
+    return grafo
+
+
+class GrafoReferencia:
+    """
+    Grafo de referencia sobre diccionarios: peliculas {id: info} en orden de llegada, aristas
+    {id: [(id vecino, peso)]} y titulo_a_ids {título: [id]}. Las búsquedas son las del Grafo del preset
+    tal como estaban al escribir este módulo; no deben cambiar aunque cambie el Grafo.
+    """
+
+    def __init__(self, preset="principal"):
+        self.preset = preset
+        self.peliculas = {}
+        self.aristas = {}
+        self.titulo_a_ids = {}
+        self.contador_nodos = 0
+
+    def agregar_pelicula(self, titulo, rating, votos, duracion, director, genero, año, tconst=None):
+        """Como agregar_pelicula del preset: la copia principal ignora un tconst repetido y GrafoM lo actualiza."""
+        if tconst:
+            tconst = tconst.strip()
+            id_pelicula = int(tconst[2:]) if tconst.startswith("tt") else int(tconst)
+        else:
+            self.contador_nodos += 1
+            id_pelicula = -self.contador_nodos
+        if id_pelicula in self.peliculas:
+            if self.preset == "principal":
+                return id_pelicula
+            anterior = self.peliculas[id_pelicula]["titulo"]
+            if anterior != titulo:
+                self.titulo_a_ids[anterior].remove(id_pelicula)
+                if not self.titulo_a_ids[anterior]:
+                    del self.titulo_a_ids[anterior]
+        self.peliculas[id_pelicula] = {"titulo": titulo, "rating": float(rating), "votos": votos, "duracion": duracion,
+                                       "director": director, "genero": list(genero), "año": año}
+        ids = self.titulo_a_ids.setdefault(titulo, [])
+        if id_pelicula not in ids:
+            ids.append(id_pelicula)
+        return id_pelicula
+
+    def ids_pelicula(self, pelicula):
+        if isinstance(pelicula, int):
+            return [pelicula] if pelicula in self.peliculas else []
+        return self.titulo_a_ids.get(pelicula, [])
+
+    def _titulos(self, pares):
+        return [self.peliculas[id_pelicula]["titulo"] for id_pelicula, _ in pares]
+
+    def _vecinos(self, ids, umbral_peso):
+        return [(vecino, peso) for id_pelicula in ids for vecino, peso in self.aristas.get(id_pelicula, [])
+                if peso >= umbral_peso]
+
+    def busqueda_por_similitud(self, pelicula, umbral_peso=1, lambda_mmr=None):
+        similares = self._vecinos(self.ids_pelicula(pelicula), umbral_peso)
+        if self.preset == "grafom":  # Todos los vecinos, con repeticiones, del mayor peso al menor
+            return self._titulos(sorted(similares, key=lambda x: x[1], reverse=True))
+        return self._mejores(set(similares), lambda_mmr)
+
+    def busqueda_por_similitud_multiple(self, titulos, umbral_peso=1, lambda_mmr=None):
+        similares = set()
+        for titulo in titulos:
+            similares.update(self._vecinos(self.ids_pelicula(titulo), umbral_peso))
+        return self._mejores(similares, lambda_mmr)
+
+    def _mejores(self, similares, lambda_mmr):
+        """Los 5 pares (id, peso) de mayor peso del conjunto o, con lambda_mmr, los 5 elegidos por MMR."""
+        if lambda_mmr is None:
+            return self._titulos(sorted(similares, key=lambda x: x[1], reverse=True)[:5])
+        mejores = {}
+        for id_pelicula, peso in similares:
+            if peso > mejores.get(id_pelicula, 0):
+                mejores[id_pelicula] = peso
+        candidatos = sorted(mejores.items(), key=lambda x: (-x[1], self.peliculas[x[0]]["titulo"], x[0]))[:50]
+        relevancia = dict(candidatos)
+        redundancia = dict.fromkeys(relevancia, 0)
+        restantes = [id_pelicula for id_pelicula, _ in candidatos]
+        elegidos = []
+        while restantes and len(elegidos) < 5:
+            mejor = max(restantes, key=lambda t: lambda_mmr * relevancia[t] - (1 - lambda_mmr) * redundancia[t])
+            elegidos.append((mejor, None))
+            restantes.remove(mejor)
+            for vecino, peso in self.aristas.get(mejor, []):
+                if vecino in redundancia and peso > redundancia[vecino]:
+                    redundancia[vecino] = peso
+        return self._titulos(elegidos)
+
+    def busqueda_avanzada(self, **criterios):
+        resultados = []
+        for info in self.peliculas.values():
+            coincide = True
+            for campo, valor in criterios.items():
+                if self.preset == "grafom":  # Sin ignorar mayúsculas, un solo género y campos desconocidos ignorados
+                    if campo == "genero":
+                        coincide = isinstance(valor, str) and valor in info["genero"]
+                    elif campo == "director":
+                        coincide = isinstance(valor, str) and info["director"] == valor
+                    elif campo in ("rating", "votos", "duracion", "año"):
+                        coincide = info[campo] == valor
+                elif campo == "genero":
+                    buscados = {g.lower() for g in (valor if isinstance(valor, list) else [valor])}
+                    coincide = any(g.lower() in buscados for g in info["genero"])
+                elif campo == "director":
+                    coincide = info["director"].lower() == valor.lower()
+                elif campo in ("rating", "votos", "duracion", "año"):
+                    coincide = info[campo] == valor
+                else:
+                    return []
+                if not coincide:
+                    break
+            if coincide:
+                resultados.append((info["titulo"], info["rating"]))
+        if self.preset == "grafom":  # Todas, en orden de llegada
+            return [titulo for titulo, _ in resultados]
+        resultados.sort(key=lambda x: x[1], reverse=True)
+        return [titulo for titulo, _ in resultados[:5]]
+
+
+def construir_referencia(catalogo, preset="principal"):
+    """GrafoReferencia del preset con las aristas del recorrido directo de todos los pares ordenados."""
+    peso_genero = PRESETS[preset][1]
+    grafo = _agregar_peliculas(GrafoReferencia(preset), catalogo)
+    ids = list(grafo.peliculas)
+    for i in range(len(ids)):
+        p1 = grafo.peliculas[ids[i]]
+        for j in range(len(ids)):
+            if i != j:
+                p2 = grafo.peliculas[ids[j]]
+                peso = 0
+                if set(p1["genero"]) & set(p2["genero"]):
+                    peso += peso_genero
+                if p1["director"] == p2["director"]:
+                    peso += 3
+                if p1["año"] == p2["año"]:
+                    peso += 2
+                elif abs(p1["año"] - p2["año"]) <= 10:
+                    peso += 1
+                if abs(p1["rating"] - p2["rating"]) < 0.5:
+                    peso += 2
+                if abs(p1["duracion"] - p2["duracion"]) < 10:
+                    peso += 1
+                if abs(p1["votos"] - p2["votos"]) < 50:
+                    peso += 1
+                if peso > 0:
+                    grafo.aristas.setdefault(ids[i], []).append((ids[j], peso))
+                    grafo.aristas.setdefault(ids[j], []).append((ids[i], peso))
+    return grafo
+
+
+def consultar_grafo(grafo, consulta):
+    """Responde una consulta con las búsquedas del grafo dado (sólo con los parámetros presentes)."""
+    opciones = {clave: consulta[clave] for clave in ("umbral_peso", "lambda_mmr") if clave in consulta}
+    if consulta["tipo"] == "similares":
+        return grafo.busqueda_por_similitud(consulta["titulo"], **opciones)
+    if consulta["tipo"] == "similares_multiple":
+        return grafo.busqueda_por_similitud_multiple(consulta["titulos"], **opciones)
+    return grafo.busqueda_avanzada(**consulta["criterios"])
+
+
+# --- Motores incluidos ---
+
+def _construir_reglas(catalogo):
+    grafo = _agregar_peliculas(Proyecto_final_Algortimos_main.Grafo(), catalogo)
+    grafo.generar_conexiones()
+    return grafo
+
+
+def _construir_reglas_grafom(catalogo):
+    grafo = _agregar_peliculas(GrafoM.Grafo(), catalogo)
+    grafo.generar_conexiones()
+    return grafo
+
+
+def _construir_cambio_de_reglas(catalogo):
+    """Construye con otras reglas y vuelve al preset con cambiar_reglas, sin volver a cargar."""
+    grafo = _agregar_peliculas(Proyecto_final_Algortimos_main.Grafo(reglas="grafom"), catalogo)
+    grafo.generar_conexiones()
+    grafo.cambiar_reglas("principal")
+    return grafo
+
+
+def _construir_incremental(catalogo):
+    """
+    Agrega las películas de a una con conectar_pelicula, como GrafoConcurrente. Cada película recibe
+    sus conexiones en otro orden que con generar_conexiones, pero deben ser las mismas.
+    """
+    grafo = Proyecto_final_Algortimos_main.Grafo()
+    for pelicula in catalogo:
+        grafo.conectar_pelicula(grafo.agregar_pelicula(*pelicula))
+    return grafo
+
+
+registrar_motor("reglas", _construir_reglas)
+registrar_motor("reglas_grafom", _construir_reglas_grafom, preset="grafom")
+registrar_motor("cambiar_reglas", _construir_cambio_de_reglas)
+registrar_motor("incremental", _construir_incremental, exigir_orden=False)
+
+
+# --- Catálogos y consultas sintéticas ---
+
+def catalogo_aleatorio(aleatorio, peliculas):
+    """
+    Lista de tuplas de agregar_pelicula con dominios pequeños, para que haya empates, títulos
+    repetidos y diferencias justo en los umbrales (0.5 de rating, 10 años, 10 minutos, 50 votos).
+    """
+    generos = ["Drama", "Comedy", "Action", "Horror", "Romance", "Thriller"]
+    base_rating = aleatorio.choice([5.0, 6.5, 7.2])
+    catalogo = []
+    for k in range(peliculas):
+        titulo = f"Película {aleatorio.randint(0, max(1, peliculas * 3 // 4))}"
+        rating = round(base_rating + aleatorio.choice([-1.0, -0.5, -0.4, 0.0, 0.1, 0.5, 0.6]), 1)
+        votos = aleatorio.choice([0, 49, 50, 100, 150, aleatorio.randint(0, 300)])
+        duracion = aleatorio.choice([80, 89, 90, 100, aleatorio.randint(60, 150)])
+        director = f"nm{aleatorio.randint(1, 6)}"
+        genero = aleatorio.sample(generos, aleatorio.randint(1, 2))
+        año = aleatorio.choice([1990, 2000, 2010, 2011, aleatorio.randint(1950, 2020)])
+        tconst = f"tt{1000 + k:07d}" if aleatorio.random() < 0.5 else None
+        catalogo.append((titulo, rating, votos, duracion, director, genero, año, tconst))
+    return catalogo
+
+
+def consultas_aleatorias(aleatorio, catalogo, preset, cantidad):
+    """Consultas de los tipos que admite el preset sobre títulos y atributos del catálogo."""
+    consultas = []
+    tipos = CONSULTAS_ADMITIDAS[preset]
+    for _ in range(cantidad):
+        tipo = aleatorio.choice(tipos)
+        pelicula = aleatorio.choice(catalogo)
+        if tipo == "similares":
+            consulta = {"tipo": tipo, "titulo": pelicula[0], "umbral_peso": aleatorio.choice([1, 1, 3, 5])}
+        elif tipo == "similares_multiple":
+            consulta = {"tipo": tipo, "titulos": [p[0] for p in aleatorio.sample(catalogo, min(len(catalogo), 3))],
+                        "umbral_peso": aleatorio.choice([1, 3])}
+        else:
+            criterios = {"genero": pelicula[5][0] if preset == "grafom" else pelicula[5][:1]}
+            if aleatorio.random() < 0.5:
+                criterios["año"] = pelicula[6]
+            if aleatorio.random() < 0.3:
+                criterios["director"] = pelicula[4]
+            consulta = {"tipo": tipo, "criterios": criterios}
+        if tipo != "avanzada" and preset == "principal" and aleatorio.random() < 0.3:
+            consulta["lambda_mmr"] = 0.7
+        consultas.append(consulta)
+    return consultas
+
+
+# --- Comparación ---
+
+def _pesos_por_par(grafo):
+    """{(id, id vecino): Counter de pesos} con todas las entradas de las listas de aristas."""
+    pares = {}
+    for id_pelicula, vecinos in grafo.aristas.items():
+        for vecino, peso in vecinos:
+            pares.setdefault((id_pelicula, vecino), Counter())[peso] += 1
+    return pares
+
+
+def comparar_aristas(referencia, motor):
+    """Devuelve la primera diferencia de aristas (como diccionario) o None si son iguales, incluido el orden."""
+    if list(referencia.peliculas) != list(motor.nodos.ids):
+        return {"tipo": "peliculas", "referencia": list(referencia.peliculas), "motor": list(motor.nodos.ids)}
+    pares_referencia, pares_motor = _pesos_por_par(referencia), _pesos_por_par(motor)
+    for par in sorted(set(pares_referencia) | set(pares_motor)):
+        if par not in pares_motor or par not in pares_referencia:
+            return {"tipo": "arista", "par": list(par),
+                    "referencia": par in pares_referencia, "motor": par in pares_motor}
+        if pares_referencia[par] != pares_motor[par]:
+            return {"tipo": "peso", "par": list(par),
+                    "referencia": dict(pares_referencia[par]), "motor": dict(pares_motor[par])}
+    for id_pelicula in referencia.peliculas:
+        lista_referencia = referencia.aristas.get(id_pelicula, [])
+        lista_motor = motor.aristas.get(id_pelicula, [])
+        if lista_referencia != lista_motor:
+            return {"tipo": "orden", "pelicula": id_pelicula,
+                    "referencia": lista_referencia[:10], "motor": lista_motor[:10]}
+    return None
+
+
+def comparar_consultas(referencia, motor, consultas, consultar=None):
+    """Devuelve la primera consulta cuyos resultados difieren (como diccionario) o None."""
+    consultar = consultar or consultar_grafo
+    for consulta in consultas:
+        esperado = consultar_grafo(referencia, consulta)
+        obtenido = consultar(motor, consulta)
+        if esperado != obtenido:
+            return {"tipo": "consulta", "consulta": consulta, "referencia": esperado, "motor": obtenido}
+    return None
+
+
+def diferencia(nombre, catalogo, consultas):
+    """Construye el catálogo con la referencia y con el motor y devuelve la primera diferencia, o None."""
+    motor = MOTORES[nombre]
+    with contextlib.redirect_stdout(io.StringIO()):  # Avisos de las búsquedas para el menú
+        referencia = construir_referencia(catalogo, motor["preset"])
+        grafo = motor["construir"](catalogo)
+        encontrada = comparar_aristas(referencia, grafo)
+        if encontrada is not None and encontrada["tipo"] == "orden" and not motor["exigir_orden"]:
+            encontrada = None
+        if encontrada is None:
+            encontrada = comparar_consultas(referencia, grafo, consultas, motor["consultar"])
+    return encontrada
+
+
+def reducir(nombre, catalogo, consultas, encontrada):
+    """
+    Quita películas (primero en bloques grandes y luego de a una) y consultas mientras siga habiendo
+    una diferencia del mismo tipo. Devuelve (catálogo, consultas, diferencia) mínimos.
+    """
+    def reproduce(catalogo_prueba, consultas_prueba):
+        nueva = diferencia(nombre, catalogo_prueba, consultas_prueba)
+        return nueva if nueva is not None and nueva["tipo"] == encontrada["tipo"] else None
+
+    if encontrada["tipo"] == "consulta":
+        consultas = [encontrada["consulta"]]  # Basta con la consulta que falló
+    else:
+        consultas = []
+
+    bloque = max(1, len(catalogo) // 2)
+    while bloque >= 1:
+        inicio = 0
+        while inicio < len(catalogo) and len(catalogo) > 1:
+            prueba = catalogo[:inicio] + catalogo[inicio + bloque:]
+            nueva = reproduce(prueba, consultas)
+            if nueva is not None:
+                catalogo, encontrada = prueba, nueva
+            else:
+                inicio += bloque
+        bloque //= 2
+    return catalogo, consultas, encontrada
+
+
+def verificar(nombres=None, catalogos=30, peliculas=40, consultas_por_catalogo=40, semilla=0):
+    """
+    Compara cada motor con la referencia en `catalogos` catálogos aleatorios. Devuelve un reporte por
+    motor con la cantidad de catálogos revisados y, si hubo diferencias, la primera reducida al mínimo.
+    """
+    reporte = {}
+    for nombre in nombres or sorted(MOTORES):
+        preset = MOTORES[nombre]["preset"]
+        aleatorio = random.Random(semilla)
+        resultado = {"preset": preset, "catalogos": 0, "con_diferencias": 0, "reproduccion": None}
+        for _ in range(catalogos):
+            catalogo = catalogo_aleatorio(aleatorio, aleatorio.randint(2, peliculas))
+            consultas = consultas_aleatorias(aleatorio, catalogo, preset, consultas_por_catalogo)
+            resultado["catalogos"] += 1
+            encontrada = diferencia(nombre, catalogo, consultas)
+            if encontrada is None:
+                continue
+            resultado["con_diferencias"] += 1
+            if resultado["reproduccion"] is None:
+                minimo, consultas_minimas, encontrada = reducir(nombre, catalogo, consultas, encontrada)
+                resultado["reproduccion"] = {"catalogo": minimo, "consultas": consultas_minimas, "diferencia": encontrada}
+        reporte[nombre] = resultado
+    return reporte
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los motores registrados con la implementación de referencia.")
+    parser.add_argument("--motor", action="append", choices=sorted(MOTORES), help="Motor a revisar (por defecto, todos)")
+    parser.add_argument("--catalogos", type=int, default=30)
+    parser.add_argument("--peliculas", type=int, default=40, help="Películas como máximo en cada catálogo")
+    parser.add_argument("--consultas", type=int, default=40, help="Consultas por catálogo")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--reproduccion", help="Archivo JSON donde guardar las entradas mínimas que reproducen diferencias")
+    args = parser.parse_args()
+
+    reporte = verificar(args.motor, args.catalogos, args.peliculas, args.consultas, args.semilla)
+    for nombre, resultado in reporte.items():
+        estado = "OK" if not resultado["con_diferencias"] else f"{resultado['con_diferencias']} con diferencias"
+        print(f"{nombre:16} ({resultado['preset']}): {resultado['catalogos']} catálogos, {estado}")
+        if resultado["reproduccion"] is not None:
+            reproduccion = resultado["reproduccion"]
+            print(f"  mínimo: {len(reproduccion['catalogo'])} películas, diferencia de tipo {reproduccion['diferencia']['tipo']}")
+            print("  " + json.dumps(reproduccion, ensure_ascii=False, default=str))
+    if args.reproduccion:
+        with open(args.reproduccion, mode="w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+    if any(resultado["con_diferencias"] for resultado in reporte.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
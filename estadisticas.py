@@ -0,0 +1,200 @@
+"""
+Estadísticas de la forma del grafo: distribución de grados, histograma de pesos, películas aisladas
+y componentes conexas para cada umbral de peso.
+
+    python estadisticas.py --salida estadisticas.json
+
+Los histogramas salen de una sola pasada por Grafo.aristas. Las componentes se calculan con
+union-find (unión por tamaño y compresión de caminos): las aristas se agrupan por peso y se unen
+de la de mayor peso a la de menor, así que las componentes de todos los umbrales cuestan lo mismo
+que las de uno solo, O(aristas * α(películas)).
+
+En las listas de Grafo.aristas una misma conexión aparece varias veces (generar_conexiones la
+agrega desde ambos extremos). Aquí cada par de películas conectadas cuenta como una arista, con el
+mayor peso que tenga en las listas, y se toma desde la película de menor fila (el grafo es simétrico).
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+from array import array
+from collections import Counter, defaultdict
+
+TAMAÑOS_REPORTADOS = 10  # Tamaños de las componentes más grandes que se incluyen en el reporte
+
+
+class UnionFind:
+    """Conjuntos disjuntos sobre los enteros 0..n-1."""
+
+    def __init__(self, n):
+        self.padre = array("i", range(n))
+        self.tamaño = array("i", [1] * n)
+        self.conjuntos = n
+
+    def encontrar(self, x):
+        padre = self.padre
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]  # Compresión a la mitad del camino
+            x = padre[x]
+        return x
+
+    def unir(self, a, b):
+        """Une los conjuntos de a y b. Devuelve True si estaban separados."""
+        a, b = self.encontrar(a), self.encontrar(b)
+        if a == b:
+            return False
+        if self.tamaño[a] < self.tamaño[b]:
+            a, b = b, a
+        self.padre[b] = a
+        self.tamaño[a] += self.tamaño[b]
+        self.conjuntos -= 1
+        return True
+
+    def tamaños(self):
+        """Tamaños de los conjuntos, de mayor a menor."""
+        return sorted((self.tamaño[x] for x in range(len(self.padre)) if self.padre[x] == x), reverse=True)
+
+
+def _rango_potencia(grado):
+    """Intervalo de potencias de dos que contiene al grado: "0", "1", "2-3", "4-7"..."""
+    if grado < 2:
+        return str(grado)
+    inferior = 1 << (grado.bit_length() - 1)
+    return f"{inferior}-{2 * inferior - 1}"
+
+
+def _resumen(valores_ordenados):
+    n = len(valores_ordenados)
+    if not n:
+        return {"minimo": 0, "maximo": 0, "medio": 0, "mediano": 0, "p90": 0, "p99": 0}
+    return {
+        "minimo": valores_ordenados[0],
+        "maximo": valores_ordenados[-1],
+        "medio": sum(valores_ordenados) / n,
+        "mediano": valores_ordenados[n // 2],
+        "p90": valores_ordenados[min(n - 1, int(0.9 * n))],
+        "p99": valores_ordenados[min(n - 1, int(0.99 * n))],
+    }
+
+
+def _resumen_histograma(histograma):
+    """Como _resumen, pero a partir de {valor: veces} sin expandir los valores."""
+    n = sum(histograma.values())
+    if not n:
+        return _resumen([])
+    valores = sorted(histograma)
+    resumen = {"minimo": valores[0], "maximo": valores[-1],
+               "medio": sum(valor * veces for valor, veces in histograma.items()) / n}
+    acumulado = 0
+    objetivos = [("mediano", n // 2), ("p90", min(n - 1, int(0.9 * n))), ("p99", min(n - 1, int(0.99 * n)))]
+    for valor in valores:
+        acumulado += histograma[valor]
+        while objetivos and objetivos[0][1] < acumulado:
+            resumen[objetivos.pop(0)[0]] = valor
+    return resumen
+
+
+def recorrer_aristas(grafo):
+    """
+    Una pasada por las listas de aristas. Devuelve (grados por fila, histograma de pesos, aristas por
+    peso, entradas en las listas): aristas por peso es {peso: array de filas (a, b) consecutivas}.
+    """
+    fila_de = grafo.nodos.fila_de
+    grados = array("i", [0] * len(grafo.nodos))
+    pesos = Counter()
+    por_peso = defaultdict(lambda: array("i"))
+    entradas = 0
+    for id_pelicula, vecinos in grafo.aristas.items():
+        fila = fila_de[id_pelicula]
+        entradas += len(vecinos)
+        mayor = {}  # Vecino -> mayor peso con él
+        for vecino, peso in vecinos:
+            if peso > mayor.get(vecino, peso - 1):
+                mayor[vecino] = peso
+        grados[fila] = len(mayor)
+        for vecino, peso in mayor.items():
+            fila_vecino = fila_de[vecino]
+            if fila < fila_vecino:
+                pesos[peso] += 1
+                par = por_peso[peso]
+                par.append(fila)
+                par.append(fila_vecino)
+    return grados, pesos, por_peso, entradas
+
+
+def componentes_por_umbral(n, por_peso):
+    """
+    Componentes conexas usando sólo las aristas con peso >= umbral, para cada peso presente.
+    Devuelve una lista ordenada por umbral creciente.
+    """
+    conjuntos = UnionFind(n)
+    resultados = []
+    aristas = 0
+    for peso in sorted(por_peso, reverse=True):
+        pares = por_peso[peso]
+        for k in range(0, len(pares), 2):
+            conjuntos.unir(pares[k], pares[k + 1])
+        aristas += len(pares) // 2
+        tamaños = conjuntos.tamaños()
+        resultados.append({
+            "umbral": peso,
+            "aristas": aristas,
+            "componentes": conjuntos.conjuntos,
+            "aisladas": sum(1 for t in tamaños if t == 1),
+            "mayor": tamaños[0] if tamaños else 0,
+            "fraccion_en_la_mayor": tamaños[0] / n if n else 0,
+            "tamaños_mayores": tamaños[:TAMAÑOS_REPORTADOS],
+        })
+    resultados.reverse()
+    return resultados
+
+
+def estadisticas(grafo):
+    """Calcula el reporte completo del grafo como un diccionario serializable a JSON."""
+    inicio = time.perf_counter()
+    grados, pesos, por_peso, entradas = recorrer_aristas(grafo)
+    segundos_pasada = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    componentes = componentes_por_umbral(len(grados), por_peso)
+    segundos_componentes = time.perf_counter() - inicio
+
+    ordenados = sorted(grados)
+    rangos = Counter(_rango_potencia(grado) for grado in grados)
+    total_aristas = sum(pesos.values())
+    return {
+        "peliculas": len(grados),
+        "aristas": total_aristas,
+        "entradas_en_listas": entradas,
+        "densidad": 2 * total_aristas / (len(grados) * (len(grados) - 1)) if len(grados) > 1 else 0,
+        "aisladas": rangos.get("0", 0),
+        "grado": dict(_resumen(ordenados),
+                      histograma=dict(sorted(rangos.items(), key=lambda par: int(par[0].split("-")[0])))),
+        "peso": dict(_resumen_histograma(pesos),
+                     histograma={str(peso): veces for peso, veces in sorted(pesos.items())}),
+        "componentes_por_umbral": componentes,
+        "segundos": {"pasada": segundos_pasada, "componentes": segundos_componentes},
+    }
+
+
+def main():
+    from GrafoM import obtener_grafo
+
+    parser = argparse.ArgumentParser(description="Reporte JSON de grados, pesos y componentes conexas del grafo.")
+    parser.add_argument("--archivo", default="muestralimpia.txt")
+    parser.add_argument("--salida", help="Archivo JSON del reporte (por defecto, la salida estándar)")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):  # Los avisos de la carga no deben mezclarse con el JSON
+        grafo = obtener_grafo(args.archivo)
+    reporte = estadisticas(grafo)
+    texto = json.dumps(reporte, ensure_ascii=False, indent=2)
+    if args.salida:
+        with open(args.salida, mode="w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+if __name__ == "__main__":
+    main()
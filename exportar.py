@@ -0,0 +1,161 @@
+"""
+Exportación del grafo a archivos que pueden leer otras herramientas de grafos, escribiendo por
+partes (sin armar el texto completo en memoria):
+
+    python exportar.py aristas.tsv                 # Lista de aristas: origen, destino, peso
+    python exportar.py aristas.bin                 # La misma lista en binario, registros de tamaño fijo
+    python exportar.py grafo.graphml --umbral 3    # GraphML con los atributos de las películas
+
+Cada arista se escribe una sola vez, desde la película de menor fila, con el mayor peso que tenga en
+las listas de Grafo.aristas (donde aparece repetida). La memoria extra es la de los vecinos de una
+película a la vez, sin importar cuántas aristas tenga el grafo.
+
+Formato binario: la cabecera MAGIA_BINARIO y la cantidad de aristas (uint64), seguidas de un registro
+little-endian por arista con el id de origen y el de destino (int64) y el peso (float64).
+"""
+import argparse
+import contextlib
+import struct
+import sys
+import time
+from xml.sax.saxutils import escape
+
+MAGIA_BINARIO = b"GRAFOAR1"
+CABECERA = struct.Struct("<8sQ")
+REGISTRO = struct.Struct("<qqd")
+TAMAÑO_BUFER = 1 << 20  # Bytes del búfer de escritura de los archivos
+
+# Atributos de las películas en GraphML: clave -> (nombre del campo en almacen.info, tipo GraphML)
+ATRIBUTOS_GRAPHML = {
+    "titulo": ("titulo", "string"),
+    "tconst": ("tconst", "string"),
+    "rating": ("rating", "double"),
+    "votos": ("votos", "long"),
+    "duracion": ("duracion", "long"),
+    "director": ("director", "string"),
+    "genero": ("genero", "string"),
+    "anio": ("año", "long"),  # Los nombres de atributos en XML no deberían llevar ñ
+}
+
+
+def aristas_unicas(grafo, umbral_peso=None):
+    """
+    Genera cada arista una vez como (id origen, id destino, peso), recorriendo las películas en orden
+    de fila. Con umbral_peso sólo se generan las aristas con al menos ese peso.
+    """
+    almacen = grafo.nodos
+    fila_de = almacen.fila_de
+    for fila, id_pelicula in enumerate(almacen.ids):
+        vecinos = grafo.aristas.get(id_pelicula)
+        if not vecinos:
+            continue
+        mayor = {}  # Vecino posterior -> mayor peso con él
+        for vecino, peso in vecinos:
+            if fila_de[vecino] > fila and peso > mayor.get(vecino, peso - 1):
+                mayor[vecino] = peso
+        for vecino, peso in mayor.items():
+            if umbral_peso is None or peso >= umbral_peso:
+                yield id_pelicula, vecino, peso
+
+
+def exportar_tsv(grafo, ruta, umbral_peso=None):
+    """Escribe la lista de aristas separada por tabulaciones, con encabezado. Devuelve cuántas escribió."""
+    escritas = 0
+    with open(ruta, mode="w", encoding="utf-8", newline="\n", buffering=TAMAÑO_BUFER) as f:
+        f.write("origen\tdestino\tpeso\n")
+        escribir = f.write
+        for origen, destino, peso in aristas_unicas(grafo, umbral_peso):
+            escribir(f"{origen}\t{destino}\t{peso}\n")
+            escritas += 1
+    return escritas
+
+
+def exportar_binario(grafo, ruta, umbral_peso=None):
+    """Escribe la lista de aristas en el formato binario del módulo. Devuelve cuántas escribió."""
+    escritas = 0
+    with open(ruta, mode="wb", buffering=TAMAÑO_BUFER) as f:
+        f.write(CABECERA.pack(MAGIA_BINARIO, 0))  # La cantidad se corrige al terminar
+        escribir, empaquetar = f.write, REGISTRO.pack
+        for origen, destino, peso in aristas_unicas(grafo, umbral_peso):
+            escribir(empaquetar(origen, destino, peso))
+            escritas += 1
+        f.seek(0)
+        f.write(CABECERA.pack(MAGIA_BINARIO, escritas))
+    return escritas
+
+
+def leer_binario(ruta):
+    """Genera las aristas (id origen, id destino, peso) de un archivo de exportar_binario."""
+    with open(ruta, mode="rb") as f:
+        magia, cantidad = CABECERA.unpack(f.read(CABECERA.size))
+        if magia != MAGIA_BINARIO:
+            raise ValueError(f"{ruta} no es una lista de aristas binaria de este módulo.")
+        bloque = REGISTRO.size * 4096
+        leidas = 0
+        while True:
+            datos = f.read(bloque)
+            if not datos:
+                break
+            for registro in REGISTRO.iter_unpack(datos):
+                yield registro
+                leidas += 1
+        if leidas != cantidad:
+            raise ValueError(f"{ruta} está incompleto: tiene {leidas} de {cantidad} aristas.")
+
+
+def exportar_graphml(grafo, ruta, umbral_peso=None):
+    """Escribe el grafo (no dirigido) en GraphML, con los atributos de las películas. Devuelve cuántas aristas escribió."""
+    almacen = grafo.nodos
+    escritas = 0
+    with open(ruta, mode="w", encoding="utf-8", newline="\n", buffering=TAMAÑO_BUFER) as f:
+        escribir = f.write
+        escribir('<?xml version="1.0" encoding="UTF-8"?>\n'
+                 '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        for clave, (_, tipo) in ATRIBUTOS_GRAPHML.items():
+            escribir(f'  <key id="{clave}" for="node" attr.name="{clave}" attr.type="{tipo}"/>\n')
+        escribir('  <key id="peso" for="edge" attr.name="peso" attr.type="double"/>\n'
+                 '  <graph id="peliculas" edgedefault="undirected">\n')
+
+        for fila, id_pelicula in enumerate(almacen.ids):
+            info = almacen.info(fila)
+            info["genero"] = ", ".join(info["genero"])
+            escribir(f'    <node id="n{id_pelicula}">')
+            for clave, (campo, _) in ATRIBUTOS_GRAPHML.items():
+                if info[campo] is not None:
+                    escribir(f'<data key="{clave}">{escape(str(info[campo]))}</data>')
+            escribir("</node>\n")
+
+        for origen, destino, peso in aristas_unicas(grafo, umbral_peso):
+            escribir(f'    <edge source="n{origen}" target="n{destino}"><data key="peso">{peso}</data></edge>\n')
+            escritas += 1
+        escribir("  </graph>\n</graphml>\n")
+    return escritas
+
+
+EXPORTADORES = {"tsv": exportar_tsv, "binario": exportar_binario, "graphml": exportar_graphml}
+EXTENSIONES = {".tsv": "tsv", ".txt": "tsv", ".bin": "binario", ".graphml": "graphml", ".xml": "graphml"}
+
+
+def main():
+    from GrafoM import obtener_grafo
+
+    parser = argparse.ArgumentParser(description="Exporta las aristas del grafo a TSV, binario o GraphML.")
+    parser.add_argument("salida", help="Archivo de salida; el formato se deduce de la extensión")
+    parser.add_argument("--formato", choices=sorted(EXPORTADORES))
+    parser.add_argument("--umbral", type=float, help="Exportar sólo las aristas con al menos este peso")
+    parser.add_argument("--archivo", default="muestralimpia.txt", help="Archivo de películas")
+    args = parser.parse_args()
+
+    formato = args.formato or next((f for ext, f in EXTENSIONES.items() if args.salida.endswith(ext)), None)
+    if formato is None:
+        parser.error("No se reconoce la extensión del archivo de salida; indique --formato.")
+
+    with contextlib.redirect_stdout(sys.stderr):
+        grafo = obtener_grafo(args.archivo)
+    inicio = time.perf_counter()
+    escritas = EXPORTADORES[formato](grafo, args.salida, args.umbral)
+    print(f"{escritas} aristas exportadas a {args.salida} ({formato}) en {time.perf_counter() - inicio:.2f} s",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
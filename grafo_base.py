@@ -0,0 +1,234 @@
+"""
+Parte del Grafo que comparten GrafoM.py y Proyecto_final_Algortimos_main.py: aristas generadas con las
+reglas de reglas.py, explicación de conexiones, vecinos y representaciones del grafo. Cada copia sólo
+define su preset de reglas (PRESET), cómo agrega y carga películas y sus búsquedas.
+"""
+import threading
+from collections import OrderedDict, defaultdict
+from almacen import AlmacenPeliculas
+from instrumentacion import instrumentacion
+from reglas import compilar_reglas
+
+MAX_CACHE_PESOS = 100_000  # Pares (vecino, peso) guardados a la vez en la caché de vecinos, entre todas las películas
+
+
+class _CacheVecinos:
+    """
+    {id: {vecino: mayor peso}} de las últimas películas pedidas, con a lo sumo MAX_CACHE_PESOS pares en
+    total (así la memoria no depende del grado de las películas): al pasarse salen las más antiguas.
+    """
+
+    def __init__(self):
+        self.pesos = OrderedDict()
+        self.entradas = 0  # Pares guardados entre todas las películas
+        self._candado = threading.Lock()  # Varios hilos pueden consultar la misma instantánea
+
+    def __reduce__(self):
+        # El candado no se puede serializar y la caché no hace falta guardarla: se carga vacía
+        return (_CacheVecinos, ())
+
+    def get(self, id_pelicula):
+        return self.pesos.get(id_pelicula)
+
+    def guardar(self, id_pelicula, pesos):
+        with self._candado:
+            if id_pelicula in self.pesos or len(pesos) > MAX_CACHE_PESOS:
+                return
+            while self.entradas + len(pesos) > MAX_CACHE_PESOS:
+                _, viejos = self.pesos.popitem(last=False)
+                self.entradas -= len(viejos)
+            self.pesos[id_pelicula] = pesos
+            self.entradas += len(pesos)
+
+
+class GrafoBase:
+    PRESET = "principal"  # Reglas de conexión por defecto (nombre de un preset de reglas.py)
+
+    def __init__(self, reglas=None):
+        self.reglas = compilar_reglas(self.PRESET if reglas is None else reglas)  # Reglas de conexión compiladas
+        self.nodos = AlmacenPeliculas()  # Almacena los nodos con su información (por columnas), por id
+        self.aristas = defaultdict(list)  # Almacena las conexiones entre nodos (id -> [(id vecino, peso)])
+        self.titulo_a_ids = defaultdict(list)  # Diccionario de título a los ids de las películas con ese título
+        self.contador_nodos = 0  # Contador para asignar ids locales a las películas sin tconst
+        self.generacion = 0  # Versión del grafo; GrafoConcurrente la incrementa en cada escritura publicada
+        self.version_aristas = 0  # Aumenta con cada cambio de las aristas, para invalidar cache_vecinos
+        self.cache_vecinos = (0, _CacheVecinos())  # (versión de las aristas, {id: {vecino: mayor peso}})
+
+    def ids_pelicula(self, pelicula):
+        """
+        Devuelve los ids de las películas con el título dado (puede haber varias, como los remakes).
+        También acepta un id, y entonces devuelve [id] si la película existe.
+        """
+        if isinstance(pelicula, int):
+            return [pelicula] if pelicula in self.nodos else []
+        return self.titulo_a_ids.get(pelicula, [])
+
+    def agregar_arista(self, id1, id2, peso):
+        """Conecta dos películas (por id) con un peso que indica la similitud."""
+        if id1 in self.nodos and id2 in self.nodos:
+            self.aristas[id1].append((id2, peso))
+            self.aristas[id2].append((id1, peso))  # Conectamos en el sentido inverso (Grafo no dirigido)
+            self.version_aristas += 1
+        else:
+            raise ValueError("Ambas películas deben existir en el grafo.")
+
+    def validar_numero(self, valor):
+        """Devuelve el número si es válido, o 0 si es vacío o inválido."""
+        try:
+            return int(valor) if valor.strip() != "" else 0
+        except ValueError:
+            return 0  # Si no se puede convertir, retorna 0 (o algún valor predeterminado)
+
+    @instrumentacion.medir("generar_conexiones")
+    def generar_conexiones(self):
+        """Genera conexiones entre películas basadas en sus atributos, con las reglas del grafo."""
+        listas, emitidas = self.reglas.conexiones(self.nodos)
+        aristas = self.aristas
+        for id_pelicula, vecinos in zip(self.nodos.ids, listas):
+            if vecinos:
+                if id_pelicula in aristas:
+                    aristas[id_pelicula].extend(vecinos)
+                else:
+                    aristas[id_pelicula] = vecinos
+        self.version_aristas += 1
+
+        # Las reglas son simétricas: cada par no ordenado se puntúa una sola vez y cuenta como una arista
+        instrumentacion.contar("generar_conexiones.pares_evaluados", len(self.nodos) * (len(self.nodos) - 1) // 2)
+        instrumentacion.contar("generar_conexiones.aristas_emitidas", emitidas)
+
+    def cambiar_reglas(self, reglas):
+        """
+        Cambia las reglas de conexión (lista de reglas, nombre de preset o reglas ya compiladas) y
+        vuelve a puntuar todas las aristas desde los atributos ya cargados, sin releer el archivo.
+        """
+        self.reglas = compilar_reglas(reglas)
+        self.aristas = defaultdict(list)
+        self.generar_conexiones()
+
+    def conectar_pelicula(self, id_pelicula):
+        """
+        Genera las conexiones de una sola película con todas las demás, con las mismas reglas que
+        generar_conexiones, para agregar películas sin recalcular todos los pares. Igual que en
+        generar_conexiones (que recorre cada par en ambos órdenes) cada conexión queda dos veces
+        en la lista de cada película.
+        """
+        ids = self.nodos.ids
+        i = self.nodos.fila_de[id_pelicula]
+        for j, peso in enumerate(self.reglas.pesos_fila(self.nodos, i)):
+            if i != j and peso > 0:
+                for _ in range(2):
+                    self.aristas[id_pelicula].append((ids[j], peso))
+                    self.aristas[ids[j]].append((id_pelicula, peso))
+        self.version_aristas += 1
+
+    def desconectar_pelicula(self, id_pelicula):
+        """Quita todas las conexiones de una película, de su propia lista y de las de sus vecinos."""
+        vecinos = self.aristas.pop(id_pelicula, [])
+        for vecino in {vecino for vecino, _ in vecinos if vecino != id_pelicula}:
+            self.aristas[vecino] = [(v, peso) for v, peso in self.aristas.get(vecino, []) if v != id_pelicula]
+        self.version_aristas += 1
+
+    def explicar_conexion(self, id1, id2):
+        """
+        Devuelve las reglas que aportan peso a la conexión entre dos películas (por id), como una
+        lista de (regla, peso). La suma de los pesos es el peso de la arista.
+        """
+        return self.reglas.explicar(self.nodos, self.nodos.fila_de[id1], self.nodos.fila_de[id2])
+
+    def obtener_vecinos(self, id_pelicula):
+        """Devuelve las películas conectadas a la película dada, como pares (id, peso)."""
+        return self.aristas.get(id_pelicula, [])
+
+    def pesos_vecinos(self, id_pelicula):
+        """
+        Devuelve {vecino: mayor peso} de la película, para consultar el peso de un par en O(1).
+        Se arma la primera vez que se pide (recorriendo su lista) y se guarda hasta que cambien las
+        aristas del grafo, con a lo sumo MAX_CACHE_PESOS pares entre todas las películas guardadas.
+        """
+        version, cache = self.cache_vecinos
+        if version != self.version_aristas:
+            # Caché nueva y no vaciar la vieja: una instantánea anterior de GrafoConcurrente puede compartirla
+            cache = _CacheVecinos()
+            self.cache_vecinos = (self.version_aristas, cache)
+        pesos = cache.get(id_pelicula)
+        if pesos is None:
+            pesos = {}
+            for vecino, peso in self.aristas.get(id_pelicula, []):
+                if peso > pesos.get(vecino, peso - 1):
+                    pesos[vecino] = peso
+            cache.guardar(id_pelicula, pesos)
+        return pesos
+
+    def buscar_pelicula(self, pelicula):
+        """Devuelve la información de una película (por título o id). Si varias comparten el título, la primera."""
+        ids = self.ids_pelicula(pelicula)
+        return self.nodos[ids[0]] if ids else None
+
+    def mostrar_grafo(self):
+        """Muestra el grafo completo en una sola línea."""
+        for id_pelicula, vecinos in self.aristas.items():
+            titulo = self.nodos.titulo(id_pelicula)
+            # Creamos una lista para almacenar todas las conexiones
+            conexiones = []
+            for vecino, peso in vecinos:
+                # Añadimos las conexiones en formato "titulo -> vecino (peso)"
+                conexiones.append(f"{titulo} -> {self.nodos.titulo(vecino)} (peso: {peso})")
+
+            # Imprimimos todas las conexiones de ese nodo en una sola línea
+            if conexiones:
+                print(", ".join(conexiones))
+
+    # Representación matricial del grafo
+    @instrumentacion.medir("matriz_adyacencia")
+    def matriz_adyacencia(self):
+        """Genera la matriz de adyacencia del grafo."""
+        # Inicializamos una matriz NxN llena de ceros
+        n = len(self.nodos)
+        matriz = [[0] * n for _ in range(n)]
+
+        # Llenamos la matriz con los pesos de las aristas; el índice de cada película es su fila en el almacén
+        fila_de = self.nodos.fila_de
+        for p1, vecinos in self.aristas.items():  # Iteramos sobre los nodos
+            indice1 = fila_de[p1]
+            for p2, peso in vecinos:
+                indice2 = fila_de[p2]
+                matriz[indice1][indice2] = peso
+                matriz[indice2][indice1] = peso  # Rellenamos a modo espejo (Grafo no dirigido)
+
+        return matriz
+
+    # Mostrar la matriz de adyacencia
+    def mostrar_matriz_adyacencia(self):
+        """Muestra la matriz de adyacencia del grafo."""
+        matriz = self.matriz_adyacencia()
+        for fila in matriz:
+            print(fila)
+
+    def num_nodos(self):
+        """Devuelve el número de nodos en el grafo."""
+        return len(self.nodos)
+
+    def obtener_indice_pelicula(self, pelicula):
+        """
+        Devuelve el índice (0..n-1) de la película dada por título o id, o None si no se encuentra.
+        Si varias películas comparten el título devuelve el de la primera.
+        """
+        ids = self.ids_pelicula(pelicula)
+        return self.nodos.fila_de[ids[0]] if ids else None
+
+    def lista_adyacencia(self):
+        """
+        Devuelve la lista de adyacencia por índice: una lista donde la posición i es un
+        diccionario {índice del vecino: peso} de la película con índice i. Si un par aparece varias
+        veces con pesos distintos se queda el mayor, como en estadisticas.py y exportar.py.
+        El id y el título del índice i son self.nodos.ids[i] y self.nodos.titulos[i].
+        """
+        fila_de = self.nodos.fila_de
+        adyacencia = [{} for _ in range(len(self.nodos))]
+        for id_pelicula, vecinos in self.aristas.items():
+            fila = adyacencia[fila_de[id_pelicula]]
+            for vecino, peso in vecinos:
+                indice2 = fila_de[vecino]
+                if peso > fila.get(indice2, peso - 1):
+                    fila[indice2] = peso
+        return adyacencia
@@ -0,0 +1,209 @@
+import bisect # Búsqueda binaria sobre la lista ordenada de títulos
+import heapq # Para quedarnos con los mejores candidatos sin ordenar todos
+from collections import defaultdict # Listas de apariciones por trigrama
+
+
+def normalizar(titulo):
+    """Pasa el título a minúsculas y colapsa los espacios."""
+    return " ".join(titulo.lower().split())
+
+
+def trigramas(texto):
+    """Devuelve el conjunto de trigramas del texto (con relleno en los bordes)."""
+    texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def distancia_edicion(a, b, limite=None):
+    """
+    Distancia de Levenshtein entre dos cadenas.
+    Si se da `limite`, sólo se calcula la banda diagonal de ese ancho y se devuelve limite + 1
+    en cuanto la distancia lo supera.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limite is None:
+        limite = len(a)
+    if len(a) - len(b) > limite:
+        return limite + 1
+
+    fuera = limite + 1  # Valor para las celdas fuera de la banda
+    anterior = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        desde = max(1, i - limite)
+        hasta = min(len(b), i + limite)
+        actual = [fuera] * (len(b) + 1)
+        actual[0] = i if i <= limite else fuera
+        minimo = actual[0]
+        # Comparaciones sueltas en lugar de min(): es el ciclo más caliente de la búsqueda aproximada
+        izquierda, diagonal = actual[desde - 1], anterior[desde - 1]
+        for j in range(desde, hasta + 1):
+            arriba = anterior[j]
+            valor = diagonal if ca == b[j - 1] else diagonal + 1  # Sustitución
+            if arriba + 1 < valor:                                # Borrado
+                valor = arriba + 1
+            if izquierda + 1 < valor:                             # Inserción
+                valor = izquierda + 1
+            actual[j] = izquierda = valor
+            diagonal = arriba
+            if valor < minimo:
+                minimo = valor
+        if minimo > limite:
+            return limite + 1
+        anterior = actual
+    return min(anterior[-1], limite + 1)
+
+
+class IndiceTitulos:
+    """
+    Índice de títulos para resolver búsquedas exactas, por prefijo y aproximadas.
+    Los resultados se ordenan: coincidencias exactas, luego prefijos y al final los títulos parecidos.
+    """
+
+    def __init__(self, titulos, max_apariciones=1000, max_candidatos=10):
+        self.titulos = list(titulos)  # Títulos originales, el índice de la lista es su identificador
+        self.normalizados = [normalizar(t) for t in self.titulos]
+        self.max_apariciones = max_apariciones  # Presupuesto de apariciones recorridas por consulta
+        self.max_candidatos = max_candidatos  # Candidatos aproximados a los que se calcula la distancia
+
+        # Título normalizado -> identificadores (varios títulos pueden normalizarse igual)
+        self.exactos = defaultdict(list)
+        for i, norm in enumerate(self.normalizados):
+            self.exactos[norm].append(i)
+
+        # Lista ordenada para búsquedas por prefijo con bisect
+        self.orden = sorted(range(len(self.titulos)), key=lambda i: self.normalizados[i])
+        self.claves_ordenadas = [self.normalizados[i] for i in self.orden]
+
+        # Trigrama -> identificadores de los títulos que lo contienen
+        self.apariciones = defaultdict(list)
+        for i, norm in enumerate(self.normalizados):
+            for tri in trigramas(norm):
+                self.apariciones[tri].append(i)
+
+    def __len__(self):
+        return len(self.titulos)
+
+    def buscar_exacto(self, consulta, limite=5):
+        """Devuelve los títulos que coinciden exactamente (sin importar mayúsculas ni espacios)."""
+        ids = self.exactos.get(normalizar(consulta), [])
+        # El título escrito tal cual va antes que sus variantes de mayúsculas
+        ids = sorted(ids, key=lambda i: self.titulos[i] != consulta)
+        return [self.titulos[i] for i in ids[:limite]]
+
+    def buscar_prefijo(self, consulta, limite=5):
+        """Devuelve hasta `limite` títulos que empiezan por la consulta, los más cortos primero."""
+        prefijo = normalizar(consulta)
+        if not prefijo:
+            return []
+        inicio = bisect.bisect_left(self.claves_ordenadas, prefijo)
+        ids = []
+        for pos in range(inicio, len(self.claves_ordenadas)):
+            if not self.claves_ordenadas[pos].startswith(prefijo):
+                break
+            ids.append(self.orden[pos])
+            if len(ids) >= limite * 4:  # Basta con unos pocos para elegir los más cortos
+                break
+        ids.sort(key=lambda i: (len(self.normalizados[i]), self.normalizados[i]))
+        return [self.titulos[i] for i in ids[:limite]]
+
+    def buscar_aproximado(self, consulta, limite=5):
+        """
+        Devuelve hasta `limite` títulos parecidos a la consulta.
+        Los candidatos salen de los trigramas compartidos y se ordenan por distancia de edición.
+        """
+        norm = normalizar(consulta)
+        if not norm:
+            return []
+
+        # Recorremos primero los trigramas más raros, que son los que más discriminan,
+        # hasta agotar el presupuesto de apariciones
+        propios = trigramas(norm)
+        tris = sorted((t for t in propios if t in self.apariciones),
+                      key=lambda t: len(self.apariciones[t]))
+        conteo = defaultdict(int)
+        recorridas = completos = 0
+        for tri in tris:
+            lista = self.apariciones[tri]
+            if recorridas and recorridas + len(lista) > self.max_apariciones:
+                break
+            for i in lista[:self.max_apariciones]:
+                conteo[i] += 1
+            recorridas += len(lista)
+            completos += len(lista) <= self.max_apariciones
+        # Si se recorrieron todos los trigramas, conteo[i] es exactamente cuántos comparte cada título.
+        # Cada edición quita a lo sumo 3 trigramas, así que la distancia es al menos (faltantes / 3)
+        exacto = completos == len(tris)
+        if not conteo:
+            return []
+
+        # Preseleccionamos por trigramas compartidos y ordenamos por similitud de Jaccard aproximada
+        n_tris = len(tris)
+        # (a igual número de trigramas, preferimos los títulos más cortos)
+        normalizados = self.normalizados
+        # Agrupar por conteo es más barato que ordenar todas las apariciones con una clave compuesta
+        por_conteo = defaultdict(list)
+        for i, c in conteo.items():
+            por_conteo[c].append(i)
+        cupo = self.max_candidatos * 4
+        preseleccion = []
+        for c in sorted(por_conteo, reverse=True):
+            ids = por_conteo[c]
+            if len(preseleccion) + len(ids) > cupo:
+                ids = heapq.nsmallest(cupo - len(preseleccion), ids, key=lambda i: len(normalizados[i]))
+            preseleccion.extend((i, c) for i in ids)
+            if len(preseleccion) >= cupo:
+                break
+        similitud = {i: c / (n_tris + len(self.normalizados[i]) + 1 - c) for i, c in preseleccion}
+        mejores = heapq.nlargest(self.max_candidatos, similitud, key=similitud.get)
+
+        limite_distancia = max(2, len(norm) // 3)
+        puntuados = []  # Los mejores `limite` hasta ahora, ordenados
+        for i in mejores:  # De mayor a menor similitud
+            # Con `limite` títulos ya puntuados, uno menos similar sólo entra si está más cerca que el peor
+            cota = limite_distancia if len(puntuados) < limite else puntuados[-1][0] - 1
+            if cota < 0:
+                break
+            candidato = self.normalizados[i]
+            diferencia = len(candidato) - len(norm)
+            if diferencia < -cota:
+                continue  # Demasiado corto para estar a esa distancia: ni siquiera calculamos la distancia
+            # Si es demasiado largo la distancia completa no puede alcanzar; sólo queda la coincidencia parcial
+            if diferencia > cota or (exacto and len(propios) - conteo[i] > 3 * cota):
+                distancia = cota + 1
+            else:
+                distancia = distancia_edicion(norm, candidato, cota)
+            if distancia > cota and diferencia > 0:
+                # Para consultas parciales: contenida en el título o parecida a su inicio, siempre que
+                # la distancia completa supere limite_distancia
+                parcial = 1 if norm in candidato else distancia_edicion(norm, candidato[:len(norm)], cota) + 1
+                if parcial <= cota and (cota == limite_distancia or
+                                        distancia_edicion(norm, candidato, limite_distancia) > limite_distancia):
+                    distancia = parcial
+            if distancia <= cota:
+                bisect.insort(puntuados, (distancia, -similitud[i], i))
+                del puntuados[limite:]
+        return [self.titulos[i] for _, _, i in puntuados]
+
+    def buscar(self, consulta, limite=5, completar=False):
+        """
+        Combina las tres búsquedas: exactas primero, luego prefijos y luego aproximadas. Con una
+        coincidencia exacta o por prefijo se devuelve en seguida, sin buscar títulos parecidos; con
+        completar=True se sigue buscando hasta juntar `limite` títulos.
+        """
+        resultados = []
+        vistos = set()
+        for busqueda in (self.buscar_exacto, self.buscar_prefijo, self.buscar_aproximado):
+            if len(resultados) >= limite or (resultados and not completar):
+                break
+            for titulo in busqueda(consulta, limite):
+                if titulo not in vistos:
+                    vistos.add(titulo)
+                    resultados.append(titulo)
+        return resultados[:limite]
+
+    def resolver(self, consulta):
+        """Devuelve el mejor título para la consulta, o None si no hay ninguno parecido."""
+        resultados = self.buscar(consulta, limite=1)
+        return resultados[0] if resultados else None
@@ -0,0 +1,209 @@
+"""
+Contadores e histogramas de latencia para los métodos del grafo.
+
+La instrumentación está apagada por defecto: cada método decorado sólo revisa un atributo antes de
+llamar a la función original. Se enciende con `instrumentacion.activar()` o desde la línea de comandos:
+
+    python instrumentacion.py muestralimpia.txt --perfil --salida estadisticas.json
+
+Encendida, las mediciones se guardan con un candado, así que se puede usar desde varios hilos
+(por ejemplo `lotes.py --modo hilos`) sin perder cuentas.
+"""
+import argparse
+import cProfile
+import functools
+import io
+import json
+import math
+import pstats
+import threading
+import time
+from collections import defaultdict
+
+CUBETAS = 40  # Cubetas del histograma: la cubeta b guarda las llamadas de menos de 2^b microsegundos
+
+
+class _SeccionNula:
+    """Contexto que no hace nada, para cuando la instrumentación está apagada."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+
+class _Seccion:
+    def __init__(self, instrumentacion, nombre):
+        self.instrumentacion = instrumentacion
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.instrumentacion.registrar(self.nombre, time.perf_counter() - self.inicio)
+        return False
+
+
+class Instrumentacion:
+    """Registro de llamadas, latencias y contadores por nombre de método o sección."""
+
+    def __init__(self):
+        self.activa = False
+        self.perfil = None  # cProfile.Profile cuando se activa con perfil=True
+        self._candado = threading.Lock()  # Los += de los contadores no son atómicos entre hilos
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Borra todas las mediciones."""
+        with self._candado:
+            self._vaciar()
+
+    def _vaciar(self):
+        self.llamadas = defaultdict(int)
+        self.segundos = defaultdict(float)
+        self.maximos = defaultdict(float)
+        self.histogramas = defaultdict(lambda: [0] * CUBETAS)
+        self.contadores = defaultdict(int)
+
+    def activar(self, perfil=False):
+        """Enciende la medición. Con perfil=True también se captura un perfil de cProfile."""
+        self.activa = True
+        if perfil:
+            self.perfil = cProfile.Profile()
+            self.perfil.enable()
+
+    def desactivar(self):
+        """Apaga la medición (las mediciones ya tomadas se conservan)."""
+        self.activa = False
+        if self.perfil is not None:
+            self.perfil.disable()
+
+    def registrar(self, nombre, segundos):
+        """Agrega una llamada de `segundos` de duración a las mediciones de `nombre`."""
+        microsegundos = segundos * 1e6
+        cubeta = 0 if microsegundos < 1 else min(CUBETAS - 1, int(math.log2(microsegundos)) + 1)
+        with self._candado:
+            self.llamadas[nombre] += 1
+            self.segundos[nombre] += segundos
+            if segundos > self.maximos[nombre]:
+                self.maximos[nombre] = segundos
+            self.histogramas[nombre][cubeta] += 1
+
+    def contar(self, nombre, cantidad=1):
+        """Suma `cantidad` al contador `nombre` (por ejemplo pares evaluados o aristas emitidas)."""
+        if self.activa:
+            with self._candado:
+                self.contadores[nombre] += cantidad
+
+    def medir(self, nombre):
+        """Decorador que registra la latencia de cada llamada a la función bajo `nombre`."""
+        def decorador(funcion):
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                if not self.activa:
+                    return funcion(*args, **kwargs)
+                inicio = time.perf_counter()
+                try:
+                    return funcion(*args, **kwargs)
+                finally:
+                    self.registrar(nombre, time.perf_counter() - inicio)
+            return envoltura
+        return decorador
+
+    def seccion(self, nombre):
+        """Contexto para medir una parte de un método: `with instrumentacion.seccion("nombre"):`."""
+        if not self.activa:
+            return _SECCION_NULA
+        return _Seccion(self, nombre)
+
+    @staticmethod
+    def _percentil(histograma, fraccion):
+        """Cota superior (en ms) del percentil dado, a partir del histograma."""
+        total = sum(histograma)
+        acumulado = 0
+        for cubeta, cantidad in enumerate(histograma):
+            acumulado += cantidad
+            if acumulado >= fraccion * total:
+                return (2 ** cubeta) / 1000
+        return None
+
+    def estadisticas(self):
+        """Devuelve un diccionario con las mediciones de cada método y los contadores."""
+        with self._candado:
+            return self._estadisticas()
+
+    def _estadisticas(self):
+        metodos = {}
+        for nombre in sorted(self.llamadas):
+            llamadas = self.llamadas[nombre]
+            histograma = self.histogramas[nombre]
+            metodos[nombre] = {
+                "llamadas": llamadas,
+                "segundos_total": self.segundos[nombre],
+                "ms_medio": 1000 * self.segundos[nombre] / llamadas,
+                "ms_maximo": 1000 * self.maximos[nombre],
+                "ms_p50": self._percentil(histograma, 0.5),
+                "ms_p99": self._percentil(histograma, 0.99),
+                # Histograma {cota superior en microsegundos: llamadas}, sin las cubetas vacías
+                "histograma_us": {2 ** b: c for b, c in enumerate(histograma) if c},
+            }
+        return {"metodos": metodos, "contadores": dict(self.contadores)}
+
+    def perfil_texto(self, lineas=25):
+        """Devuelve el resumen del perfil de cProfile ordenado por tiempo acumulado, o None."""
+        if self.perfil is None:
+            return None
+        salida = io.StringIO()
+        pstats.Stats(self.perfil, stream=salida).sort_stats("cumulative").print_stats(lineas)
+        return salida.getvalue()
+
+    def volcar(self, ruta):
+        """Guarda las estadísticas en un archivo JSON."""
+        with open(ruta, mode="w", encoding="utf-8") as f:
+            json.dump(self.estadisticas(), f, indent=2, ensure_ascii=False)
+
+
+_SECCION_NULA = _SeccionNula()
+instrumentacion = Instrumentacion()  # Instancia compartida que usan los métodos del grafo
+
+
+def main():
+    import random
+    from Proyecto_final_Algortimos_main import Grafo
+    # Al ejecutarse como script este archivo es __main__: usamos la instancia que importa el grafo
+    from instrumentacion import instrumentacion
+
+    parser = argparse.ArgumentParser(description="Mide carga, conexiones y búsquedas del grafo.")
+    parser.add_argument("archivo", nargs="?", default="muestralimpia.txt")
+    parser.add_argument("--codificacion", default="latin1")
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--perfil", action="store_true", help="Capturar también un perfil de cProfile")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar las estadísticas")
+    args = parser.parse_args()
+
+    instrumentacion.activar(perfil=args.perfil)
+    grafo = Grafo()
+    grafo.cargar_desde_txt(args.archivo, args.codificacion)
+
+    aleatorio = random.Random(0)
+    ids = list(grafo.nodos)
+    for _ in range(args.consultas):
+        info = grafo.nodos[aleatorio.choice(ids)]
+        grafo.busqueda_avanzada(genero=info["genero"][:1], año=info["año"])
+        grafo.busqueda_por_similitud(aleatorio.choice(ids))
+        grafo.busqueda_por_similitud_multiple(aleatorio.sample(ids, 3))
+    grafo.matriz_adyacencia()
+    instrumentacion.desactivar()
+
+    estadisticas = instrumentacion.estadisticas()
+    print(json.dumps(estadisticas, indent=2, ensure_ascii=False))
+    if args.salida:
+        instrumentacion.volcar(args.salida)
+    if args.perfil:
+        print(instrumentacion.perfil_texto())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Procesamiento por lotes, sin menú, de archivos JSONL de consultas.
+
+    python lotes.py consultas.jsonl --trabajadores 4 > resultados.jsonl
+
+Cada línea de entrada es una consulta de consultas.py ({"tipo": "similares", "titulo": ...},
+{"tipo": "avanzada", "criterios": {...}}, ...) o, como atajo, una lista de títulos semilla, que se
+resuelve con busqueda_por_similitud_multiple. Cada línea de salida es {"linea": n, ...resultado} en el
+mismo orden que la entrada, sin importar cuántos trabajadores haya. El rendimiento se reporta por stderr.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+from consultas import ejecutar_o_error
+
+BLOQUE = 5000  # Líneas que se reparten a la vez entre los trabajadores (limita la memoria con archivos grandes)
+
+_grafo = None  # Grafo de cada proceso trabajador
+
+
+def _cargar_grafo(archivo, codificacion):
+    from Proyecto_final_Algortimos_main import Grafo
+
+    grafo = Grafo()
+    # Los avisos de la carga van a stderr para no mezclarse con los resultados JSONL
+    with contextlib.redirect_stdout(sys.stderr):
+        grafo.cargar_desde_txt(archivo, codificacion)
+    return grafo
+
+
+def _iniciar_trabajador(archivo, codificacion):
+    """Carga el grafo en el trabajador, salvo que ya lo haya heredado del proceso principal (fork)."""
+    global _grafo
+    if _grafo is None:
+        _grafo = _cargar_grafo(archivo, codificacion)
+
+
+def _iniciar_procesos(trabajadores, archivo, codificacion):
+    """
+    Crea el pool de procesos y arranca sus trabajadores. Con fork heredan el grafo ya cargado: el heap
+    se congela sólo mientras se crean, para que el recolector de basura de cada trabajador no toque los
+    objetos del grafo (y copie sus páginas de memoria), sin dejar congelado al proceso que llama.
+    """
+    gc.collect()
+    gc.freeze()
+    try:
+        ejecutor = ProcessPoolExecutor(trabajadores, initializer=_iniciar_trabajador, initargs=(archivo, codificacion))
+        try:
+            ejecutor.submit(int).result()  # Con fork, el primer envío crea todos los trabajadores
+        except BaseException:
+            ejecutor.shutdown()
+            raise
+    finally:
+        gc.unfreeze()
+    return ejecutor
+
+
+def procesar_linea(numero, linea):
+    """
+    Ejecuta la consulta de una línea JSONL y devuelve (línea de salida ya serializada, si hubo error).
+    Cualquier excepción queda como el error de esa línea, sin detener el resto del lote.
+    """
+    try:
+        consulta = json.loads(linea)
+    except ValueError:
+        resultado = {"error": "La línea no es JSON válido."}
+    else:
+        if isinstance(consulta, list):  # Atajo: lista de títulos semilla
+            consulta = {"tipo": "similares_multiple", "titulos": consulta}
+        try:
+            resultado = ejecutar_o_error(_grafo, consulta)
+            return json.dumps({"linea": numero, **resultado}, ensure_ascii=False), "error" in resultado
+        except Exception as e:  # Un error inesperado en una consulta no debe tumbar el lote
+            resultado = {"error": f"{type(e).__name__}: {e}"}
+    return json.dumps({"linea": numero, **resultado}, ensure_ascii=False), True
+
+
+def _lineas(entrada):
+    """Numera las líneas no vacías de la entrada (empezando en 1)."""
+    for numero, linea in enumerate(entrada, start=1):
+        if linea.strip():
+            yield numero, linea
+
+
+def procesar(entrada, salida, archivo, codificacion, trabajadores, modo="procesos"):
+    """
+    Procesa las consultas de `entrada` con `trabajadores` procesos o hilos y escribe los resultados
+    en `salida` en el orden de entrada. Devuelve un diccionario con el rendimiento.
+    """
+    global _grafo
+    inicio = time.perf_counter()
+    _grafo = _cargar_grafo(archivo, codificacion)
+
+    if trabajadores <= 1:
+        ejecutor = None
+    elif modo == "hilos":
+        ejecutor = ThreadPoolExecutor(trabajadores)
+    else:
+        ejecutor = _iniciar_procesos(trabajadores, archivo, codificacion)
+    segundos_carga = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    consultas = errores = 0
+    pendientes = _lineas(entrada)
+    try:
+        while True:
+            bloque = list(islice(pendientes, BLOQUE))
+            if not bloque:
+                break
+            numeros, lineas = zip(*bloque)
+            if ejecutor is None:
+                resultados = map(procesar_linea, numeros, lineas)
+            else:
+                # map conserva el orden de entrada; los fragmentos reducen el costo de comunicación
+                fragmento = max(1, len(bloque) // (4 * trabajadores))
+                resultados = ejecutor.map(procesar_linea, numeros, lineas, chunksize=fragmento)
+            for resultado, hubo_error in resultados:
+                salida.write(resultado + "\n")
+                consultas += 1
+                errores += hubo_error
+    finally:
+        if ejecutor is not None:
+            ejecutor.shutdown()
+    segundos = time.perf_counter() - inicio
+    return {
+        "consultas": consultas,
+        "errores": errores,
+        "segundos_carga": segundos_carga,
+        "segundos_consultas": segundos,
+        "consultas_por_segundo": consultas / segundos if segundos else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecuta consultas JSONL sobre el grafo y escribe los resultados en JSONL.")
+    parser.add_argument("consultas", nargs="?", help="Archivo JSONL de consultas (por defecto, la entrada estándar)")
+    parser.add_argument("--archivo", default="muestralimpia.txt", help="Archivo de películas")
+    parser.add_argument("--codificacion", default="latin1")
+    parser.add_argument("--trabajadores", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--modo", choices=["procesos", "hilos"], default="procesos",
+                        help="Hilos sólo ayuda si las consultas liberan el GIL; los procesos escalan con los núcleos")
+    parser.add_argument("--salida", help="Archivo JSONL de resultados (por defecto, la salida estándar)")
+    args = parser.parse_args()
+
+    entrada = open(args.consultas, encoding="utf-8") if args.consultas else sys.stdin
+    salida = open(args.salida, mode="w", encoding="utf-8") if args.salida else sys.stdout
+    try:
+        rendimiento = procesar(entrada, salida, args.archivo, args.codificacion, args.trabajadores, args.modo)
+    finally:
+        if args.consultas:
+            entrada.close()
+        if args.salida:
+            salida.close()
+    print(f"{rendimiento['consultas']} consultas ({rendimiento['errores']} con error) en "
+          f"{rendimiento['segundos_consultas']:.2f} s con {args.trabajadores} {args.modo}: "
+          f"{rendimiento['consultas_por_segundo'] or 0:.0f} consultas/s "
+          f"(carga del grafo: {rendimiento['segundos_carga']:.1f} s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
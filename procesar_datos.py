@@ -51,7 +51,7 @@ def process_data():
         movies = pd.merge(title_basics, title_ratings, on="tconst", how="inner")
 
         # Filtrar columnas relevantes
-        movies = movies[["primaryTitle", "averageRating", "runtimeMinutes", "genres", "startYear"]]
+        movies = movies[["tconst", "primaryTitle", "averageRating", "runtimeMinutes", "genres", "startYear"]]
         movies.rename(columns={
             "primaryTitle": "Título",
             "averageRating": "Rating",
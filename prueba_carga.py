@@ -0,0 +1,175 @@
+"""
+Prueba de carga del servicio de recomendaciones (servicio.py) en localhost.
+
+    python servicio.py muestralimpia.txt &
+    python prueba_carga.py muestralimpia.txt --clientes 16 --peticiones 2000
+
+Cada cliente abre una conexión keep-alive y envía peticiones una tras otra, con una mezcla de
+similitud simple, múltiple, búsqueda avanzada y búsqueda de títulos armada con películas del archivo.
+Al final se reportan las peticiones por segundo y las latencias p50/p99 (en total y por ruta).
+"""
+import argparse
+import asyncio
+import csv
+import json
+import random
+import time
+from collections import defaultdict
+from urllib.parse import urlencode
+
+# Ruta -> fracción de las peticiones
+MEZCLA = [("/similares", 0.5), ("/similares_multiple", 0.2), ("/busqueda_avanzada", 0.2), ("/titulos", 0.1)]
+
+
+def leer_peliculas(archivo, codificacion):
+    """Devuelve (título, primer género, año) de cada fila del archivo de datos."""
+    with open(archivo, mode="r", encoding=codificacion) as f:
+        return [(fila["Título"], fila["Género"].split(",")[0], fila["Año"]) for fila in csv.DictReader(f, delimiter=";")]
+
+
+def generar_peticiones(peliculas, cantidad, lote, semilla):
+    """Arma la lista de peticiones (ruta, método, cuerpo) según MEZCLA; con lote > 0 las agrupa en /lote."""
+    aleatorio = random.Random(semilla)
+    rutas, pesos = zip(*MEZCLA)
+    peticiones = []
+    for _ in range(cantidad):
+        ruta = aleatorio.choices(rutas, pesos)[0]
+        titulo, genero, año = aleatorio.choice(peliculas)
+        if ruta == "/similares":
+            consulta = {"tipo": "similares", "titulo": titulo}
+        elif ruta == "/similares_multiple":
+            consulta = {"tipo": "similares_multiple", "titulos": [p[0] for p in aleatorio.sample(peliculas, 3)]}
+        elif ruta == "/busqueda_avanzada":
+            criterios = {"genero": [genero]}
+            if año.strip().isdigit():
+                criterios["año"] = int(año)
+            consulta = {"tipo": "avanzada", "criterios": criterios}
+        else:
+            consulta = {"tipo": "titulos", "consulta": titulo[:max(3, len(titulo) // 2)]}
+        peticiones.append((ruta, consulta))
+
+    if lote > 0:
+        return [("/lote", "POST", {"consultas": [c for _, c in peticiones[i:i + lote]]})
+                for i in range(0, len(peticiones), lote)]
+    resultado = []
+    for ruta, consulta in peticiones:
+        if ruta == "/titulos":
+            resultado.append((ruta, "GET", consulta))
+        else:
+            cuerpo = {k: v for k, v in consulta.items() if k != "tipo"}
+            resultado.append((ruta, "POST", cuerpo))
+    return resultado
+
+
+async def _enviar(lector, escritor, host, ruta, metodo, cuerpo):
+    """Envía una petición por la conexión abierta y devuelve el código de estado de la respuesta."""
+    if metodo == "GET":
+        objetivo = f"{ruta}?{urlencode({'q': cuerpo['consulta']})}"
+        datos = b""
+    else:
+        objetivo = ruta
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+    escritor.write(
+        f"{metodo} {objetivo} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(datos)}\r\n\r\n".encode("latin1") + datos
+    )
+    await escritor.drain()
+
+    estado = int((await lector.readline()).split()[1])
+    largo = 0
+    while True:
+        linea = await lector.readline()
+        if linea in (b"\r\n", b""):
+            break
+        nombre, _, valor = linea.decode("latin1").partition(":")
+        if nombre.strip().lower() == "content-length":
+            largo = int(valor)
+    await lector.readexactly(largo)
+    return estado
+
+
+async def _cliente(host, puerto, cola, latencias, errores):
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        while cola:
+            ruta, metodo, cuerpo = cola.pop()
+            inicio = time.perf_counter()
+            estado = await _enviar(lector, escritor, host, ruta, metodo, cuerpo)
+            latencias[ruta].append(time.perf_counter() - inicio)
+            if estado != 200:
+                errores[estado] += 1
+    finally:
+        escritor.close()
+
+
+def percentil(valores, fraccion):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not valores:
+        return None
+    return valores[min(len(valores) - 1, max(0, round(fraccion * len(valores)) - 1))]
+
+
+def _resumen(valores):
+    valores = sorted(valores)
+    return {
+        "peticiones": len(valores),
+        "ms_p50": 1000 * percentil(valores, 0.50),
+        "ms_p90": 1000 * percentil(valores, 0.90),
+        "ms_p99": 1000 * percentil(valores, 0.99),
+        "ms_maximo": 1000 * valores[-1],
+    }
+
+
+async def ejecutar(host, puerto, peticiones, clientes):
+    """Lanza los clientes concurrentes y devuelve el reporte de la prueba."""
+    cola = list(reversed(peticiones))  # Los clientes toman de la cola compartida (un solo hilo, sin candados)
+    latencias = defaultdict(list)
+    errores = defaultdict(int)
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(host, puerto, cola, latencias, errores) for _ in range(clientes)))
+    segundos = time.perf_counter() - inicio
+
+    todas = [l for valores in latencias.values() for l in valores]
+    return {
+        "clientes": clientes,
+        "segundos": segundos,
+        "qps": len(todas) / segundos if segundos else None,
+        "errores": dict(errores),
+        "total": _resumen(todas),
+        "por_ruta": {ruta: _resumen(valores) for ruta, valores in sorted(latencias.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de recomendaciones.")
+    parser.add_argument("archivo", nargs="?", default="muestralimpia.txt")
+    parser.add_argument("--codificacion", default="latin1")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--clientes", type=int, default=16, help="Conexiones concurrentes")
+    parser.add_argument("--peticiones", type=int, default=2000, help="Consultas en total")
+    parser.add_argument("--lote", type=int, default=0, help="Agrupar las consultas en lotes de este tamaño")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar el reporte")
+    args = parser.parse_args()
+
+    peticiones = generar_peticiones(leer_peliculas(args.archivo, args.codificacion), args.peticiones, args.lote, args.semilla)
+    reporte = asyncio.run(ejecutar(args.host, args.puerto, peticiones, args.clientes))
+    if args.lote > 0:
+        reporte["consultas_por_segundo"] = args.peticiones / reporte["segundos"]
+
+    print(f"{reporte['total']['peticiones']} peticiones con {args.clientes} clientes en {reporte['segundos']:.2f} s "
+          f"({reporte['qps']:.0f} QPS)")
+    if args.lote > 0:
+        print(f"  {args.peticiones} consultas en lotes de {args.lote} ({reporte['consultas_por_segundo']:.0f} consultas/s)")
+    for ruta, resumen in [("total", reporte["total"])] + list(reporte["por_ruta"].items()):
+        print(f"  {ruta:22} p50 {resumen['ms_p50']:7.2f} ms  p99 {resumen['ms_p99']:7.2f} ms  "
+              f"máx {resumen['ms_maximo']:7.2f} ms  ({resumen['peticiones']} peticiones)")
+    if reporte["errores"]:
+        print("Errores por código de estado:", reporte["errores"])
+    if args.salida:
+        with open(args.salida, mode="w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
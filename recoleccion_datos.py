@@ -62,12 +62,14 @@ def process_title_ratings(file_path):
 
 def process_title_principals(file_path):
     print("Procesando title.principals.tsv para directores...")
-    usecols = ["tconst", "category", "nconst"]
+    usecols = ["tconst", "ordering", "category", "nconst"]
     try:
-        df = pd.read_csv(file_path, sep="\t", usecols=usecols, na_values="\\N", dtype=str)
+        df = pd.read_csv(file_path, sep="\t", usecols=usecols, na_values="\\N", dtype={"tconst": str, "ordering": int, "category": str, "nconst": str})
         # Filtrando solo los directores
         directors_df = df[df["category"] == "director"]
-        print(f"title.principals.tsv procesado: {len(directors_df)} filas de directores.")
+        # Un solo director por título (el primero en los créditos), para que la unión no multiplique filas
+        directors_df = directors_df.sort_values(["tconst", "ordering"]).drop_duplicates("tconst")
+        print(f"title.principals.tsv procesado: {len(directors_df)} títulos con director.")
         return directors_df
     except Exception as e:
         print(f"Error al procesar title.principals.tsv: {e}")
@@ -104,13 +106,13 @@ def main():
         return
 
     if not principals.empty:
-        merged_df = merged_df.merge(principals, on="tconst", how="left")
+        merged_df = merged_df.merge(principals[["tconst", "nconst"]], on="tconst", how="left", validate="one_to_one")
         print("Unión con directores completada.")
     else:
         print("Advertencia: No se encontraron datos de directores.")
     
-    # Filtrar columnas relevantes
-    final_df = merged_df[["primaryTitle", "averageRating", "numVotes", "runtimeMinutes", "nconst", "genres", "startYear"]]
+    # Filtrar columnas relevantes (tconst identifica cada película aunque varias compartan título)
+    final_df = merged_df[["tconst", "primaryTitle", "averageRating", "numVotes", "runtimeMinutes", "nconst", "genres", "startYear"]]
     final_df.rename(columns={
         "primaryTitle": "Título",
         "averageRating": "Rating",
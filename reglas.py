@@ -0,0 +1,282 @@
+"""
+Reglas declarativas que dan peso a las conexiones entre películas.
+
+Una configuración es una lista de reglas, cada una sobre un campo de las películas:
+
+    {"campo": "genero", "tipo": "comun", "peso": 3, "descripcion": "Género común: {comunes}"}
+    {"campo": "director", "tipo": "igual", "peso": 3, "descripcion": "Mismo director: {a}"}
+    {"campo": "año", "tipo": "diferencia", "escalones": [
+        {"maximo": 0, "peso": 2, "descripcion": "Mismo año: {a}"},
+        {"maximo": 10, "peso": 1, "descripcion": "Años cercanos: {a} y {b}"}]}
+
+Una regla "diferencia" aplica el primer escalón que cumple |a - b| <= maximo (o < menor_que).
+El peso de una conexión es la suma de los pesos de las reglas que se cumplen, y sólo se conectan
+las películas con peso mayor que 0. Las descripciones admiten {a}, {b} (los valores de cada película)
+y {comunes} (los géneros en común).
+
+`compilar_reglas` genera y compila una sola vez el código Python de la función que puntúa una película
+contra un rango de filas del almacén, con los pesos y umbrales como constantes. Con esa función el
+grafo se vuelve a puntuar completo desde las columnas, sin releer el archivo:
+
+    python reglas.py --config mis_reglas.json
+"""
+import argparse
+import copy
+import json
+import time
+
+# Campo de las reglas -> columna del almacén que se compara
+COLUMNAS = {
+    "genero": "mascara_genero",
+    "director": "director",
+    "año": "año",
+    "rating": "rating",
+    "duracion": "duracion",
+    "votos": "votos",
+}
+TIPOS = {
+    "genero": {"comun"},
+    "director": {"igual"},
+    "año": {"igual", "diferencia"},
+    "rating": {"igual", "diferencia"},
+    "duracion": {"igual", "diferencia"},
+    "votos": {"igual", "diferencia"},
+}
+
+# Las reglas de generar_conexiones en el menú principal
+PRESET_PRINCIPAL = [
+    {"campo": "genero", "tipo": "comun", "peso": 3, "descripcion": "Género común: {comunes}"},
+    {"campo": "director", "tipo": "igual", "peso": 3, "descripcion": "Mismo director: {a}"},
+    {"campo": "año", "tipo": "diferencia", "escalones": [
+        {"maximo": 0, "peso": 2, "descripcion": "Mismo año: {a}"},
+        {"maximo": 10, "peso": 1, "descripcion": "Años cercanos: {a} y {b}"},
+    ]},
+    {"campo": "rating", "tipo": "diferencia", "escalones": [
+        {"menor_que": 0.5, "peso": 2, "descripcion": "Rating similar: {a} y {b}"},
+    ]},
+    {"campo": "duracion", "tipo": "diferencia", "escalones": [
+        {"menor_que": 10, "peso": 1, "descripcion": "Duración similar: {a} y {b} minutos"},
+    ]},
+    {"campo": "votos", "tipo": "diferencia", "escalones": [
+        {"menor_que": 50, "peso": 1, "descripcion": "Votos similares: {a} y {b}"},
+    ]},
+]
+
+# GrafoM usa las mismas reglas, pero el género común pesa 2
+PRESET_GRAFOM = copy.deepcopy(PRESET_PRINCIPAL)
+PRESET_GRAFOM[0]["peso"] = 2
+
+PRESETS = {"principal": PRESET_PRINCIPAL, "grafom": PRESET_GRAFOM}
+
+
+def _numero(valor, nombre):
+    if not isinstance(valor, (int, float)) or isinstance(valor, bool):
+        raise ValueError(f"{nombre} debe ser un número, no {valor!r}.")
+    return valor
+
+
+def validar_reglas(reglas):
+    """Comprueba la configuración y la devuelve normalizada (con descripciones). Lanza ValueError si no es válida."""
+    if not isinstance(reglas, list) or not reglas:
+        raise ValueError("La configuración de reglas debe ser una lista no vacía.")
+    normalizadas = []
+    for regla in reglas:
+        if not isinstance(regla, dict):
+            raise ValueError(f"Cada regla debe ser un objeto, no {regla!r}.")
+        campo, tipo = regla.get("campo"), regla.get("tipo")
+        if campo not in TIPOS:
+            raise ValueError(f"Campo desconocido: {campo!r}. Campos válidos: {', '.join(TIPOS)}.")
+        if tipo not in TIPOS[campo]:
+            raise ValueError(f"El campo {campo!r} admite reglas de tipo {', '.join(sorted(TIPOS[campo]))}, no {tipo!r}.")
+
+        if tipo == "diferencia":
+            escalones = regla.get("escalones")
+            if not isinstance(escalones, list) or not escalones:
+                raise ValueError(f"La regla de diferencia de {campo!r} necesita una lista de escalones.")
+            normalizados = []
+            for escalon in escalones:
+                if not isinstance(escalon, dict) or ("maximo" in escalon) == ("menor_que" in escalon):
+                    raise ValueError(f"Cada escalón de {campo!r} necesita 'maximo' o 'menor_que' (sólo uno).")
+                limite = "maximo" if "maximo" in escalon else "menor_que"
+                if _numero(escalon[limite], limite) < 0:
+                    raise ValueError(f"El umbral de un escalón de {campo!r} no puede ser negativo.")
+                normalizados.append({
+                    limite: escalon[limite],
+                    "peso": _numero(escalon.get("peso"), "peso"),
+                    "descripcion": escalon.get("descripcion", f"{campo} cercano: {{a}} y {{b}}"),
+                })
+            normalizadas.append({"campo": campo, "tipo": tipo, "escalones": normalizados})
+        else:
+            normalizadas.append({
+                "campo": campo,
+                "tipo": tipo,
+                "peso": _numero(regla.get("peso"), "peso"),
+                "descripcion": regla.get("descripcion", f"{campo} igual: {{a}}"),
+            })
+    return normalizadas
+
+
+def _condicion(escalon, a, b):
+    """Condición de un escalón en código Python (con comparaciones encadenadas, sin llamar a abs)."""
+    if "maximo" in escalon:
+        limite = escalon["maximo"]
+        return f"{a} == {b}" if limite == 0 else f"{-limite!r} <= {a} - {b} <= {limite!r}"
+    limite = escalon["menor_que"]
+    return f"{-limite!r} < {a} - {b} < {limite!r}"
+
+
+def _expresion(regla, a, b):
+    """Expresión en código Python del peso que aporta la regla entre los valores a y b."""
+    if regla["tipo"] == "comun":
+        return f"({regla['peso']!r} if {a} & {b} else 0)"
+    if regla["tipo"] == "igual":
+        return f"({regla['peso']!r} if {a} == {b} else 0)"
+    expresion = "0"
+    for escalon in reversed(regla["escalones"]):
+        expresion = f"({escalon['peso']!r} if {_condicion(escalon, a, b)} else {expresion})"
+    return expresion
+
+
+def _generar_fuente(reglas):
+    """Código de la función pesos_fila(almacen, i, desde): pesos de la fila i contra las filas desde..n-1."""
+    campos = list(dict.fromkeys(regla["campo"] for regla in reglas))  # Una columna por campo, en orden
+    nombre = {campo: k for k, campo in enumerate(campos)}
+    suma = " + ".join(_expresion(regla, f"a{nombre[regla['campo']]}", f"b{nombre[regla['campo']]}") for regla in reglas)
+    lineas = ["def pesos_fila(almacen, i, desde=0):"]
+    for campo, k in nombre.items():
+        lineas.append(f"    c{k} = almacen.{COLUMNAS[campo]}")
+        lineas.append(f"    a{k} = c{k}[i]")
+    variables = ", ".join(f"b{k}" for k in nombre.values())
+    columnas = ", ".join(f"c{k}[desde:]" for k in nombre.values())
+    if len(campos) == 1:
+        lineas.append(f"    return [{suma} for b0 in c0[desde:]]")
+    else:
+        lineas.append(f"    return [{suma} for {variables} in zip({columnas})]")
+    return "\n".join(lineas) + "\n"
+
+
+class Puntuador:
+    """Reglas compiladas: puntúan filas completas del almacén y explican una conexión."""
+
+    def __init__(self, reglas):
+        self.reglas = validar_reglas(reglas)
+        self.fuente = _generar_fuente(self.reglas)
+        espacio = {}
+        exec(compile(self.fuente, "<reglas>", "exec"), espacio)
+        self.pesos_fila = espacio["pesos_fila"]
+
+    def __reduce__(self):
+        # La función compilada no se puede serializar: se guarda la configuración y se recompila al cargar
+        return (Puntuador, (self.reglas,))
+
+    def conexiones(self, almacen):
+        """
+        Puntúa todos los pares del almacén y devuelve (listas, emitidas): listas[fila] son los pares
+        (id vecino, peso) de esa película, en el mismo orden y con las mismas repeticiones que produce
+        recorrer todos los pares ordenados (i, j) agregando cada conexión en ambos sentidos, y emitidas
+        es la cantidad de pares no ordenados con peso (aristas). Como las reglas son simétricas, cada
+        par se puntúa una sola vez.
+        """
+        ids = almacen.ids
+        n = len(ids)
+        inferiores = [[] for _ in range(n)]  # Vecinos de filas anteriores, en orden de fila
+        superiores = []  # Vecinos de filas posteriores, en orden de fila
+        pesos_fila = self.pesos_fila
+        emitidas = 0
+        for i in range(n):
+            id_i = ids[i]
+            superior = []
+            j = i
+            for peso in pesos_fila(almacen, i, i + 1):
+                j += 1
+                if peso > 0:
+                    superior.append((ids[j], peso))
+                    inferiores[j].append((id_i, peso))
+            superiores.append(superior)
+            emitidas += len(superior)
+
+        # Al recorrer los pares ordenados, la lista de la fila p recibe a sus vecinos anteriores
+        # (desde sus filas), luego todos sus vecinos (desde la fila p) y al final los posteriores
+        listas = []
+        for inferior, superior in zip(inferiores, superiores):
+            inferior.extend(inferior)
+            inferior.extend(superior)
+            inferior.extend(superior)
+            listas.append(inferior)
+        return listas, emitidas
+
+    def explicar(self, almacen, i, j):
+        """Devuelve las reglas que aportan peso entre las filas i y j, como una lista de (descripción, peso)."""
+        p1, p2 = almacen.info(i), almacen.info(j)
+        explicacion = []
+        for regla in self.reglas:
+            a, b = p1[regla["campo"]], p2[regla["campo"]]
+            if regla["tipo"] == "comun":
+                comunes = set(a) & set(b)
+                if comunes:
+                    explicacion.append((regla["descripcion"].format(a=a, b=b, comunes=", ".join(sorted(comunes))), regla["peso"]))
+            elif regla["tipo"] == "igual":
+                if a == b:
+                    explicacion.append((regla["descripcion"].format(a=a, b=b), regla["peso"]))
+            else:
+                for escalon in regla["escalones"]:
+                    cumple = abs(a - b) <= escalon["maximo"] if "maximo" in escalon else abs(a - b) < escalon["menor_que"]
+                    if cumple:
+                        explicacion.append((escalon["descripcion"].format(a=a, b=b), escalon["peso"]))
+                        break
+        return [(descripcion, peso) for descripcion, peso in explicacion if peso]
+
+
+def compilar_reglas(reglas):
+    """Compila una configuración de reglas (lista, nombre de preset o Puntuador ya compilado)."""
+    if isinstance(reglas, Puntuador):
+        return reglas
+    if isinstance(reglas, str):
+        if reglas not in PRESETS:
+            raise ValueError(f"Preset desconocido: {reglas!r}. Presets: {', '.join(PRESETS)}.")
+        reglas = PRESETS[reglas]
+    return Puntuador(reglas)
+
+
+def cargar_reglas(ruta):
+    """Lee una configuración de reglas desde un archivo JSON."""
+    with open(ruta, encoding="utf-8") as f:
+        return validar_reglas(json.load(f))
+
+
+def main():
+    from Proyecto_final_Algortimos_main import Grafo
+
+    parser = argparse.ArgumentParser(description="Vuelve a puntuar el grafo con otra configuración de reglas.")
+    parser.add_argument("--archivo", default="muestralimpia.txt")
+    parser.add_argument("--codificacion", default="latin1")
+    parser.add_argument("--config", help="Archivo JSON con las reglas (por defecto, el preset)")
+    parser.add_argument("--preset", default="principal", choices=sorted(PRESETS))
+    parser.add_argument("--exportar", help="Guardar el preset en este archivo JSON, para editarlo, y salir")
+    parser.add_argument("--fuente", action="store_true", help="Mostrar el código generado para las reglas")
+    args = parser.parse_args()
+
+    if args.exportar:
+        with open(args.exportar, mode="w", encoding="utf-8") as f:
+            json.dump(PRESETS[args.preset], f, indent=2, ensure_ascii=False)
+        return
+
+    reglas = cargar_reglas(args.config) if args.config else args.preset
+    inicio = time.perf_counter()
+    puntuador = compilar_reglas(reglas)
+    print(f"Reglas compiladas en {1000 * (time.perf_counter() - inicio):.2f} ms")
+    if args.fuente:
+        print(puntuador.fuente)
+
+    grafo = Grafo()
+    inicio = time.perf_counter()
+    grafo.cargar_desde_txt(args.archivo, args.codificacion)
+    print(f"Carga y conexiones con el preset principal: {time.perf_counter() - inicio:.2f} s")
+    inicio = time.perf_counter()
+    grafo.cambiar_reglas(puntuador.reglas)  # Como script, Puntuador es de __main__ y no del módulo reglas
+    segundos = time.perf_counter() - inicio
+    aristas = sum(len(vecinos) for vecinos in grafo.aristas.values()) // 2
+    print(f"Grafo puntuado de nuevo con las reglas en {segundos:.2f} s: {aristas} aristas")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Servicio HTTP/JSON local de recomendaciones sobre el grafo, con asyncio y sólo la biblioteca estándar.
+
+    python servicio.py muestralimpia.txt --codificacion latin1 --puerto 8000
+
+Rutas (las consultas tienen la misma forma que en consultas.py, sin el "tipo"):
+    GET  /salud                          -> {"peliculas": n, "aristas": m, "peticiones": k}
+    GET  /titulos?q=texto&limite=5       -> títulos que corresponden al texto (exacto, prefijo o parecido)
+    POST /busqueda_avanzada              {"criterios": {"genero": ["Drama"], "año": 1994}}
+    POST /similares                      {"titulo": "Heat", "lambda_mmr": 0.7}
+    POST /similares_multiple             {"titulos": ["Heat", "Ronin"]}
+    POST /lote                           {"consultas": [{"tipo": "similares", "titulo": "Heat"}, ...]}
+
+Con --grabar registro.jsonl se graban las búsquedas recibidas para repetirlas con trafico.py.
+
+El grafo se carga una sola vez al arrancar. Las conexiones se atienden de forma concurrente y con
+keep-alive; cada consulta es de sólo lectura y dura milisegundos, así que se resuelve directamente en
+el bucle de eventos (con el GIL, llevarla a un hilo no la haría más rápida).
+"""
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from consultas import ConsultaInvalida, ejecutar_consulta
+
+MAX_CUERPO = 1 << 20  # Bytes como máximo en el cuerpo de una petición
+RUTAS_POST = {
+    "/busqueda_avanzada": "avanzada",
+    "/similares": "similares",
+    "/similares_multiple": "similares_multiple",
+    "/lote": "lote",
+}
+RAZONES = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ServicioRecomendaciones:
+    """Atiende peticiones HTTP/1.1 sobre un grafo ya cargado."""
+
+    def __init__(self, grafo):
+        self.grafo = grafo
+        self.aristas = sum(len(vecinos) for vecinos in grafo.aristas.values()) // 2
+        self.peticiones = 0
+
+    def procesar(self, metodo, objetivo, cuerpo):
+        """Resuelve una petición y devuelve (código de estado, diccionario de respuesta)."""
+        ruta = urlsplit(objetivo)
+        if ruta.path == "/salud" and metodo == "GET":
+            return 200, {"peliculas": len(self.grafo.nodos), "aristas": self.aristas, "peticiones": self.peticiones}
+
+        if ruta.path == "/titulos" and metodo == "GET":
+            parametros = parse_qs(ruta.query)
+            try:
+                limite = int(parametros.get("limite", ["5"])[0])
+            except ValueError:
+                return 400, {"error": "'limite' debe ser un entero."}
+            consulta = {"tipo": "titulos", "consulta": parametros.get("q", [""])[0], "limite": limite}
+        elif ruta.path in RUTAS_POST:
+            if metodo != "POST":
+                return 405, {"error": "Use POST."}
+            try:
+                consulta = json.loads(cuerpo or b"{}")
+            except ValueError:
+                return 400, {"error": "El cuerpo no es JSON válido."}
+            if not isinstance(consulta, dict):
+                return 400, {"error": "El cuerpo debe ser un objeto JSON."}
+            consulta = dict(consulta, tipo=RUTAS_POST[ruta.path])
+        else:
+            return 404, {"error": f"Ruta desconocida: {ruta.path}"}
+
+        try:
+            return 200, ejecutar_consulta(self.grafo, consulta)
+        except ConsultaInvalida as e:
+            return 400, {"error": str(e)}
+
+    async def atender(self, lector, escritor):
+        """Atiende las peticiones de una conexión hasta que el cliente la cierra."""
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                partes = linea.decode("latin1").split()
+                if len(partes) != 3:
+                    await self._responder(escritor, 400, {"error": "Petición mal formada."}, False)
+                    break
+                metodo, objetivo, version = partes
+
+                encabezados = {}
+                while True:
+                    linea = await lector.readline()
+                    if linea in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = linea.decode("latin1").partition(":")
+                    encabezados[nombre.strip().lower()] = valor.strip()
+
+                conexion = encabezados.get("connection", "").lower()
+                mantener = conexion == "keep-alive" if version == "HTTP/1.0" else conexion != "close"
+                try:
+                    largo = int(encabezados.get("content-length", "0"))
+                except ValueError:
+                    largo = -1
+                if not 0 <= largo <= MAX_CUERPO:
+                    await self._responder(escritor, 413 if largo > 0 else 400, {"error": "Content-Length no válido."}, False)
+                    break
+                cuerpo = await lector.readexactly(largo) if largo else b""
+
+                self.peticiones += 1
+                try:
+                    estado, respuesta = self.procesar(metodo, objetivo, cuerpo)
+                except Exception as e:  # Un error en una consulta no debe tumbar el servicio
+                    estado, respuesta = 500, {"error": f"{type(e).__name__}: {e}"}
+                await self._responder(escritor, estado, respuesta, mantener)
+                if not mantener:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # El cliente cerró la conexión a mitad de una petición
+        finally:
+            escritor.close()
+
+    @staticmethod
+    async def _responder(escritor, estado, respuesta, mantener):
+        cuerpo = json.dumps(respuesta, ensure_ascii=False).encode("utf-8")
+        encabezado = (
+            f"HTTP/1.1 {estado} {RAZONES[estado]}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n"
+            f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n"
+        )
+        escritor.write(encabezado.encode("latin1") + cuerpo)
+        await escritor.drain()
+
+
+async def servir(grafo, host, puerto):
+    servicio = ServicioRecomendaciones(grafo)
+    servidor = await asyncio.start_server(servicio.atender, host, puerto)
+    print(f"Sirviendo {len(grafo.nodos)} películas en http://{host}:{puerto}")
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def main():
+    from Proyecto_final_Algortimos_main import Grafo
+
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON local de recomendaciones.")
+    parser.add_argument("archivo", nargs="?", default="muestralimpia.txt")
+    parser.add_argument("--codificacion", default="latin1")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--grabar", help="Grabar las búsquedas recibidas en este archivo JSONL (ver trafico.py)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    grafo = Grafo()
+    grafo.cargar_desde_txt(args.archivo, args.codificacion)
+    grafo.obtener_indice_titulos()  # Lo construimos ya para que la primera búsqueda de títulos no lo pague
+    # Los millones de tuplas de las aristas no cambian: las sacamos del recolector de basura para que
+    # sus pasadas completas (cientos de ms) no aparezcan como picos de latencia en las consultas
+    gc.collect()
+    gc.freeze()
+    print(f"Grafo cargado en {time.perf_counter() - inicio:.1f} s")
+    with contextlib.ExitStack() as pila:
+        if args.grabar:
+            from trafico import grabar_consultas
+            pila.enter_context(grabar_consultas(grafo, args.grabar))
+        try:
+            asyncio.run(servir(grafo, args.host, args.puerto))
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
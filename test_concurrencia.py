@@ -0,0 +1,86 @@
+import random
+from collections import Counter
+
+import pytest
+
+import GrafoM
+import Proyecto_final_Algortimos_main as principal
+from concurrencia import GrafoConcurrente, grafo_sintetico, pelicula_aleatoria, verificar
+
+
+def _con_tconst(clase, peliculas=60, semilla=3):
+    """Grafo conectado con películas aleatorias que tienen tconst (tt0000001, tt0000002...)."""
+    aleatorio = random.Random(semilla)
+    grafo = clase()
+    for i in range(peliculas):
+        grafo.agregar_pelicula(*pelicula_aleatoria(aleatorio, i), tconst=f"tt{i + 1:07d}")
+    grafo.generar_conexiones()
+    return grafo
+
+
+def _aristas_desde_cero(grafo):
+    """Las aristas que tendría el mismo conjunto de películas generado de una vez, como multiconjuntos."""
+    nuevo = type(grafo)(grafo.reglas)
+    for fila, id_pelicula in enumerate(grafo.nodos.ids):
+        info = grafo.nodos.info(fila)
+        nuevo.agregar_pelicula(info["titulo"], info["rating"], info["votos"], info["duracion"],
+                               info["director"], info["genero"], info["año"], info["tconst"])
+    nuevo.generar_conexiones()
+    return {id_pelicula: Counter(vecinos) for id_pelicula, vecinos in nuevo.aristas.items() if vecinos}
+
+
+def _aristas(grafo):
+    return {id_pelicula: Counter(vecinos) for id_pelicula, vecinos in grafo.aristas.items() if vecinos}
+
+
+def test_reinsertar_actualiza_las_conexiones():
+    compartido = GrafoConcurrente(_con_tconst(GrafoM.Grafo))
+    compartido.agregar_pelicula("Otra", 9.9, 7, 61, "nm999", ["Western"], 1901, tconst="tt0000005")
+    grafo = compartido.instantanea()
+
+    assert grafo.nodos[5]["titulo"] == "Otra"
+    assert _aristas(grafo) == _aristas_desde_cero(grafo)
+    assert verificar(grafo, random.Random(0), muestra=None) == []
+
+
+def test_reinsertar_sin_cambios_no_duplica_aristas():
+    compartido = GrafoConcurrente(_con_tconst(principal.Grafo))
+    antes = _aristas(compartido.instantanea())
+    # La copia principal ignora un tconst repetido: no debe volver a conectar la película
+    compartido.agregar_pelicula("Otra", 9.9, 7, 61, "nm999", ["Western"], 1901, tconst="tt0000005")
+    assert _aristas(compartido.instantanea()) == antes
+
+
+def test_lote_igual_a_agregar_de_a_una():
+    aleatorio = random.Random(7)
+    peliculas = [pelicula_aleatoria(aleatorio, i) for i in range(10)]
+    de_a_una = GrafoConcurrente(grafo_sintetico(principal.Grafo, 40, 1))
+    en_lote = GrafoConcurrente(grafo_sintetico(principal.Grafo, 40, 1))
+    for pelicula in peliculas:
+        de_a_una.agregar_pelicula(*pelicula)
+    ids = en_lote.agregar_peliculas(peliculas)
+
+    assert len(ids) == 10
+    assert en_lote.generacion == 1
+    assert _aristas(en_lote.instantanea()) == _aristas(de_a_una.instantanea())
+
+
+def test_la_version_publicada_no_cambia():
+    compartido = GrafoConcurrente(grafo_sintetico(principal.Grafo, 30, 2))
+    anterior = compartido.instantanea()
+    aristas = _aristas(anterior)
+    compartido.agregar_pelicula(*pelicula_aleatoria(random.Random(4), 0))
+    assert len(anterior.nodos) == 30
+    assert _aristas(anterior) == aristas
+    assert len(compartido.instantanea().nodos) == 31
+
+
+def test_solo_expone_lecturas():
+    compartido = GrafoConcurrente(grafo_sintetico(principal.Grafo, 20, 5))
+    assert compartido.busqueda_por_similitud(compartido.nodos.ids[0]) is not None
+    for nombre in ("generar_conexiones", "conectar_pelicula", "cargar_desde_txt"):
+        with pytest.raises(AttributeError):
+            getattr(compartido, nombre)
+    compartido.cambiar_reglas("grafom")
+    assert compartido.generacion == 1
+    assert compartido.reglas.reglas[0]["peso"] == 2
@@ -0,0 +1,70 @@
+import gc
+import io
+import json
+
+import lotes
+import Proyecto_final_Algortimos_main as principal
+from concurrencia import grafo_sintetico
+
+
+def _grafo_con_veneno():
+    """Grafo sintético cuya búsqueda avanzada falla con un error inesperado para el año 1900."""
+    grafo = grafo_sintetico(principal.Grafo, 40, 1)
+    original = grafo.busqueda_avanzada
+
+    def busqueda_avanzada(**criterios):
+        if criterios.get("año") == 1900:
+            raise RuntimeError("veneno")
+        return original(**criterios)
+
+    grafo.busqueda_avanzada = busqueda_avanzada
+    return grafo
+
+
+def test_una_linea_envenenada_no_detiene_el_lote(monkeypatch):
+    grafo = _grafo_con_veneno()
+    monkeypatch.setattr(lotes, "_cargar_grafo", lambda archivo, codificacion: grafo)
+    titulo = grafo.nodos.titulos[0]
+    consultas = [
+        {"tipo": "similares", "titulo": titulo},
+        {"tipo": "avanzada", "criterios": {"genero": ["Drama"]}},
+        {"tipo": "avanzada", "criterios": {"año": 1900}},
+        {"tipo": "titulos", "consulta": titulo[:4]},
+        [titulo],
+    ]
+    entrada = io.StringIO("".join(json.dumps(c) + "\n" for c in consultas))
+    salida = io.StringIO()
+
+    rendimiento = lotes.procesar(entrada, salida, "sin_archivo.txt", "utf-8", trabajadores=1)
+
+    resultados = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+    assert [r["linea"] for r in resultados] == [1, 2, 3, 4, 5]
+    assert resultados[2] == {"linea": 3, "error": "RuntimeError: veneno"}
+    assert all("resultados" in r for k, r in enumerate(resultados) if k != 2)
+    assert rendimiento["consultas"] == 5
+    assert rendimiento["errores"] == 1
+
+
+def test_procesos_no_dejan_el_heap_congelado(monkeypatch):
+    grafo = grafo_sintetico(principal.Grafo, 30, 3)
+    monkeypatch.setattr(lotes, "_cargar_grafo", lambda archivo, codificacion: grafo)
+    titulos = grafo.nodos.titulos[:6]
+    entrada = io.StringIO("".join(json.dumps({"tipo": "similares", "titulo": t}) + "\n" for t in titulos))
+    salida = io.StringIO()
+
+    rendimiento = lotes.procesar(entrada, salida, "sin_archivo.txt", "utf-8", trabajadores=2)
+
+    assert gc.get_freeze_count() == 0
+    assert rendimiento["consultas"] == 6 and rendimiento["errores"] == 0
+    assert [json.loads(linea)["linea"] for linea in salida.getvalue().splitlines()] == [1, 2, 3, 4, 5, 6]
+
+
+def test_errores_de_formato_por_linea(monkeypatch):
+    monkeypatch.setattr(lotes, "_grafo", grafo_sintetico(principal.Grafo, 10, 2))
+    salida, hubo_error = lotes.procesar_linea(7, "{no es json")
+    assert hubo_error
+    assert json.loads(salida) == {"linea": 7, "error": "La línea no es JSON válido."}
+
+    salida, hubo_error = lotes.procesar_linea(8, json.dumps({"tipo": "avanzada", "criterios": {"self": 1}}))
+    assert hubo_error
+    assert "Criterio desconocido" in json.loads(salida)["error"]
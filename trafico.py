@@ -0,0 +1,367 @@
+"""
+Tráfico realista para dimensionar el recomendador: grabación de las consultas que llegan al grafo,
+mezclas sintéticas con popularidad de Zipf y repetición a un ritmo fijo contra un Grafo en proceso.
+
+    python trafico.py grabar consultas.jsonl                  # Usa el menú y graba las búsquedas
+    python servicio.py --grabar consultas.jsonl               # Graba las del servicio HTTP
+    python trafico.py generar mezcla.jsonl --consultas 20000 --zipf 1.1
+    python trafico.py repetir mezcla.jsonl --ritmo 300 --trabajadores 4 --cache 2000
+
+Cada línea del registro es una consulta con la forma de consultas.py y el instante en que llegó
+("t", en segundos desde el inicio de la grabación). Con --ritmo 0 la repetición respeta esos
+instantes; con un ritmo mayor que 0 las consultas salen a ese ritmo fijo. La latencia se mide
+desde el instante programado, así que incluye la espera en cola cuando los trabajadores no dan
+abasto (además se reporta el tiempo de servicio, sin la espera).
+"""
+import argparse
+import bisect
+import contextlib
+import csv
+import gc
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+# Tipo de consulta -> fracción de las consultas sintéticas
+MEZCLA = [("similares", 0.6), ("similares_multiple", 0.2), ("avanzada", 0.2)]
+METODOS_GRABADOS = ("busqueda_avanzada", "busqueda_por_similitud", "busqueda_por_similitud_multiple")
+
+
+class GrabadorConsultas:
+    """Escribe en un archivo JSONL cada llamada a las búsquedas de un grafo, como consulta de consultas.py."""
+
+    def __init__(self, ruta):
+        self.archivo = open(ruta, mode="w", encoding="utf-8")
+        self.inicio = time.perf_counter()
+        self.grabadas = 0
+        self._candado = threading.Lock()
+
+    def grabar(self, consulta):
+        linea = json.dumps({"t": round(time.perf_counter() - self.inicio, 6), **consulta}, ensure_ascii=False)
+        with self._candado:
+            self.archivo.write(linea + "\n")
+            self.grabadas += 1
+
+    def instalar(self, grafo):
+        """Reemplaza las búsquedas de esta instancia del grafo por versiones que graban cada llamada."""
+        avanzada = grafo.busqueda_avanzada
+        similitud = grafo.busqueda_por_similitud
+        multiple = grafo.busqueda_por_similitud_multiple
+
+        def busqueda_avanzada(**criterios):
+            self.grabar({"tipo": "avanzada", "criterios": criterios})
+            return avanzada(**criterios)
+
+        def busqueda_por_similitud(pelicula, umbral_peso=1, lambda_mmr=None):
+            self.grabar({"tipo": "similares", "titulo": pelicula, "umbral_peso": umbral_peso, "lambda_mmr": lambda_mmr})
+            return similitud(pelicula, umbral_peso, lambda_mmr)
+
+        def busqueda_por_similitud_multiple(titulos, umbral_peso=1, lambda_mmr=None):
+            self.grabar({"tipo": "similares_multiple", "titulos": list(titulos),
+                         "umbral_peso": umbral_peso, "lambda_mmr": lambda_mmr})
+            return multiple(titulos, umbral_peso, lambda_mmr)
+
+        grafo.busqueda_avanzada = busqueda_avanzada
+        grafo.busqueda_por_similitud = busqueda_por_similitud
+        grafo.busqueda_por_similitud_multiple = busqueda_por_similitud_multiple
+        return grafo
+
+    def desinstalar(self, grafo):
+        """Devuelve al grafo sus búsquedas originales."""
+        for nombre in METODOS_GRABADOS:
+            vars(grafo).pop(nombre, None)
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+@contextlib.contextmanager
+def grabar_consultas(grafo, ruta):
+    """Contexto que graba en `ruta` las búsquedas hechas sobre el grafo mientras está activo."""
+    grabador = GrabadorConsultas(ruta)
+    grabador.instalar(grafo)
+    try:
+        yield grabador
+    finally:
+        grabador.desinstalar(grafo)
+        grabador.cerrar()
+
+
+def leer_catalogo(archivo, codificacion):
+    """Devuelve (título, géneros, año) de cada película del archivo, de la más votada a la menos."""
+    peliculas = []
+    with open(archivo, mode="r", encoding=codificacion) as f:
+        for fila in csv.DictReader(f, delimiter=";"):
+            votos = fila["Votos"].strip()
+            año = fila["Año"].strip()
+            peliculas.append((int(votos) if votos.isdigit() else 0, fila["Título"],
+                              [g.strip() for g in fila["Género"].split(",") if g.strip()],
+                              int(año) if año.isdigit() else None))
+    peliculas.sort(key=lambda p: -p[0])  # Estable: a igual cantidad de votos se conserva el orden del archivo
+    return [(titulo, generos, año) for _, titulo, generos, año in peliculas]
+
+
+def generar_mezcla(peliculas, cantidad, exponente=1.1, ritmo=100.0, semilla=0):
+    """
+    Genera `cantidad` consultas según MEZCLA. La película de cada consulta se elige con una
+    distribución de Zipf sobre la popularidad (la k-ésima más votada con probabilidad ∝ 1/k^exponente).
+    Los instantes "t" siguen llegadas de Poisson con el ritmo dado (consultas por segundo).
+    """
+    aleatorio = random.Random(semilla)
+    acumulados = list(itertools.accumulate(1 / k ** exponente for k in range(1, len(peliculas) + 1)))
+    total = acumulados[-1]
+    tipos, fracciones = zip(*MEZCLA)
+
+    def elegir():
+        return peliculas[min(len(peliculas) - 1, bisect.bisect(acumulados, aleatorio.random() * total))]
+
+    t = 0.0
+    consultas = []
+    for _ in range(cantidad):
+        t += aleatorio.expovariate(ritmo)
+        tipo = aleatorio.choices(tipos, fracciones)[0]
+        titulo, generos, año = elegir()
+        if tipo == "similares":
+            consulta = {"tipo": tipo, "titulo": titulo}
+        elif tipo == "similares_multiple":
+            consulta = {"tipo": tipo, "titulos": [titulo] + [elegir()[0] for _ in range(aleatorio.randint(1, 3))]}
+        else:
+            criterios = {"genero": generos[:1]}
+            if año is not None and aleatorio.random() < 0.5:
+                criterios["año"] = año
+            consulta = {"tipo": tipo, "criterios": criterios}
+        consultas.append({"t": round(t, 6), **consulta})
+    return consultas
+
+
+def ejecutar(grafo, consulta):
+    """Ejecuta una consulta del registro llamando directamente a la búsqueda del grafo que la originó."""
+    tipo = consulta["tipo"]
+    if tipo == "avanzada":
+        return grafo.busqueda_avanzada(**consulta.get("criterios", {}))
+    if tipo == "similares":
+        return grafo.busqueda_por_similitud(consulta["titulo"], consulta.get("umbral_peso", 1), consulta.get("lambda_mmr"))
+    if tipo == "similares_multiple":
+        return grafo.busqueda_por_similitud_multiple(consulta["titulos"], consulta.get("umbral_peso", 1),
+                                                     consulta.get("lambda_mmr"))
+    raise ValueError(f"Tipo de consulta desconocido: {tipo!r}.")
+
+
+class CacheResultados:
+    """Caché LRU de resultados de consultas, compartida por los trabajadores."""
+
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self.datos = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self._candado = threading.Lock()
+
+    @staticmethod
+    def clave(consulta):
+        return json.dumps({k: v for k, v in consulta.items() if k != "t"}, sort_keys=True, ensure_ascii=False)
+
+    def obtener(self, clave):
+        with self._candado:
+            if clave in self.datos:
+                self.datos.move_to_end(clave)
+                self.aciertos += 1
+                return True, self.datos[clave]
+            self.fallos += 1
+            return False, None
+
+    def guardar(self, clave, resultado):
+        with self._candado:
+            self.datos[clave] = resultado
+            self.datos.move_to_end(clave)
+            if len(self.datos) > self.capacidad:
+                self.datos.popitem(last=False)
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {"capacidad": self.capacidad, "aciertos": self.aciertos, "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else None}
+
+
+def percentil(valores, fraccion):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not valores:
+        return None
+    return valores[min(len(valores) - 1, max(0, round(fraccion * len(valores)) - 1))]
+
+
+def _resumen(valores):
+    valores = sorted(valores)
+    if not valores:
+        return {"consultas": 0}
+    return {
+        "consultas": len(valores),
+        "ms_p50": 1000 * percentil(valores, 0.50),
+        "ms_p90": 1000 * percentil(valores, 0.90),
+        "ms_p99": 1000 * percentil(valores, 0.99),
+        "ms_p999": 1000 * percentil(valores, 0.999),
+        "ms_maximo": 1000 * valores[-1],
+    }
+
+
+def repetir(grafo, consultas, ritmo=0.0, trabajadores=4, capacidad_cache=0):
+    """
+    Repite las consultas contra el grafo con `trabajadores` hilos. Con ritmo > 0 la consulta k se
+    programa en k / ritmo segundos; con ritmo 0 en su instante "t" del registro. Con capacidad_cache > 0
+    los resultados pasan por una caché LRU de ese tamaño. Devuelve el reporte como diccionario.
+    """
+    if ritmo > 0:
+        programados = [k / ritmo for k in range(len(consultas))]
+    else:
+        primero = consultas[0].get("t", 0) if consultas else 0
+        programados = [c.get("t", 0) - primero for c in consultas]
+    cache = CacheResultados(capacidad_cache) if capacidad_cache > 0 else None
+    siguiente = itertools.count()  # next() sobre count es atómico con el GIL
+    respuesta = defaultdict(list)  # Tipo -> latencias desde el instante programado
+    servicio = defaultdict(list)  # Tipo -> latencias de la ejecución sola
+    errores = defaultdict(int)
+    candado = threading.Lock()
+
+    def trabajador():
+        propias_respuesta, propias_servicio, propios_errores = defaultdict(list), defaultdict(list), defaultdict(int)
+        while True:
+            k = next(siguiente)
+            if k >= len(consultas):
+                break
+            consulta = consultas[k]
+            espera = inicio + programados[k] - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+            comienzo = time.perf_counter()
+            tipo = consulta.get("tipo")
+            try:
+                if cache is None:
+                    ejecutar(grafo, consulta)
+                else:
+                    clave = cache.clave(consulta)
+                    encontrado, _ = cache.obtener(clave)
+                    if not encontrado:
+                        cache.guardar(clave, ejecutar(grafo, consulta))
+            except Exception as e:  # Una consulta con error se cuenta y la repetición sigue
+                propios_errores[f"{type(e).__name__}: {e}"] += 1
+            fin = time.perf_counter()
+            propias_servicio[tipo].append(fin - comienzo)
+            propias_respuesta[tipo].append(fin - inicio - programados[k])
+        with candado:
+            for tipo, valores in propias_respuesta.items():
+                respuesta[tipo].extend(valores)
+            for tipo, valores in propias_servicio.items():
+                servicio[tipo].extend(valores)
+            for mensaje, veces in propios_errores.items():
+                errores[mensaje] += veces
+
+    hilos = [threading.Thread(target=trabajador) for _ in range(trabajadores)]
+    # Las búsquedas imprimen avisos para el menú (títulos no encontrados); aquí no interesan
+    with open(os.devnull, mode="w") as nulo, contextlib.redirect_stdout(nulo):
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        segundos = time.perf_counter() - inicio
+
+    todas_respuesta = [l for valores in respuesta.values() for l in valores]
+    todas_servicio = [l for valores in servicio.values() for l in valores]
+    return {
+        "consultas": len(consultas),
+        "trabajadores": trabajadores,
+        "segundos": segundos,
+        "ritmo_objetivo": ritmo if ritmo > 0 else (len(consultas) / programados[-1] if programados and programados[-1] else None),
+        "consultas_por_segundo": len(consultas) / segundos if segundos else None,
+        "errores": dict(errores),
+        "cache": cache.estadisticas() if cache is not None else None,
+        "respuesta": dict(_resumen(todas_respuesta), por_tipo={t: _resumen(v) for t, v in sorted(respuesta.items())}),
+        "servicio": dict(_resumen(todas_servicio), por_tipo={t: _resumen(v) for t, v in sorted(servicio.items())}),
+    }
+
+
+def leer_registro(ruta):
+    """Lee las consultas de un registro JSONL (las líneas vacías se ignoran)."""
+    with open(ruta, encoding="utf-8") as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+def _cargar_grafo(archivo, codificacion):
+    from Proyecto_final_Algortimos_main import Grafo
+
+    grafo = Grafo()
+    with contextlib.redirect_stdout(sys.stderr):
+        grafo.cargar_desde_txt(archivo, codificacion)
+    # Igual que el servicio: sacamos el grafo del recolector de basura para evitar picos de latencia
+    gc.collect()
+    gc.freeze()
+    return grafo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graba, genera y repite tráfico de consultas del recomendador.")
+    parser.add_argument("--archivo", default="muestralimpia.txt", help="Archivo de películas")
+    parser.add_argument("--codificacion", default="latin1")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    grabar = comandos.add_parser("grabar", help="Usar el menú grabando las búsquedas")
+    grabar.add_argument("registro")
+
+    generar = comandos.add_parser("generar", help="Generar una mezcla sintética de consultas")
+    generar.add_argument("registro")
+    generar.add_argument("--consultas", type=int, default=10000)
+    generar.add_argument("--zipf", type=float, default=1.1, help="Exponente de la distribución de popularidad")
+    generar.add_argument("--ritmo", type=float, default=100.0, help="Consultas por segundo de los instantes generados")
+    generar.add_argument("--semilla", type=int, default=0)
+
+    repeticion = comandos.add_parser("repetir", help="Repetir un registro contra el grafo y medir")
+    repeticion.add_argument("registro")
+    repeticion.add_argument("--ritmo", type=float, default=0.0,
+                            help="Consultas por segundo (0: respetar los instantes del registro)")
+    repeticion.add_argument("--trabajadores", type=int, default=4)
+    repeticion.add_argument("--cache", type=int, default=0, help="Capacidad de la caché LRU de resultados (0: sin caché)")
+    repeticion.add_argument("--salida", help="Archivo JSON donde guardar el reporte")
+    args = parser.parse_args()
+
+    if args.comando == "grabar":
+        grafo = _cargar_grafo(args.archivo, args.codificacion)
+        with grabar_consultas(grafo, args.registro) as grabador:
+            grafo.mostrar_menu()
+        print(f"{grabador.grabadas} consultas grabadas en {args.registro}")
+
+    elif args.comando == "generar":
+        consultas = generar_mezcla(leer_catalogo(args.archivo, args.codificacion), args.consultas,
+                                   args.zipf, args.ritmo, args.semilla)
+        with open(args.registro, mode="w", encoding="utf-8") as f:
+            for consulta in consultas:
+                f.write(json.dumps(consulta, ensure_ascii=False) + "\n")
+        distintas = len({CacheResultados.clave(c) for c in consultas})
+        print(f"{len(consultas)} consultas ({distintas} distintas) en {args.registro}")
+
+    else:
+        consultas = leer_registro(args.registro)
+        grafo = _cargar_grafo(args.archivo, args.codificacion)
+        reporte = repetir(grafo, consultas, args.ritmo, args.trabajadores, args.cache)
+        print(f"{reporte['consultas']} consultas con {reporte['trabajadores']} trabajadores en {reporte['segundos']:.2f} s: "
+              f"{reporte['consultas_por_segundo']:.0f} consultas/s (objetivo {reporte['ritmo_objetivo'] or 0:.0f})")
+        for nombre in ("respuesta", "servicio"):
+            resumen = reporte[nombre]
+            for tipo, valores in [("total", resumen)] + list(resumen["por_tipo"].items()):
+                print(f"  {nombre:9} {tipo:18} p50 {valores['ms_p50']:7.2f} ms  p90 {valores['ms_p90']:7.2f} ms  "
+                      f"p99 {valores['ms_p99']:7.2f} ms  máx {valores['ms_maximo']:7.2f} ms  ({valores['consultas']})")
+        if reporte["cache"] is not None:
+            print(f"  caché: {reporte['cache']['tasa_aciertos']:.1%} de aciertos "
+                  f"({reporte['cache']['aciertos']} de {reporte['cache']['aciertos'] + reporte['cache']['fallos']})")
+        if reporte["errores"]:
+            print("Errores:", reporte["errores"])
+        if args.salida:
+            with open(args.salida, mode="w", encoding="utf-8") as f:
+                json.dump(reporte, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
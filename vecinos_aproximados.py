@@ -0,0 +1,212 @@
+import math
+import random # Hiperplanos aleatorios (con semilla) para el hashing sensible a la localidad
+import sys
+import time
+import zlib # crc32 para un hash de director estable entre ejecuciones
+from collections import defaultdict
+
+from reglas import compilar_reglas
+
+CUBETAS_DIRECTOR = 4096  # Dimensiones para el hash del director (varias veces el número de directores de la muestra)
+
+
+def pesos_desde_reglas(reglas):
+    """
+    Lee de las reglas de conexión los pesos del vector: (peso del género común, peso del mismo director,
+    bandas). Cada escalón de una regla de diferencia es una banda (campo, ancho, peso), con su mismo
+    umbral: dos películas dentro de la misma banda comparten cubeta. Una regla "igual" sobre un campo
+    numérico es una banda de ancho 1.
+    """
+    peso_genero = peso_director = 0
+    bandas = []
+    for regla in compilar_reglas(reglas).reglas:
+        if regla["campo"] == "genero":
+            peso_genero = regla["peso"]
+        elif regla["campo"] == "director":
+            peso_director = regla["peso"]
+        elif regla["tipo"] == "igual":
+            bandas.append((regla["campo"], 1, regla["peso"]))
+        else:
+            for escalon in regla["escalones"]:
+                ancho = escalon["menor_que"] if "menor_que" in escalon else escalon["maximo"]
+                bandas.append((regla["campo"], ancho or 1, escalon["peso"]))  # "maximo": 0 es el mismo valor
+    return peso_genero, peso_director, bandas
+
+
+def _escalar(campo, valor):
+    """Valor numérico que se normaliza: los votos en escala logarítmica, porque abarcan varios órdenes de magnitud."""
+    return math.log1p(valor) if campo == "votos" else valor
+
+
+class IndiceVecinosAproximados:
+    """
+    Índice de vecinos más cercanos aproximados sobre vectores de atributos de las películas.
+    Cada película se codifica como un vector (géneros multi-hot, columnas numéricas normalizadas y
+    discretizadas en bandas, y director con hash) y se indexa con LSH de hiperplanos aleatorios:
+    `tablas` tablas hash de `bits` bits cada una. Una consulta sólo compara contra las películas que caen en sus mismas cubetas,
+    sin necesidad de las aristas del grafo.
+    """
+
+    def __init__(self, nodos, tablas=16, bits=None, semilla=42, reglas="grafom"):
+        self.ids = list(nodos)
+        # Los pesos salen de las reglas activas del grafo (grafo.reglas), o de un preset
+        self.peso_genero, self.peso_director, self.bandas = pesos_desde_reglas(reglas)
+        if bits is None:
+            # Con ~2^(bits+5) películas cada cubeta guarda unas decenas de candidatos
+            bits = max(4, round(math.log2(max(len(self.ids), 1))) - 5)
+        self.posicion = {id_pelicula: i for i, id_pelicula in enumerate(self.ids)}
+        infos = [nodos[id_pelicula] for id_pelicula in self.ids]
+        self.generos = {g: d for d, g in enumerate(sorted({g for info in infos for g in info["genero"]}))}
+        # Rango de cada columna numérica de las reglas, para normalizarla a [0, 1]
+        self.rangos = {}
+        for campo in dict.fromkeys(campo for campo, _, _ in self.bandas):
+            valores = [_escalar(campo, info[campo]) for info in infos] or [0]
+            self.rangos[campo] = (min(valores), max(valores))
+        self.cubetas = {}  # (banda, rejilla, cubeta) -> dimensión; sólo las cubetas ocupadas
+
+        inicio = time.perf_counter()
+        # Vectores dispersos {dimensión: valor} normalizados, así el producto punto es la similitud coseno
+        self.vectores = [self._codificar(info) for info in infos]
+        self.dimension = len(self.generos) + CUBETAS_DIRECTOR + 2 * len(self.rangos) + len(self.cubetas)
+
+        aleatorio = random.Random(semilla)
+        self.planos = [[[aleatorio.gauss(0, 1) for _ in range(self.dimension)] for _ in range(bits)]
+                       for _ in range(tablas)]
+        self.tablas = [defaultdict(list) for _ in range(tablas)]
+        for i, vector in enumerate(self.vectores):
+            for t, planos in enumerate(self.planos):
+                self.tablas[t][self._firma(vector, planos)].append(i)
+        self.tiempo_construccion = time.perf_counter() - inicio
+
+    def _codificar(self, info):
+        """
+        Convierte la información de una película en su vector de atributos disperso.
+        Cada columna numérica normalizada a t en [0, 1] es el ángulo t·π/2 (coseno y seno), así el
+        producto decrece con la distancia sin dar la vuelta. Además cada banda usa dos rejillas
+        desplazadas media banda, así dos valores cercanos comparten al menos una cubeta aunque caigan
+        a ambos lados de un borde; cada cubeta ocupada tiene su propia dimensión.
+        """
+        vector = {}
+        generos = [g for g in info["genero"] if g in self.generos]
+        for g in generos:
+            vector[self.generos[g]] = math.sqrt(self.peso_genero / len(generos))
+
+        desplazamiento = len(self.generos)
+        director = zlib.crc32(info["director"].encode("utf-8")) % CUBETAS_DIRECTOR
+        vector[desplazamiento + director] = math.sqrt(self.peso_director)
+        desplazamiento += CUBETAS_DIRECTOR
+
+        for campo, (minimo, maximo) in self.rangos.items():
+            angulo = (_escalar(campo, info[campo]) - minimo) / ((maximo - minimo) or 1) * math.pi / 2
+            peso = sum(peso for campo_banda, _, peso in self.bandas if campo_banda == campo)
+            vector[desplazamiento] = math.sqrt(peso) * math.cos(angulo)
+            vector[desplazamiento + 1] = math.sqrt(peso) * math.sin(angulo)
+            desplazamiento += 2
+
+        for banda, (campo, ancho, peso) in enumerate(self.bandas):
+            posicion = info[campo] / ancho
+            for rejilla in (0, 0.5):
+                cubeta = self.cubetas.setdefault((banda, rejilla, math.floor(posicion + rejilla)), len(self.cubetas))
+                vector[desplazamiento + cubeta] = math.sqrt(peso / 2)
+
+        norma = math.sqrt(sum(x * x for x in vector.values())) or 1.0
+        return {d: x / norma for d, x in vector.items()}
+
+    @staticmethod
+    def _firma(vector, planos):
+        """Firma de bits: de qué lado de cada hiperplano cae el vector."""
+        firma = 0
+        for plano in planos:
+            firma = (firma << 1) | (sum(plano[d] * x for d, x in vector.items()) >= 0)
+        return firma
+
+    @staticmethod
+    def _coseno(a, b):
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(x * b.get(d, 0.0) for d, x in a.items())
+
+    def similares(self, id_pelicula, k=5):
+        """
+        Devuelve los ids de las `k` películas más parecidas a la dada según la similitud coseno,
+        buscando sólo entre los candidatos que comparten cubeta en alguna tabla.
+        """
+        i = self.posicion.get(id_pelicula)
+        if i is None:
+            return []
+        vector = self.vectores[i]
+
+        candidatos = set()
+        for tabla, planos in zip(self.tablas, self.planos):
+            candidatos.update(tabla.get(self._firma(vector, planos), ()))
+        candidatos.discard(i)
+
+        puntuados = [(self._coseno(vector, self.vectores[c]), c) for c in candidatos]
+        puntuados.sort(key=lambda x: x[0], reverse=True)
+        return [self.ids[c] for _, c in puntuados[:k]]
+
+    def similares_exacto(self, id_pelicula, k=5):
+        """Igual que `similares` pero comparando contra todas las películas (para medir el recall)."""
+        i = self.posicion.get(id_pelicula)
+        if i is None:
+            return []
+        vector = self.vectores[i]
+        puntuados = [(self._coseno(vector, otro), c) for c, otro in enumerate(self.vectores) if c != i]
+        puntuados.sort(key=lambda x: x[0], reverse=True)
+        return [self.ids[c] for _, c in puntuados[:k]]
+
+    def reporte_recall(self, grafo, k=5, muestra=100, semilla=0):
+        """
+        Compara los resultados del índice contra el grafo exacto para una muestra de películas.
+        - recall_grafo: fracción de resultados cuyo peso en el grafo alcanza el k-ésimo mejor peso
+          de esa película (así los empates del grafo no penalizan).
+        - recall_grafo_exacto: lo mismo para la búsqueda exacta por coseno, es el techo del recall_grafo.
+        - recall_coseno: fracción del top-k exacto por coseno que encuentra el índice (calidad del LSH).
+        """
+        aleatorio = random.Random(semilla)
+        consultas = aleatorio.sample(self.ids, min(muestra, len(self.ids)))
+
+        aciertos_grafo = aciertos_grafo_exacto = aciertos_coseno = total = 0
+        tiempo_aproximado = tiempo_exacto = 0.0
+        for id_pelicula in consultas:
+            pesos = {}
+            for vecino, peso in grafo.obtener_vecinos(id_pelicula):
+                pesos[vecino] = peso
+            mejores_pesos = sorted(pesos.values(), reverse=True)[:k]
+            corte = mejores_pesos[-1] if mejores_pesos else 0
+
+            inicio = time.perf_counter()
+            aproximados = self.similares(id_pelicula, k)
+            tiempo_aproximado += time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            exactos = self.similares_exacto(id_pelicula, k)
+            tiempo_exacto += time.perf_counter() - inicio
+
+            aciertos_grafo += sum(1 for t in aproximados if pesos.get(t, 0) >= corte > 0)
+            aciertos_grafo_exacto += sum(1 for t in exactos if pesos.get(t, 0) >= corte > 0)
+            aciertos_coseno += len(set(aproximados) & set(exactos))
+            total += k
+
+        return {
+            "consultas": len(consultas),
+            "k": k,
+            "recall_grafo": aciertos_grafo / total if total else 0.0,
+            "recall_grafo_exacto": aciertos_grafo_exacto / total if total else 0.0,
+            "recall_coseno": aciertos_coseno / total if total else 0.0,
+            "ms_por_consulta_aproximada": 1000 * tiempo_aproximado / max(len(consultas), 1),
+            "ms_por_consulta_exacta": 1000 * tiempo_exacto / max(len(consultas), 1),
+            "segundos_construccion": self.tiempo_construccion,
+        }
+
+
+def main():
+    from GrafoM import obtener_grafo
+
+    grafo = obtener_grafo()
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    indice = IndiceVecinosAproximados(grafo.nodos, reglas=grafo.reglas)
+    for campo, valor in indice.reporte_recall(grafo, k=k).items():
+        print(f"{campo}: {valor}")
+
+if __name__ == "__main__":
+    main()